@@ -51,11 +51,14 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  
 
 from src.db.base import Base
-from src.models.employee import Employee
+from src.models.employee import Employee, EmployeeStats
 from src.models.attendance import Attendance
-from src.models.payroll import Payroll
+from src.models.payroll import Payroll, PayrollRun, PayrollRunError
 from src.models.auth import User, Role, Permission
-from src.models.salary import SalaryStructure, Payslip
+from src.models.salary import SalaryStructure, Payslip, PayslipDirtyMonth
+from src.models.calendar import Holiday, WeeklyOff
+from src.models.idempotency import IdempotencyKey
+from src.models.seed import SeedVersion
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,31 @@
+"""add employee bank details
+
+Revision ID: 1f6c3b8e5d27
+Revises: 8d4b2a6e0f93
+Create Date: 2026-10-19 16:41:07.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6c3b8e5d27'
+down_revision = '8d4b2a6e0f93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = [column['name'] for column in inspect(op.get_bind()).get_columns('employees')]
+
+    if 'bank_account_number' not in columns:
+        op.add_column('employees', sa.Column('bank_account_number', sa.String(length=34), nullable=True))
+    if 'bank_ifsc' not in columns:
+        op.add_column('employees', sa.Column('bank_ifsc', sa.String(length=11), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('employees', 'bank_ifsc')
+    op.drop_column('employees', 'bank_account_number')
@@ -0,0 +1,34 @@
+"""add seed versions
+
+Revision ID: 2d8f6b3e9a71
+Revises: 9c2e4f7b1a56
+Create Date: 2026-10-19 20:24:16.958340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8f6b3e9a71'
+down_revision = '9c2e4f7b1a56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tables = inspect(op.get_bind()).get_table_names()
+
+    if 'seed_versions' not in tables:
+        op.create_table(
+            'seed_versions',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('version', sa.String(length=64), nullable=False),
+            sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('seed_versions')
@@ -0,0 +1,45 @@
+"""add payslip dirty tracking
+
+Revision ID: 2e8f0c7a4b61
+Revises: 9b2d4e6f1a35
+Create Date: 2026-10-19 13:26:05.117842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8f0c7a4b61'
+down_revision = '9b2d4e6f1a35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if 'payslips' in tables and 'is_stale' not in [column['name'] for column in inspector.get_columns('payslips')]:
+        op.add_column('payslips', sa.Column('is_stale', sa.Boolean(), server_default=sa.false(), nullable=True))
+
+    if 'payslip_dirty_months' not in tables:
+        op.create_table(
+            'payslip_dirty_months',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('employee_id', sa.Integer(), nullable=False),
+            sa.Column('month', sa.String(length=7), nullable=False),
+            sa.Column('reason', sa.String(length=20), nullable=False),
+            sa.Column('marked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('employee_id', 'month', name='unique_employee_month_dirty')
+        )
+        op.create_index(op.f('ix_payslip_dirty_months_id'), 'payslip_dirty_months', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payslip_dirty_months_id'), table_name='payslip_dirty_months')
+    op.drop_table('payslip_dirty_months')
+    op.drop_column('payslips', 'is_stale')
@@ -0,0 +1,33 @@
+"""add optimistic lock versions
+
+Revision ID: 3c8f1e7a2d64
+Revises: 6e2a9d4c7b15
+Create Date: 2026-10-19 18:04:12.553918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8f1e7a2d64'
+down_revision = '6e2a9d4c7b15'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['employees', 'salary_structures', 'payslips']
+
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+
+    for table in VERSIONED_TABLES:
+        columns = [column['name'] for column in inspector.get_columns(table)]
+        if 'version' not in columns:
+            op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, 'version')
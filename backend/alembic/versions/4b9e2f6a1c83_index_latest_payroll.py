@@ -0,0 +1,27 @@
+"""index payroll for latest-month lookups
+
+Revision ID: 4b9e2f6a1c83
+Revises: 3c8f1e7a2d64
+Create Date: 2026-10-19 18:37:40.286115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b9e2f6a1c83'
+down_revision = '3c8f1e7a2d64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_payroll_employee_month
+        ON payroll (employee_id, month DESC)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_payroll_employee_month")
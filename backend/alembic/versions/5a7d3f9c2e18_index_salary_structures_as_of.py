@@ -0,0 +1,27 @@
+"""index salary structures for as-of lookups
+
+Revision ID: 5a7d3f9c2e18
+Revises: 2e8f0c7a4b61
+Create Date: 2026-10-19 14:02:51.634920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7d3f9c2e18'
+down_revision = '2e8f0c7a4b61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_salary_structures_employee_effective
+        ON salary_structures (employee_id, effective_from DESC)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_salary_structures_employee_effective")
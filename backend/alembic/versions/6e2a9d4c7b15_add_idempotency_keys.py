@@ -0,0 +1,39 @@
+"""add idempotency keys
+
+Revision ID: 6e2a9d4c7b15
+Revises: 1f6c3b8e5d27
+Create Date: 2026-10-19 17:26:53.170482
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2a9d4c7b15'
+down_revision = '1f6c3b8e5d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tables = inspect(op.get_bind()).get_table_names()
+
+    if 'idempotency_keys' not in tables:
+        op.create_table(
+            'idempotency_keys',
+            sa.Column('key_hash', sa.String(length=64), nullable=False),
+            sa.Column('request_hash', sa.String(length=64), nullable=False),
+            sa.Column('status_code', sa.Integer(), nullable=False),
+            sa.Column('content_type', sa.String(length=100), nullable=True),
+            sa.Column('response_body', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.PrimaryKeyConstraint('key_hash')
+        )
+        op.create_index(op.f('ix_idempotency_keys_created_at'), 'idempotency_keys', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_idempotency_keys_created_at'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
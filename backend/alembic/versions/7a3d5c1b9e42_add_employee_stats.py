@@ -0,0 +1,44 @@
+"""add employee stats
+
+Revision ID: 7a3d5c1b9e42
+Revises: 4b9e2f6a1c83
+Create Date: 2026-10-19 19:12:05.613927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from src.utils.employee_stats import refresh_query
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3d5c1b9e42'
+down_revision = '4b9e2f6a1c83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tables = inspect(op.get_bind()).get_table_names()
+
+    if 'employee_stats' not in tables:
+        op.create_table(
+            'employee_stats',
+            sa.Column('employee_id', sa.Integer(), nullable=False),
+            sa.Column('attendance_count', sa.Integer(), nullable=False),
+            sa.Column('last_attendance_date', sa.Date(), nullable=True),
+            sa.Column('latest_payroll_month', sa.String(length=7), nullable=True),
+            sa.Column('latest_net_pay', sa.Numeric(precision=10, scale=2), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('employee_id')
+        )
+
+    # Backfill every employee from the source tables
+    query, params = refresh_query(None)
+    op.get_bind().execute(query, params)
+
+
+def downgrade() -> None:
+    op.drop_table('employee_stats')
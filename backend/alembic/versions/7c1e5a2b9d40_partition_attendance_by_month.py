@@ -0,0 +1,103 @@
+"""partition attendance by month
+
+Revision ID: 7c1e5a2b9d40
+Revises: 4f5a9c2d8e7b
+Create Date: 2026-10-19 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from src.db.partitions import ensure_attendance_partitions, is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e5a2b9d40'
+down_revision = '4f5a9c2d8e7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # The table is created from the models on fresh databases (already partitioned)
+    if 'attendance' not in inspect(conn).get_table_names() or is_partitioned(conn):
+        return
+
+    # Move the existing table out of the way; index names are schema-wide so rename them too
+    op.execute("ALTER TABLE attendance RENAME TO attendance_unpartitioned")
+    op.execute("ALTER INDEX IF EXISTS attendance_pkey RENAME TO attendance_unpartitioned_pkey")
+    op.execute("ALTER INDEX IF EXISTS unique_employee_date RENAME TO attendance_unpartitioned_unique_employee_date")
+    op.execute("ALTER INDEX IF EXISTS ix_attendance_id RENAME TO ix_attendance_unpartitioned_id")
+
+    # The partition key has to be part of the primary key and of every unique constraint
+    op.execute("""
+        CREATE TABLE attendance (
+            id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq'::regclass),
+            employee_id INTEGER NOT NULL REFERENCES employees (id) ON DELETE CASCADE,
+            date DATE NOT NULL,
+            start_time TIME WITHOUT TIME ZONE NOT NULL,
+            end_time TIME WITHOUT TIME ZONE,
+            break_duration INTERVAL,
+            total_hours NUMERIC(4, 2),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT attendance_pkey PRIMARY KEY (id, date),
+            CONSTRAINT unique_employee_date UNIQUE (employee_id, date),
+            CONSTRAINT valid_date CHECK (date <= CURRENT_DATE),
+            CONSTRAINT valid_time_order CHECK (end_time IS NULL OR end_time > start_time)
+        ) PARTITION BY RANGE (date)
+    """)
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id")
+    op.create_index('ix_attendance_id', 'attendance', ['id'], unique=False)
+
+    # One partition per month from the oldest record up to the upcoming months
+    oldest = conn.execute(sa.text("SELECT min(date) FROM attendance_unpartitioned")).scalar()
+    ensure_attendance_partitions(conn, start=oldest)
+
+    op.execute("""
+        INSERT INTO attendance (id, employee_id, date, start_time, end_time, break_duration,
+                                total_hours, created_at, updated_at)
+        SELECT id, employee_id, date, start_time, end_time, break_duration,
+               total_hours, created_at, updated_at
+        FROM attendance_unpartitioned
+    """)
+    op.execute("DROP TABLE attendance_unpartitioned")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+
+    if 'attendance' not in inspect(conn).get_table_names() or not is_partitioned(conn):
+        return
+
+    op.execute("ALTER TABLE attendance RENAME TO attendance_partitioned")
+    op.execute("ALTER INDEX IF EXISTS attendance_pkey RENAME TO attendance_partitioned_pkey")
+    op.execute("ALTER INDEX IF EXISTS unique_employee_date RENAME TO attendance_partitioned_unique_employee_date")
+    op.execute("ALTER INDEX IF EXISTS ix_attendance_id RENAME TO ix_attendance_partitioned_id")
+
+    op.execute("""
+        CREATE TABLE attendance (
+            id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq'::regclass),
+            employee_id INTEGER NOT NULL REFERENCES employees (id) ON DELETE CASCADE,
+            date DATE NOT NULL,
+            start_time TIME WITHOUT TIME ZONE NOT NULL,
+            end_time TIME WITHOUT TIME ZONE,
+            break_duration INTERVAL,
+            total_hours NUMERIC(4, 2),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT attendance_pkey PRIMARY KEY (id),
+            CONSTRAINT unique_employee_date UNIQUE (employee_id, date),
+            CONSTRAINT valid_date CHECK (date <= CURRENT_DATE),
+            CONSTRAINT valid_time_order CHECK (end_time IS NULL OR end_time > start_time)
+        )
+    """)
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id")
+    op.create_index('ix_attendance_id', 'attendance', ['id'], unique=False)
+
+    # Detached partitions are not part of the partitioned table and are not copied back
+    op.execute("INSERT INTO attendance SELECT * FROM attendance_partitioned")
+    op.execute("DROP TABLE attendance_partitioned")
@@ -0,0 +1,56 @@
+"""add work calendar
+
+Revision ID: 8d4b2a6e0f93
+Revises: 5a7d3f9c2e18
+Create Date: 2026-10-19 15:18:44.209573
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4b2a6e0f93'
+down_revision = '5a7d3f9c2e18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tables = inspect(op.get_bind()).get_table_names()
+
+    if 'holidays' not in tables:
+        op.create_table(
+            'holidays',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('location', sa.String(length=100), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('location', 'date', name='unique_location_holiday')
+        )
+        op.create_index(op.f('ix_holidays_id'), 'holidays', ['id'], unique=False)
+        op.create_index(op.f('ix_holidays_date'), 'holidays', ['date'], unique=False)
+
+    if 'weekly_offs' not in tables:
+        op.create_table(
+            'weekly_offs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('location', sa.String(length=100), nullable=True),
+            sa.Column('weekday', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.CheckConstraint('weekday >= 0 AND weekday <= 6', name='valid_weekday'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('location', 'weekday', name='unique_location_weekday')
+        )
+        op.create_index(op.f('ix_weekly_offs_id'), 'weekly_offs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_weekly_offs_id'), table_name='weekly_offs')
+    op.drop_table('weekly_offs')
+    op.drop_index(op.f('ix_holidays_date'), table_name='holidays')
+    op.drop_index(op.f('ix_holidays_id'), table_name='holidays')
+    op.drop_table('holidays')
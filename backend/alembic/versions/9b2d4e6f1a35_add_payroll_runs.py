@@ -0,0 +1,70 @@
+"""add payroll runs
+
+Revision ID: 9b2d4e6f1a35
+Revises: 7c1e5a2b9d40
+Create Date: 2026-10-19 11:03:27.904316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2d4e6f1a35'
+down_revision = '7c1e5a2b9d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tables = inspect(op.get_bind()).get_table_names()
+
+    if 'payroll_runs' not in tables:
+        op.create_table(
+            'payroll_runs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('month', sa.String(length=7), nullable=False),
+            sa.Column('status', sa.String(length=10), nullable=False),
+            sa.Column('generate_payslips', sa.Boolean(), nullable=False),
+            sa.Column('chunk_size', sa.Integer(), nullable=False),
+            sa.Column('total_employees', sa.Integer(), nullable=False),
+            sa.Column('processed_employees', sa.Integer(), nullable=False),
+            sa.Column('skipped_employees', sa.Integer(), nullable=False),
+            sa.Column('failed_employees', sa.Integer(), nullable=False),
+            sa.Column('last_employee_id', sa.Integer(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('processed_by', sa.Integer(), nullable=True),
+            sa.CheckConstraint("status IN ('pending', 'running', 'completed', 'failed')", name='valid_payroll_run_status'),
+            sa.CheckConstraint("month ~ '^\\d{4}-\\d{2}$'", name='valid_payroll_run_month'),
+            sa.ForeignKeyConstraint(['processed_by'], ['employees.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_payroll_runs_id'), 'payroll_runs', ['id'], unique=False)
+
+    if 'payroll_run_errors' not in tables:
+        op.create_table(
+            'payroll_run_errors',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('run_id', sa.Integer(), nullable=False),
+            sa.Column('employee_id', sa.Integer(), nullable=True),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['run_id'], ['payroll_runs.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_payroll_run_errors_id'), 'payroll_run_errors', ['id'], unique=False)
+        op.create_index(op.f('ix_payroll_run_errors_run_id'), 'payroll_run_errors', ['run_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payroll_run_errors_run_id'), table_name='payroll_run_errors')
+    op.drop_index(op.f('ix_payroll_run_errors_id'), table_name='payroll_run_errors')
+    op.drop_table('payroll_run_errors')
+    op.drop_index(op.f('ix_payroll_runs_id'), table_name='payroll_runs')
+    op.drop_table('payroll_runs')
@@ -0,0 +1,30 @@
+"""add trigram indexes for employee search
+
+Revision ID: 9c2e4f7b1a56
+Revises: 7a3d5c1b9e42
+Create Date: 2026-10-19 19:48:31.402716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2e4f7b1a56'
+down_revision = '7a3d5c1b9e42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in ('name', 'phone', 'email'):
+        op.execute(f"""
+            CREATE INDEX IF NOT EXISTS ix_employees_{column}_trgm
+            ON employees USING gin ({column} gin_trgm_ops)
+        """)
+
+
+def downgrade() -> None:
+    for column in ('name', 'phone', 'email'):
+        op.execute(f"DROP INDEX IF EXISTS ix_employees_{column}_trgm")
@@ -0,0 +1,70 @@
+"""
+Archive command moving closed months of attendance and payroll out of Postgres.
+
+Months older than the retention window (ARCHIVE_RETENTION_MONTHS, or --before)
+are written to compressed columnar files under ARCHIVE_DIR and deleted from the
+database. The manifest lists every archived month.
+
+Examples:
+    python scripts/archive_history.py --archive
+    python scripts/archive_history.py --archive --before 2023-01 --table attendance
+    python scripts/archive_history.py --list
+"""
+import os
+import sys
+import argparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.session import SessionLocal
+from src.utils.archive import (
+    ARCHIVE_DIR,
+    ARCHIVE_MODELS,
+    archive_before,
+    archive_format,
+    load_manifest,
+    retention_cutoff
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed months of attendance and payroll")
+    parser.add_argument("--archive", action="store_true", help="Archive closed months")
+    parser.add_argument("--before", metavar="YYYY-MM",
+                        help="Archive months before this month (default: retention window)")
+    parser.add_argument("--table", action="append", choices=list(ARCHIVE_MODELS),
+                        help="Table to archive (repeatable; default: all)")
+    parser.add_argument("--list", action="store_true", help="List archived months")
+
+    args = parser.parse_args()
+
+    if not any([args.archive, args.list]):
+        parser.print_help()
+        return
+
+    if args.archive:
+        before = args.before or retention_cutoff()
+        print(f"Archiving months before {before} to {ARCHIVE_DIR} as {archive_format()}...")
+        db = SessionLocal()
+        try:
+            archived = archive_before(db, before, args.table)
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error archiving: {e}")
+            raise
+        finally:
+            db.close()
+        for table_name, months in archived.items():
+            print(f"✅ {table_name}: archived {len(months)} months {', '.join(months)}")
+
+    if args.list:
+        manifest = load_manifest()
+        for table_name in ARCHIVE_MODELS:
+            print(f"\n📋 Archived {table_name} months:")
+            for month, entry in sorted(manifest[table_name].items()):
+                print(f"  - {month}: {entry['rows']} rows ({entry['format']}, {entry['file']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for GET /employees/search.
+
+Inserts synthetic employees (100,000 by default) in a transaction, times
+``matching_employees`` for typical queries (prefix, substring, phone digits,
+misspelled names) and rolls everything back. Each query's median and 95th
+percentile latency is compared with the 50 ms target.
+
+Needs the database configured in .env, migrated to include the trigram indexes.
+
+Examples:
+    python scripts/benchmark_employee_search.py
+    python scripts/benchmark_employee_search.py --employees 20000 --iterations 50
+"""
+import os
+import sys
+import argparse
+import statistics
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from src.db.session import SessionLocal
+from src.api.employees import matching_employees
+
+TARGET_MS = 50
+
+QUERIES = ["ra", "Ramesh", "kumar", "Rmaesh Kumr", "98765", "bench4242@"]
+
+SEED_QUERY = text("""
+    INSERT INTO employees (name, email, phone, doj, designation, location, status)
+    SELECT
+        (ARRAY['Ramesh', 'Suresh', 'Anita', 'Priya', 'Vijay', 'Lakshmi', 'Arjun', 'Meena'])[1 + i % 8]
+            || ' ' || (ARRAY['Kumar', 'Sharma', 'Patel', 'Reddy', 'Singh', 'Nair'])[1 + (i / 8) % 6]
+            || ' ' || i,
+        'bench' || i || '@ops.example.com',
+        '9' || lpad(i::text, 9, '0'),
+        DATE '2020-01-01' + (i % 1500),
+        (ARRAY['Field Worker', 'Supervisor', 'Driver', 'Accountant'])[1 + i % 4],
+        (ARRAY['North Farm', 'South Farm', 'Packhouse'])[1 + i % 3],
+        'active'
+    FROM generate_series(1, :count) AS i
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the employee search")
+    parser.add_argument("--employees", type=int, default=100_000, help="Synthetic employees to insert")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per query")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"🌱 Inserting {args.employees} employees (rolled back afterwards)...")
+        db.execute(SEED_QUERY, {"count": args.employees})
+        db.execute(text("ANALYZE employees"))
+
+        slow = []
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                results = matching_employees(db, query)
+                timings.append((time.perf_counter() - started) * 1000)
+            median = statistics.median(timings)
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+            print(f"{query!r:>16}: {len(results):3d} results, median {median:6.2f} ms, p95 {p95:6.2f} ms")
+            if p95 > TARGET_MS:
+                slow.append(query)
+    finally:
+        db.rollback()
+        db.close()
+
+    if slow:
+        print(f"❌ Above {TARGET_MS} ms: {', '.join(slow)}")
+        sys.exit(1)
+    print(f"✅ Every query within {TARGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
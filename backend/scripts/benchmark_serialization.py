@@ -0,0 +1,101 @@
+"""
+Benchmark for the /attendance/detailed response serialization.
+
+Compares the previous path (``from_orm`` per row, field mutation, then FastAPI
+re-validating the list against ``response_model``) with the batch ``TypeAdapter``
+path used by the list endpoints. No database is needed: 1000 synthetic rows
+shaped like the detailed attendance query result are served from both routes.
+"""
+import os
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.schemas.attendance import AttendanceWithEmployee
+from src.utils.serialization import list_response
+
+ROWS = 1000
+ITERATIONS = 50
+
+
+def build_rows(count: int):
+    """Build synthetic attendance rows with joined employee fields."""
+    today = date.today()
+    rows = []
+    for i in range(count):
+        rows.append(SimpleNamespace(
+            id=i + 1,
+            employee_id=(i % 100) + 1,
+            date=today - timedelta(days=i % 365),
+            start_time=dt_time(8, 0),
+            end_time=dt_time(17, 0),
+            break_duration=timedelta(minutes=60),
+            total_hours=8.0,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            employee_name=f"Employee {i % 100}",
+            employee_designation="Field Worker"
+        ))
+    return rows
+
+
+def build_app(rows):
+    """Build an app exposing the legacy and the batch serialization paths."""
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=List[AttendanceWithEmployee])
+    def legacy():
+        response = []
+        for row in rows:
+            item = AttendanceWithEmployee.from_orm(row)
+            item.employee_name = row.employee_name
+            item.employee_designation = row.employee_designation
+            response.append(item)
+        return response
+
+    @app.get("/batch", response_model=List[AttendanceWithEmployee])
+    def batch():
+        return list_response(AttendanceWithEmployee, rows)
+
+    return app
+
+
+def run(client: TestClient, path: str) -> float:
+    """Return the mean request time in milliseconds for ``path``."""
+    client.get(path)  # warm up
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        response = client.get(path)
+        assert response.status_code == 200
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def main():
+    rows = build_rows(ROWS)
+    client = TestClient(build_app(rows))
+
+    legacy_body = client.get("/legacy").json()
+    batch_body = client.get("/batch").json()
+    if legacy_body != batch_body:
+        print("❌ Legacy and batch responses differ")
+        return
+
+    legacy_ms = run(client, "/legacy")
+    batch_ms = run(client, "/batch")
+
+    print(f"/attendance/detailed serialization, {ROWS} rows, {ITERATIONS} iterations")
+    print(f"  legacy (from_orm + response_model): {legacy_ms:8.2f} ms/request")
+    print(f"  batch  (TypeAdapter, single pass):  {batch_ms:8.2f} ms/request")
+    print(f"  speedup: {legacy_ms / batch_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark of the application's startup cost.
+
+* import: time to import the app (``main``) in a fresh interpreter, as on a cold
+  dyno start, and which heavy optional libraries got imported with it
+* init_db: time and SQL statements of the startup seed check (needs the database
+  configured in .env; skip with --skip-db)
+
+Examples:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --skip-db
+"""
+import os
+import sys
+import argparse
+import json
+import statistics
+import subprocess
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to the path
+sys.path.append(BACKEND_DIR)
+
+# Libraries that should only be imported when first used
+LAZY_MODULES = ["reportlab", "pyarrow"]
+
+IMPORT_SCRIPT = """
+import json, sys, time, warnings
+warnings.simplefilter("ignore")
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure_import():
+    """Import the app in a fresh interpreter; return the seconds taken and the lazy modules it loaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([BACKEND_DIR, os.path.join(BACKEND_DIR, "src")]))
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def measure_init_db():
+    """Run the startup seed check once; return the seconds taken and the SQL statements run."""
+    from sqlalchemy import event
+
+    from src.auth.init_db import init_db
+    from src.db.session import SessionLocal, engine
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        init_db(db)
+        db.commit()
+        return time.perf_counter() - started, len(statements)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the application's startup")
+    parser.add_argument("--runs", type=int, default=5, help="Measurements per step")
+    parser.add_argument("--skip-db", action="store_true", help="Only measure the import")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    loaded = sorted({name for _, modules in imports for name in modules})
+    print(f"⏱️  Import: median {statistics.median(seconds for seconds, _ in imports) * 1000:.0f} ms")
+    print(f"📦 Lazy libraries loaded at import: {', '.join(loaded) or 'none'}")
+
+    if not args.skip_db:
+        runs = [measure_init_db() for _ in range(args.runs)]
+        print(f"🌱 First init_db: {runs[0][0] * 1000:.1f} ms, {runs[0][1]} statements")
+        if len(runs) > 1:
+            median = statistics.median(seconds for seconds, _ in runs[1:])
+            print(f"🌱 Repeated init_db: median {median * 1000:.1f} ms, {runs[-1][1]} statements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Maintenance command for the monthly attendance partitions.
+
+Creates the partitions for the upcoming months (also done on every app start),
+lists the attached partitions and detaches old months.
+
+Examples:
+    python scripts/maintain_attendance_partitions.py --ensure --ahead 6
+    python scripts/maintain_attendance_partitions.py --list
+    python scripts/maintain_attendance_partitions.py --detach-before 2024-01
+"""
+import os
+import sys
+import argparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.session import engine
+from src.db.partitions import (
+    ATTENDANCE_PARTITIONS_AHEAD,
+    detach_partitions_before,
+    ensure_attendance_partitions,
+    is_partitioned,
+    list_partitions
+)
+from src.utils.dates import month_bounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain monthly attendance partitions")
+    parser.add_argument("--ensure", action="store_true", help="Create missing partitions for upcoming months")
+    parser.add_argument("--ahead", type=int, default=ATTENDANCE_PARTITIONS_AHEAD,
+                        help="Number of upcoming months to create partitions for")
+    parser.add_argument("--list", action="store_true", help="List attached partitions")
+    parser.add_argument("--detach-before", metavar="YYYY-MM",
+                        help="Detach partitions for months before this month")
+
+    args = parser.parse_args()
+
+    if not any([args.ensure, args.list, args.detach_before]):
+        parser.print_help()
+        return
+
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            print("❌ attendance is not partitioned; run `alembic upgrade head` first")
+            return
+
+        if args.ensure:
+            created = ensure_attendance_partitions(connection, months_ahead=args.ahead)
+            print(f"✅ Created {len(created)} partitions: {', '.join(created) or 'none'}")
+
+        if args.detach_before:
+            before, _ = month_bounds(args.detach_before)
+            detached = detach_partitions_before(connection, before)
+            print(f"✅ Detached {len(detached)} partitions: {', '.join(detached) or 'none'}")
+
+        if args.list:
+            print("\n📋 Attendance partitions:")
+            for name in list_partitions(connection):
+                print(f"  - {name}")
+
+
+if __name__ == "__main__":
+    main()
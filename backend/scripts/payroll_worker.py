@@ -0,0 +1,44 @@
+"""
+Worker process for payroll runs.
+
+Claims pending runs (and runs whose worker stopped sending heartbeats) and
+processes them chunk by chunk. Run it as a separate process with
+PAYROLL_RUN_IN_PROCESS=false on the web process.
+
+Examples:
+    python scripts/payroll_worker.py
+    python scripts/payroll_worker.py --once
+    python scripts/payroll_worker.py --poll-interval 10
+"""
+import os
+import sys
+import time
+import argparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.payroll_runs import process_payroll_run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process payroll runs")
+    parser.add_argument("--once", action="store_true", help="Process the available runs and exit")
+    parser.add_argument("--poll-interval", type=float, default=5.0,
+                        help="Seconds to wait between polls when no run is available")
+
+    args = parser.parse_args()
+
+    print("🚀 Payroll worker started")
+    while True:
+        run_id = process_payroll_run()
+        if run_id is not None:
+            print(f"✅ Payroll run {run_id} processed")
+            continue
+        if args.once:
+            break
+        time.sleep(args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
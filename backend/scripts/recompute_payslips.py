@@ -0,0 +1,42 @@
+"""
+Recompute payslips whose attendance or salary structure changed after generation.
+
+Unapproved payslips are re-derived in place; approved and paid payslips are left
+unchanged and flagged as stale.
+
+Examples:
+    python scripts/recompute_payslips.py
+    python scripts/recompute_payslips.py --month 2025-06
+"""
+import os
+import sys
+import argparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.session import SessionLocal
+from src.utils.payslip_recompute import recompute_dirty_payslips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute stale payslips")
+    parser.add_argument("--month", metavar="YYYY-MM", help="Only recompute payslips of this month")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = recompute_dirty_payslips(db, args.month)
+    finally:
+        db.close()
+
+    print(f"✅ Recomputed {result['recomputed']} payslips")
+    print(f"🚩 Flagged {result['flagged']} approved or paid payslips as stale")
+    print(f"🧹 Cleared {result['cleared']} markers without a payslip")
+    for failure in result["failed"]:
+        print(f"❌ Employee {failure['employee_id']} {failure['month']}: {failure['detail']}")
+
+
+if __name__ == "__main__":
+    main()
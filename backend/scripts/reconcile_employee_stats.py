@@ -0,0 +1,39 @@
+"""
+Reconcile the employee_stats counters with the attendance, payroll and payslip tables.
+
+The counters are kept up to date on write; this recomputes every employee's row
+and corrects any drift (e.g. from rows changed with raw SQL). Run it periodically,
+for example nightly from cron.
+
+Examples:
+    python scripts/reconcile_employee_stats.py
+"""
+import os
+import sys
+import argparse
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.session import SessionLocal
+from src.utils.employee_stats import reconcile_employee_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile the employee_stats counters")
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        corrected = reconcile_employee_stats(db)
+    finally:
+        db.close()
+
+    if corrected:
+        print(f"🔧 Corrected {corrected} employee stats rows")
+    else:
+        print("✅ Employee stats are consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Archived attendance history tests.
+
+Writes a one-month attendance archive into a temporary ARCHIVE_DIR and checks that:
+
+* a history range without a start date (unbounded) reaches the archive
+* a range starting after the last archived month does not
+* the archived rows are read back for an unbounded range
+* GET /attendance/employee/{id} without start_date includes the archived rows
+
+The endpoint test needs the database configured in .env (a temporary employee is
+created and deleted afterwards); skip it with --skip-db.
+
+Examples:
+    python scripts/test_archive_history.py
+    python scripts/test_archive_history.py --skip-db
+"""
+import os
+import sys
+import argparse
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+# The archive directory is read when the archive module is imported
+os.environ["ARCHIVE_DIR"] = tempfile.mkdtemp(prefix="hr_archive_test_")
+
+# Add the project root (and src, for the app's own imports) to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from src.utils.archive import (
+    ARCHIVE_DIR, ARCHIVE_MODELS, archive_format, archive_reaches, load_manifest, read_archived_attendance,
+    save_manifest, write_archive_file
+)
+
+ARCHIVED_MONTH = "2020-01"
+ARCHIVED_DATE = date(2020, 1, 15)
+
+def print_separator(title):
+    """Print a separator with a title."""
+    print("\n" + "=" * 50)
+    print(f" {title} ".center(50, "="))
+    print("=" * 50)
+
+def write_test_archive(employee_id):
+    """Archive one attendance row for the employee, as archive_month would."""
+    columns = [column.name for column in ARCHIVE_MODELS["attendance"].__table__.columns]
+    row = dict.fromkeys(columns)
+    row.update(
+        id=2 ** 31 - 1,
+        employee_id=employee_id,
+        date=ARCHIVED_DATE,
+        start_time=time(9, 0),
+        end_time=time(17, 0),
+        break_duration=timedelta(minutes=30),
+        total_hours=7.5,
+    )
+
+    file_format = archive_format()
+    os.makedirs(os.path.join(ARCHIVE_DIR, "attendance"), exist_ok=True)
+    relative_path = os.path.join("attendance", f"attendance_{ARCHIVED_MONTH}.{file_format}")
+    write_archive_file(os.path.join(ARCHIVE_DIR, relative_path), columns, [row], file_format)
+
+    manifest = load_manifest()
+    manifest["attendance"][ARCHIVED_MONTH] = {
+        "file": relative_path,
+        "format": file_format,
+        "rows": 1,
+        "archived_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    save_manifest(manifest)
+
+def test_archive_reaches():
+    """Unbounded and early ranges reach the archive, later ones do not."""
+    print_separator("ARCHIVE REACHES")
+
+    cases = [
+        (None, True),
+        (date(2019, 12, 1), True),
+        (date(2020, 1, 31), True),
+        (date(2020, 2, 1), False),
+    ]
+    ok = True
+    for start_date, expected in cases:
+        reaches = archive_reaches(start_date)
+        print(f"start_date={start_date}: {reaches}")
+        ok = ok and reaches == expected
+
+    print("OK" if ok else "FAILED: expected only ranges starting before February 2020 to reach the archive")
+    return ok
+
+def test_read_unbounded(employee_id):
+    """Reading without a date range returns the archived row."""
+    print_separator("READ ARCHIVED ROWS")
+
+    rows = read_archived_attendance(employee_id)
+    print(f"Archived rows: {[(row['employee_id'], row['date']) for row in rows]}")
+
+    ok = [row["date"] for row in rows] == [ARCHIVED_DATE]
+    print("OK" if ok else "FAILED: expected the archived row")
+    return ok
+
+def test_unbounded_history(employee_id):
+    """The full history of an employee (no start_date) includes the archived rows."""
+    print_separator("UNBOUNDED HISTORY")
+
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    response = TestClient(app).get(f"/attendance/employee/{employee_id}")
+    dates = [record["date"] for record in response.json()] if response.status_code == 200 else []
+    print(f"{response.status_code}: {len(dates)} records, first {dates[0] if dates else None}")
+
+    ok = ARCHIVED_DATE.isoformat() in dates
+    print("OK" if ok else "FAILED: expected the archived record in the unbounded history")
+    return ok
+
+def create_test_employee():
+    """Create a temporary employee with a unique phone number."""
+    from src.db.session import SessionLocal
+    from src.models.employee import Employee
+
+    db = SessionLocal()
+    try:
+        employee = Employee(
+            name="Archive Test",
+            phone=datetime.now().strftime("8%d%H%M%S%f")[:15],
+            doj=date(2019, 1, 1),
+            designation="Tester",
+            location="Test",
+            status="active"
+        )
+        db.add(employee)
+        db.commit()
+        db.refresh(employee)
+        return employee.id
+    finally:
+        db.close()
+
+def delete_test_employee(employee_id):
+    """Delete the temporary employee."""
+    from sqlalchemy import text
+    from src.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM employees WHERE id = :employee_id"), {"employee_id": employee_id})
+        db.commit()
+    finally:
+        db.close()
+
+def run_tests():
+    """Run all tests."""
+    parser = argparse.ArgumentParser(description="Archived attendance history tests")
+    parser.add_argument("--skip-db", action="store_true", help="Skip the tests that need the database")
+    args = parser.parse_args()
+
+    employee_id = None if args.skip_db else create_test_employee()
+    try:
+        archived_employee_id = employee_id or 1
+        write_test_archive(archived_employee_id)
+        results = [test_archive_reaches(), test_read_unbounded(archived_employee_id)]
+        if employee_id is not None:
+            results.append(test_unbounded_history(employee_id))
+    finally:
+        if employee_id is not None:
+            delete_test_employee(employee_id)
+
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,206 @@
+"""
+Concurrency test for the constraint-driven create endpoints.
+
+Fires parallel duplicate POST /attendance/ and POST /payroll/ requests for
+temporary employees and checks that:
+
+* exactly one request creates the row (201) and every duplicate gets the
+  endpoint's 400 "already exists" response (no 500s from constraint races)
+* on the partitioned attendance table, whose duplicates are reported under the
+  partition's index name, a sequential duplicate also gets 400
+* only one row is stored
+* an unknown employee gets 404
+* a create takes at most MAX_STATEMENTS["created"] SQL statements and a
+  duplicate at most MAX_STATEMENTS["duplicate"]
+
+Needs the database configured in .env; the temporary employees and their rows are
+deleted afterwards.
+
+Examples:
+    python scripts/test_concurrent_inserts.py
+    python scripts/test_concurrent_inserts.py --workers 32
+"""
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+# Add the project root (and src, for the app's own imports) to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from src.db.partitions import is_partitioned
+from src.db.session import SessionLocal, engine
+from src.models.employee import Employee
+from src.main import app
+
+# SQL statements allowed per request: insert + refresh, plus for attendance the
+# payslip dirty tracking and the employee_stats update (both in the insert's transaction)
+MAX_STATEMENTS = {"created": 4, "duplicate": 1}
+
+statement_count = {"value": 0}
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statement_count["value"] += 1
+
+def print_separator(title):
+    """Print a separator with a title."""
+    print("\n" + "=" * 50)
+    print(f" {title} ".center(50, "="))
+    print("=" * 50)
+
+def create_test_employee():
+    """Create a temporary employee with a unique phone number."""
+    db = SessionLocal()
+    try:
+        employee = Employee(
+            name="Concurrency Test",
+            phone=datetime.now().strftime("9%d%H%M%S%f")[:15],
+            doj=date(2020, 1, 1),
+            designation="Tester",
+            location="Test",
+            status="active"
+        )
+        db.add(employee)
+        db.commit()
+        db.refresh(employee)
+        return employee.id
+    finally:
+        db.close()
+
+def delete_test_employee(employee_id):
+    """Delete the temporary employee and everything recorded for it."""
+    db = SessionLocal()
+    try:
+        params = {"employee_id": employee_id}
+        db.execute(text("DELETE FROM payslip_dirty_months WHERE employee_id = :employee_id"), params)
+        db.execute(text("DELETE FROM payroll WHERE employee_id = :employee_id"), params)
+        db.execute(text("DELETE FROM attendance WHERE employee_id = :employee_id"), params)
+        db.execute(text("DELETE FROM employees WHERE id = :employee_id"), params)
+        db.commit()
+    finally:
+        db.close()
+
+def test_parallel_duplicates(client, name, path, payload, table, key_column, key_value, workers):
+    """Send the same create request from many threads at once."""
+    print_separator(f"PARALLEL DUPLICATE {name.upper()}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        responses = list(executor.map(lambda _: client.post(path, json=payload), range(workers)))
+
+    statuses = sorted(response.status_code for response in responses)
+    created = statuses.count(201)
+    rejected = statuses.count(400)
+    print(f"Statuses: {statuses}")
+
+    db = SessionLocal()
+    try:
+        stored = db.execute(
+            text(f"SELECT COUNT(*) FROM {table} WHERE employee_id = :employee_id AND {key_column} = :key"),
+            {"employee_id": payload["employee_id"], "key": key_value}
+        ).scalar()
+    finally:
+        db.close()
+    print(f"Rows stored: {stored}")
+
+    ok = created == 1 and rejected == workers - 1 and stored == 1
+    print("OK" if ok else "FAILED: expected one 201, only 400s otherwise, and one stored row")
+    return ok
+
+def test_partitioned_duplicate(client, payload):
+    """A repeated attendance create on the partitioned table gets 400, not 500."""
+    print_separator("DUPLICATE ON PARTITIONED ATTENDANCE")
+
+    with engine.connect() as connection:
+        partitioned = is_partitioned(connection)
+        partition = connection.execute(
+            text("SELECT tableoid::regclass::text FROM attendance WHERE employee_id = :employee_id AND date = :date"),
+            {"employee_id": payload["employee_id"], "date": payload["date"]}
+        ).scalar()
+    print(f"Partitioned: {partitioned}, existing row in: {partition}")
+
+    response = client.post("/attendance/", json=payload)
+    print(f"{response.status_code}: {response.json()}")
+
+    ok = partitioned and partition is not None and response.status_code == 400
+    print("OK" if ok else "FAILED: expected a partitioned table, an existing row and 400")
+    return ok
+
+def count_statements(client, path, payload):
+    """Send one request and return its response and the number of SQL statements it ran."""
+    statement_count["value"] = 0
+    response = client.post(path, json=payload)
+    return response, statement_count["value"]
+
+def test_statement_counts(client, name, path, payload):
+    """Check the number of SQL statements of a create and of a duplicate of it."""
+    print_separator(f"STATEMENT COUNT {name.upper()}")
+
+    created, created_statements = count_statements(client, path, payload)
+    duplicate, duplicate_statements = count_statements(client, path, payload)
+    print(f"Create: {created.status_code} in {created_statements} statements")
+    print(f"Duplicate: {duplicate.status_code} in {duplicate_statements} statements")
+
+    ok = (
+        created.status_code == 201 and created_statements <= MAX_STATEMENTS["created"]
+        and duplicate.status_code == 400 and duplicate_statements <= MAX_STATEMENTS["duplicate"]
+    )
+    print("OK" if ok else f"FAILED: expected at most {MAX_STATEMENTS} statements")
+    return ok
+
+def test_unknown_employee(client, path, payload):
+    """A create for an employee that does not exist gets 404."""
+    print_separator("UNKNOWN EMPLOYEE")
+
+    response = client.post(path, json={**payload, "employee_id": 2 ** 31 - 1})
+    print(f"{response.status_code}: {response.json()}")
+
+    ok = response.status_code == 404
+    print("OK" if ok else "FAILED: expected 404")
+    return ok
+
+def run_tests():
+    """Run all tests."""
+    parser = argparse.ArgumentParser(description="Concurrency test for create endpoints")
+    parser.add_argument("--workers", type=int, default=16, help="Parallel duplicate requests")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    # One employee for the parallel duplicates, one for the statement counts
+    employee_id = create_test_employee()
+    counted_employee_id = create_test_employee()
+    today = date.today()
+    month = today.strftime("%Y-%m")
+
+    attendance = {"employee_id": employee_id, "date": today.isoformat(), "start_time": "09:00:00"}
+    payroll = {"employee_id": employee_id, "month": month, "salary_total": 1000}
+    counted_attendance = {**attendance, "employee_id": counted_employee_id}
+    counted_payroll = {**payroll, "employee_id": counted_employee_id}
+
+    try:
+        results = [
+            test_parallel_duplicates(client, "attendance", "/attendance/", attendance,
+                                     "attendance", "date", today, args.workers),
+            test_parallel_duplicates(client, "payroll", "/payroll/", payroll,
+                                     "payroll", "month", month, args.workers),
+            # Runs after the parallel test, which stored the row
+            test_partitioned_duplicate(client, attendance),
+            test_statement_counts(client, "attendance", "/attendance/", counted_attendance),
+            test_statement_counts(client, "payroll", "/payroll/", counted_payroll),
+            test_unknown_employee(client, "/attendance/", attendance),
+            test_unknown_employee(client, "/payroll/", payroll),
+        ]
+    finally:
+        delete_test_employee(employee_id)
+        delete_test_employee(counted_employee_id)
+
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_tests()
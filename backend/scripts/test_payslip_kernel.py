@@ -0,0 +1,136 @@
+"""
+Property test for the payslip computation kernel.
+
+Generates random payslip inputs (plus edge cases such as zero working days,
+no attendance and exact half-paisa ties) and checks that:
+
+* the vectorized NumPy kernel returns exactly the scalar implementation's amounts
+* the scalar amounts equal exact rational arithmetic rounded half up to the paisa
+
+Runs without a database.
+
+Examples:
+    python scripts/test_payslip_kernel.py
+    python scripts/test_payslip_kernel.py --cases 100000 --seed 7
+"""
+import os
+import sys
+import random
+import argparse
+from fractions import Fraction
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import payslip_kernel
+from src.utils.payslip_kernel import AMOUNT_FIELDS, PayslipInputs, compute_payslip, compute_payslips
+
+def print_separator(title):
+    """Print a separator with a title."""
+    print("\n" + "=" * 50)
+    print(f" {title} ".center(50, "="))
+    print("=" * 50)
+
+def round_half_up(value):
+    """Round a non-negative Fraction half up to an integer"""
+    return int(value + Fraction(1, 2))
+
+def exact_payslip(inputs):
+    """The payslip amounts computed with exact fractions"""
+    expected = Fraction(inputs.working_days * payslip_kernel.STANDARD_DAILY_HOURS)
+    regular_hours = Fraction(inputs.regular_hours, 100)
+    overtime_hours = Fraction(inputs.overtime_hours, 100)
+    multiplier = Fraction(payslip_kernel.OVERTIME_NUMERATOR, payslip_kernel.OVERTIME_DENOMINATOR)
+
+    hourly_rate = inputs.basic_salary / expected if expected else Fraction(0)
+    worked_fraction = min(regular_hours, expected) / expected if expected else Fraction(0)
+
+    overtime_amount = round_half_up(overtime_hours * hourly_rate * multiplier)
+    gross_amount = round_half_up(inputs.gross_salary * worked_fraction) + overtime_amount
+    return {
+        "leave_days": max(0, inputs.working_days - inputs.days_present),
+        "overtime_hours": inputs.overtime_hours,
+        "overtime_rate": round_half_up(hourly_rate * multiplier),
+        "overtime_amount": overtime_amount,
+        "gross_amount": gross_amount,
+        "total_deductions": inputs.deductions,
+        "net_amount": gross_amount - inputs.deductions,
+    }
+
+def random_inputs(rng):
+    """Random inputs within the ranges of the database columns"""
+    working_days = rng.choice([0, 20, 21, 22, 23, rng.randint(0, 31)])
+    basic_salary = rng.choice([0, rng.randint(0, 10 ** 6), rng.randint(0, 10 ** 10 - 1)])
+    gross_salary = basic_salary + rng.randint(0, 10 ** 7)
+    days_present = rng.randint(0, 31)
+    regular_hours = rng.choice([
+        0,
+        working_days * 800,  # exactly the expected hours
+        rng.randint(0, days_present * 800),
+    ])
+    overtime_hours = rng.choice([0, rng.randint(0, days_present * (9999 - 800))])
+    return PayslipInputs(
+        basic_salary=basic_salary,
+        gross_salary=gross_salary,
+        deductions=rng.randint(0, gross_salary),
+        regular_hours=regular_hours,
+        overtime_hours=overtime_hours,
+        days_present=days_present,
+        working_days=working_days
+    )
+
+def edge_cases():
+    """Hand-picked inputs: no working days, no attendance, half-paisa ties, short days"""
+    return [
+        PayslipInputs(0, 0, 0, 0, 0, 0, 0),
+        PayslipInputs(1000000, 1500000, 100000, 0, 0, 0, 22),
+        PayslipInputs(1000000, 1500000, 100000, 800, 200, 1, 0),
+        # 176 hours expected; 1 paisa x 1.5 / 176 rounds to 0, 88 paise x 1.5 / 176 is a tie
+        PayslipInputs(1, 1, 0, 17600, 100, 22, 22),
+        PayslipInputs(88, 88, 0, 17600, 100, 22, 22),
+        # Short days: fewer regular hours than expected, with daily overtime on other days
+        PayslipInputs(1000000, 1500000, 0, 16000, 1200, 22, 22),
+        PayslipInputs(9999999999, 9999999999, 0, 31 * 800, 31 * (9999 - 800), 31, 31),
+    ]
+
+def test_kernel(cases, seed):
+    """Compare the vectorized, scalar and exact computations."""
+    print_separator("PAYSLIP KERNEL PROPERTY TEST")
+
+    if payslip_kernel.numpy is None:
+        print("numpy is not installed; the vectorized path falls back to the scalar loop.")
+
+    rng = random.Random(seed)
+    inputs = edge_cases() + [random_inputs(rng) for _ in range(cases)]
+
+    vectorized = compute_payslips(inputs)
+    failures = 0
+    for index, row in enumerate(inputs):
+        scalar = compute_payslip(row)
+        exact = exact_payslip(row)
+        for field in AMOUNT_FIELDS:
+            if not (vectorized[field][index] == scalar[field] == exact[field]):
+                failures += 1
+                if failures <= 10:
+                    print(f"Mismatch in {field} for {row}: vectorized={vectorized[field][index]} "
+                          f"scalar={scalar[field]} exact={exact[field]}")
+
+    if failures:
+        print(f"FAILED: {failures} mismatches in {len(inputs)} cases (seed {seed})")
+        return False
+
+    print(f"OK: {len(inputs)} cases match (seed {seed})")
+    return True
+
+def run_tests():
+    """Run all tests."""
+    parser = argparse.ArgumentParser(description="Property test for the payslip kernel")
+    parser.add_argument("--cases", type=int, default=20000, help="Number of random cases")
+    parser.add_argument("--seed", type=int, default=random.randrange(10 ** 6), help="Random seed")
+    args = parser.parse_args()
+
+    if not test_kernel(args.cases, args.seed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,89 @@
+"""
+Startup regression tests.
+
+Checks that:
+
+* importing the app stays within the import time budget
+* ReportLab and pyarrow are not imported at startup (only when first used)
+* once seeded, the startup seed check (init_db) is a single SQL statement
+
+The init_db test needs the database configured in .env; skip it with --skip-db.
+
+Examples:
+    python scripts/test_startup.py
+    python scripts/test_startup.py --import-budget 2.5 --skip-db
+"""
+import os
+import sys
+import argparse
+import statistics
+
+# Add the scripts directory (for the benchmark's measurements) to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_startup import measure_import, measure_init_db
+
+# Statements of init_db once the seed version marker is current
+MAX_SEEDED_STATEMENTS = 1
+
+def print_separator(title):
+    """Print a separator with a title."""
+    print("\n" + "=" * 50)
+    print(f" {title} ".center(50, "="))
+    print("=" * 50)
+
+def test_import_time(budget, runs):
+    """The median import time of the app is within the budget."""
+    print_separator("IMPORT TIME")
+
+    median = statistics.median(measure_import()[0] for _ in range(runs))
+    print(f"Median import: {median:.2f} s (budget {budget:.2f} s)")
+
+    ok = median <= budget
+    print("OK" if ok else "FAILED: importing the app got slower than the budget")
+    return ok
+
+def test_lazy_imports():
+    """Heavy optional libraries are not imported with the app."""
+    print_separator("LAZY IMPORTS")
+
+    _, loaded = measure_import()
+    print(f"Loaded at import: {', '.join(loaded) or 'none'}")
+
+    ok = not loaded
+    print("OK" if ok else "FAILED: import these libraries where they are used")
+    return ok
+
+def test_init_db_fast_path():
+    """After seeding, init_db only checks the seed version marker."""
+    print_separator("INIT_DB FAST PATH")
+
+    first_seconds, first_statements = measure_init_db()
+    seconds, statements = measure_init_db()
+    print(f"First run: {first_statements} statements in {first_seconds * 1000:.1f} ms")
+    print(f"Second run: {statements} statements in {seconds * 1000:.1f} ms")
+
+    ok = statements <= MAX_SEEDED_STATEMENTS
+    print("OK" if ok else f"FAILED: expected at most {MAX_SEEDED_STATEMENTS} statements once seeded")
+    return ok
+
+def run_tests():
+    """Run all tests."""
+    parser = argparse.ArgumentParser(description="Startup regression tests")
+    parser.add_argument("--import-budget", type=float, default=3.0, help="Maximum median import time (seconds)")
+    parser.add_argument("--runs", type=int, default=3, help="Imports measured for the median")
+    parser.add_argument("--skip-db", action="store_true", help="Skip the tests that need the database")
+    args = parser.parse_args()
+
+    results = [
+        test_import_time(args.import_budget, args.runs),
+        test_lazy_imports(),
+    ]
+    if not args.skip_db:
+        results.append(test_init_db_fast_path())
+
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_tests()
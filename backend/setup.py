@@ -16,17 +16,28 @@ sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
 from src.db.base_class import Base
 from src.db.session import engine, SessionLocal
+from src.db.extensions import ensure_extensions
+from src.db.partitions import ensure_attendance_partitions
 
 # Import all models to ensure they're registered with SQLAlchemy
-from src.models.employee import Employee
+from src.models.employee import Employee, EmployeeStats
 from src.models.attendance import Attendance
-from src.models.payroll import Payroll
-from src.models.salary import SalaryStructure, Payslip
+from src.models.payroll import Payroll, PayrollRun, PayrollRunError
+from src.models.salary import SalaryStructure, Payslip, PayslipDirtyMonth
+from src.models.calendar import Holiday, WeeklyOff
+from src.models.idempotency import IdempotencyKey
+from src.models.seed import SeedVersion
 
 def create_tables():
     """Create all tables in the database"""
     print("Creating tables...")
+    # The employee search indexes need pg_trgm (dropped with the schema on --reset)
+    with engine.begin() as connection:
+        ensure_extensions(connection)
     Base.metadata.create_all(bind=engine)
+    # attendance is partitioned by month and needs its partitions before any insert
+    with engine.begin() as connection:
+        ensure_attendance_partitions(connection)
     print("Tables created successfully!")
 
 def drop_tables():
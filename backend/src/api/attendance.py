@@ -1,26 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import date, datetime, time
+from sqlalchemy import select
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import date, datetime, time, timedelta
 
-from src.db.session import get_db
+from src.db.partitions import UNIQUE_CONSTRAINT_PATTERN
+from src.db.session import get_db, get_read_db
+from src.db.writes import insert_unique
 from src.models.attendance import Attendance
 from src.models.employee import Employee
-from src.schemas.attendance import AttendanceCreate, AttendanceUpdate, Attendance as AttendanceSchema, AttendanceWithEmployee
+from src.schemas.attendance import (
+    AttendanceCreate, AttendanceUpdate, Attendance as AttendanceSchema, AttendanceWithEmployee, AttendanceMonthlySummary
+)
+from src.utils.serialization import (
+    extra_columns, list_response, model_columns, select_fields, stream_json_array, stream_ndjson
+)
+from src.utils.archive import archive_reaches, read_archived_attendance
+from src.utils.attendance_analytics import monthly_hours
 
 router = APIRouter()
 
+# Rows fetched per round trip when streaming an employee's attendance history
+ATTENDANCE_STREAM_BATCH_SIZE = int(os.getenv("ATTENDANCE_STREAM_BATCH_SIZE", "500"))
+
+def history_chunks(
+    db: Session,
+    live_filters: list,
+    archived: List[Dict[str, Any]],
+    live_limit: Optional[int]
+) -> Iterator[list]:
+    """
+    Yield an employee's attendance in date order, in chunks: the archived records,
+    then the live ones read through a server-side cursor (``yield_per``) along the
+    (employee_id, date) unique index
+    """
+    for start in range(0, len(archived), ATTENDANCE_STREAM_BATCH_SIZE):
+        yield archived[start:start + ATTENDANCE_STREAM_BATCH_SIZE]
+    if live_limit == 0:
+        return
+    
+    query = select(*model_columns(Attendance, AttendanceSchema))\
+        .where(*live_filters).order_by(Attendance.date).limit(live_limit)
+    result = db.execute(
+        query, execution_options={"stream_results": True, "yield_per": ATTENDANCE_STREAM_BATCH_SIZE}
+    )
+    for rows in result.partitions():
+        yield rows
+
+def history_next_cursor(
+    db: Session,
+    live_filters: list,
+    archived: List[Dict[str, Any]],
+    live_limit: int,
+    more_archived: bool
+) -> Optional[date]:
+    """The date of the page's last record when more records follow it, otherwise None"""
+    if more_archived:
+        return archived[-1]["date"]
+    if live_limit == 0:
+        more_live = db.execute(select(Attendance.date).where(*live_filters).limit(1)).first()
+        return archived[-1]["date"] if more_live else None
+    
+    # The page's last live date and the one after it, if any (an index-only scan)
+    dates = db.execute(
+        select(Attendance.date).where(*live_filters)
+        .order_by(Attendance.date).offset(live_limit - 1).limit(2)
+    ).scalars().all()
+    return dates[0] if len(dates) == 2 else None
+
 @router.get("", response_model=List[AttendanceSchema])
 def get_attendance_records(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Retrieve all attendance records with pagination
+    Retrieve all attendance records with pagination.
+    ``fields`` (comma separated) limits the fields returned.
     """
-    attendance_records = db.query(Attendance).offset(skip).limit(limit).all()
-    return attendance_records
+    schema = select_fields(AttendanceSchema, fields)
+    attendance_records = db.query(*model_columns(Attendance, schema)).offset(skip).limit(limit).all()
+    return list_response(schema, attendance_records)
 
 @router.get("/detailed", response_model=List[AttendanceWithEmployee])
 def get_detailed_attendance_records(
@@ -28,14 +91,22 @@ def get_detailed_attendance_records(
     limit: int = 100, 
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Retrieve all attendance records with employee details and date filtering
+    Retrieve all attendance records with employee details and date filtering.
+    ``fields`` (comma separated) limits the fields returned.
     """
-    # Start with base query
-    query = db.query(Attendance, Employee.name, Employee.designation)\
-        .join(Employee, Attendance.employee_id == Employee.id)
+    # Start with base query, selecting the requested employee fields alongside the attendance columns
+    schema = select_fields(AttendanceWithEmployee, fields)
+    employee_columns = extra_columns(schema, {
+        "employee_name": Employee.name,
+        "employee_designation": Employee.designation
+    })
+    query = db.query(*model_columns(Attendance, schema), *employee_columns)
+    if employee_columns:
+        query = query.join(Employee, Attendance.employee_id == Employee.id)
     
     # Apply date filters if provided
     if start_date:
@@ -46,15 +117,21 @@ def get_detailed_attendance_records(
     # Apply pagination
     results = query.order_by(Attendance.date.desc()).offset(skip).limit(limit).all()
     
-    # Format response
-    response = []
-    for attendance, emp_name, emp_designation in results:
-        attendance_dict = AttendanceWithEmployee.from_orm(attendance)
-        attendance_dict.employee_name = emp_name
-        attendance_dict.employee_designation = emp_designation
-        response.append(attendance_dict)
-    
-    return response
+    return list_response(schema, results)
+
+@router.get("/summary", response_model=List[AttendanceMonthlySummary])
+def get_monthly_attendance_summary(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Per-employee hours for a month: regular and overtime hours (split per day),
+    night and weekend hours
+    """
+    summaries = monthly_hours(db, month, skip=skip, limit=limit)
+    return list_response(AttendanceMonthlySummary, [summary._asdict() for summary in summaries])
 
 @router.post("/", response_model=AttendanceSchema, status_code=status.HTTP_201_CREATED)
 def create_attendance_record(
@@ -64,23 +141,6 @@ def create_attendance_record(
     """
     Create a new attendance record
     """
-    # Check if employee exists
-    employee = db.query(Employee).filter(Employee.id == attendance.employee_id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Check if attendance record already exists for this employee on this date
-    existing_record = db.query(Attendance).filter(
-        Attendance.employee_id == attendance.employee_id,
-        Attendance.date == attendance.date
-    ).first()
-    
-    if existing_record:
-        raise HTTPException(
-            status_code=400, 
-            detail="Attendance record already exists for this employee on this date"
-        )
-    
     # Calculate total hours if end_time is provided
     total_hours = None
     if attendance.end_time and attendance.start_time:
@@ -108,10 +168,13 @@ def create_attendance_record(
         total_hours=total_hours
     )
     
-    db.add(db_attendance)
-    db.commit()
-    db.refresh(db_attendance)
-    return db_attendance
+    # The unique and foreign key constraints catch duplicates and unknown employees
+    # (a duplicate is reported under the index of the partition holding the date)
+    return insert_unique(
+        db, db_attendance, UNIQUE_CONSTRAINT_PATTERN,
+        conflict_detail="Attendance record already exists for this employee on this date",
+        not_found_detail="Employee not found"
+    )
 
 @router.get("/{attendance_id}", response_model=AttendanceSchema)
 def get_attendance_record(
@@ -131,25 +194,64 @@ def get_employee_attendance(
     employee_id: int, 
     start_date: date = None, 
     end_date: date = None, 
-    db: Session = Depends(get_db)
+    after: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    response_format: str = Query("json", alias="format", pattern=r"^(json|ndjson)$"),
+    db: Session = Depends(get_read_db)
 ):
     """
-    Retrieve attendance records for a specific employee with optional date filtering
+    Retrieve attendance records for a specific employee in date order, with optional date filtering.
+    
+    The records are streamed as they are read, as a JSON array or, with
+    ``format=ndjson``, one JSON object per line. To page through a long history,
+    pass ``limit``: when more records follow, the ``X-Next-Cursor`` response header
+    holds the date to send as ``after`` for the next page.
+    
+    When start_date reaches back into months moved to the cold archive, the archived
+    records are included (before the live ones).
     """
     # Check if employee exists
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
-    if not employee:
+    if db.query(Employee.id).filter(Employee.id == employee_id).first() is None:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    # Base query
-    query = db.query(Attendance).filter(Attendance.employee_id == employee_id)
+    # Decided by the requested range, so every page of it includes the archive or none does
+    include_archive = archive_reaches(start_date)
     
-    # Apply date filters if provided
+    # Resume after the cursor (dates are unique per employee)
+    if after is not None and (start_date is None or after >= start_date):
+        start_date = after + timedelta(days=1)
+    
+    live_filters = [Attendance.employee_id == employee_id]
     if start_date:
-        query = query.filter(Attendance.date >= start_date)
+        live_filters.append(Attendance.date >= start_date)
     if end_date:
-        query = query.filter(Attendance.date <= end_date)
+        live_filters.append(Attendance.date <= end_date)
     
-    # Execute query
-    attendance_records = query.all()
-    return attendance_records
+    archived = []
+    if include_archive:
+        archived = read_archived_attendance(employee_id, start_date, end_date)
+    if archived:
+        # Live records replace archived ones of the same date (back-dated entries)
+        live_dates = set(db.execute(
+            select(Attendance.date).where(*live_filters, Attendance.date <= archived[-1]["date"])
+        ).scalars())
+        archived = [record for record in archived if record["date"] not in live_dates]
+    
+    headers = {}
+    live_limit = None
+    if limit is not None:
+        more_archived = len(archived) > limit
+        archived = archived[:limit]
+        live_limit = limit - len(archived)
+        next_cursor = history_next_cursor(db, live_filters, archived, live_limit, more_archived)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor.isoformat()
+    
+    chunks = history_chunks(db, live_filters, archived, live_limit)
+    if response_format == "ndjson":
+        return StreamingResponse(
+            stream_ndjson(AttendanceSchema, chunks), media_type="application/x-ndjson", headers=headers
+        )
+    return StreamingResponse(
+        stream_json_array(AttendanceSchema, chunks), media_type="application/json", headers=headers
+    )
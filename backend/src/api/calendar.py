@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from src.db.session import get_db, get_read_db
+from src.models.calendar import Holiday, WeeklyOff
+from src.schemas.calendar import (
+    HolidayCreate,
+    Holiday as HolidaySchema,
+    WeeklyOffCreate,
+    WeeklyOff as WeeklyOffSchema,
+    WorkingDays
+)
+from src.utils.serialization import list_response
+from src.utils.work_calendar import invalidate_calendar, working_days
+
+router = APIRouter()
+
+@router.get("/holidays", response_model=List[HolidaySchema])
+def get_holidays(
+    location: Optional[str] = None,
+    year: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retrieve holidays, optionally for one location (including holidays for all locations) and year
+    """
+    query = db.query(Holiday)
+    if location:
+        query = query.filter((Holiday.location == location) | (Holiday.location.is_(None)))
+    if year:
+        query = query.filter(Holiday.date >= date(year, 1, 1), Holiday.date < date(year + 1, 1, 1))
+
+    holidays = query.order_by(Holiday.date).offset(skip).limit(limit).all()
+    return list_response(HolidaySchema, holidays)
+
+@router.post("/holidays", response_model=HolidaySchema, status_code=status.HTTP_201_CREATED)
+def create_holiday(holiday: HolidayCreate, db: Session = Depends(get_db)):
+    """
+    Create a holiday for a location, or for all locations when no location is given
+    """
+    existing = db.query(Holiday).filter(
+        Holiday.date == holiday.date,
+        Holiday.location.is_(None) if holiday.location is None else Holiday.location == holiday.location
+    ).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Holiday already exists for this location and date")
+
+    db_holiday = Holiday(**holiday.dict())
+    db.add(db_holiday)
+    db.commit()
+    db.refresh(db_holiday)
+    invalidate_calendar()
+    return db_holiday
+
+@router.delete("/holidays/{holiday_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_holiday(holiday_id: int, db: Session = Depends(get_db)):
+    """
+    Delete a holiday
+    """
+    db_holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
+    if not db_holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+
+    db.delete(db_holiday)
+    db.commit()
+    invalidate_calendar()
+    return None
+
+@router.get("/weekly-offs", response_model=List[WeeklyOffSchema])
+def get_weekly_offs(location: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """
+    Retrieve weekly offs, optionally for one location (including the defaults)
+    """
+    query = db.query(WeeklyOff)
+    if location:
+        query = query.filter((WeeklyOff.location == location) | (WeeklyOff.location.is_(None)))
+
+    weekly_offs = query.order_by(WeeklyOff.location, WeeklyOff.weekday).all()
+    return list_response(WeeklyOffSchema, weekly_offs)
+
+@router.post("/weekly-offs", response_model=WeeklyOffSchema, status_code=status.HTTP_201_CREATED)
+def create_weekly_off(weekly_off: WeeklyOffCreate, db: Session = Depends(get_db)):
+    """
+    Add a weekly off for a location, or to the defaults when no location is given
+    """
+    existing = db.query(WeeklyOff).filter(
+        WeeklyOff.weekday == weekly_off.weekday,
+        WeeklyOff.location.is_(None) if weekly_off.location is None else WeeklyOff.location == weekly_off.location
+    ).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Weekly off already exists for this location and weekday")
+
+    db_weekly_off = WeeklyOff(**weekly_off.dict())
+    db.add(db_weekly_off)
+    db.commit()
+    db.refresh(db_weekly_off)
+    invalidate_calendar()
+    return db_weekly_off
+
+@router.delete("/weekly-offs/{weekly_off_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_weekly_off(weekly_off_id: int, db: Session = Depends(get_db)):
+    """
+    Delete a weekly off
+    """
+    db_weekly_off = db.query(WeeklyOff).filter(WeeklyOff.id == weekly_off_id).first()
+    if not db_weekly_off:
+        raise HTTPException(status_code=404, detail="Weekly off not found")
+
+    db.delete(db_weekly_off)
+    db.commit()
+    invalidate_calendar()
+    return None
+
+@router.get("/working-days", response_model=WorkingDays)
+def get_working_days(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    location: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Number of working days in a month at a location (weekly offs and holidays excluded)
+    """
+    return WorkingDays(location=location, month=month, working_days=working_days(db, location, month))
@@ -1,24 +1,147 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import case, func, literal, or_, select
 from typing import List, Optional
 from datetime import date
 
-from src.db.session import get_db
-from src.models.employee import Employee
-from src.models.attendance import Attendance
+from src.db.session import get_db, get_read_db
+from src.db.writes import etag, parse_if_match, update_versioned
+from src.models.employee import Employee, EmployeeStats
 from src.models.payroll import Payroll
-from src.schemas.employee import EmployeeCreate, EmployeeUpdate, Employee as EmployeeSchema, EmployeeWithRelations
+from src.schemas.employee import (
+    EmployeeCreate, EmployeeUpdate, Employee as EmployeeSchema, EmployeeWithRelations, EmployeeSearchResult,
+    EmployeeImportResult
+)
+from src.utils.employee_import import import_employees, parse_upload
+from src.utils.serialization import list_response, model_columns, select_fields
 
 router = APIRouter()
 
+# Shorter queries only match prefixes and substrings (too few trigrams for fuzzy matching)
+SEARCH_FUZZY_MIN_LENGTH = 3
+
+def detailed_employees(
+    db: Session,
+    status: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> List[dict]:
+    """
+    Employees (ordered by id) with their attendance count and latest payroll, in
+    one statement: the counters come from employee_stats (a primary key join) and
+    the latest payroll row from its (employee_id, month) unique key.
+    """
+    stats = EmployeeStats.__table__
+    query = (
+        select(
+            Employee.__table__,
+            func.coalesce(stats.c.attendance_count, 0).label("attendance_count"),
+            stats.c.last_attendance_date,
+            stats.c.latest_net_pay,
+            Payroll.month, Payroll.days_present, Payroll.salary_total,
+            Payroll.base_salary, Payroll.overtime_hours, Payroll.bonus
+        )
+        .outerjoin(stats, stats.c.employee_id == Employee.id)
+        .outerjoin(Payroll, (Payroll.employee_id == Employee.id) & (Payroll.month == stats.c.latest_payroll_month))
+    )
+    if status:
+        query = query.where(Employee.status == status)
+    if employee_id is not None:
+        query = query.where(Employee.id == employee_id)
+    
+    rows = db.execute(query.order_by(Employee.id).offset(skip).limit(limit)).all()
+    
+    employee_columns = [column.key for column in Employee.__table__.columns]
+    result = []
+    for row in rows:
+        emp_data = {key: getattr(row, key) for key in employee_columns}
+        emp_data["attendance_count"] = row.attendance_count
+        emp_data["last_attendance_date"] = row.last_attendance_date
+        emp_data["latest_net_pay"] = float(row.latest_net_pay) if row.latest_net_pay is not None else None
+        emp_data["latest_payroll"] = None
+        if row.month is not None:
+            emp_data["latest_payroll"] = {
+                "month": row.month,
+                "days_present": row.days_present,
+                "salary_total": float(row.salary_total),
+                "base_salary": float(row.base_salary) if row.base_salary else None,
+                "overtime_hours": float(row.overtime_hours) if row.overtime_hours else 0,
+                "bonus": float(row.bonus) if row.bonus else 0
+            }
+        result.append(emp_data)
+    return result
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the value matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def matching_employees(
+    db: Session,
+    q: str,
+    designation: Optional[str] = None,
+    location: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20
+) -> list:
+    """
+    Employees whose name, phone or email matches ``q``, best first: prefix matches,
+    then substring matches, then fuzzy (typo tolerant) name and email matches, each
+    ranked by trigram word similarity. Every condition is served by the trigram
+    GIN indexes on name, phone and email.
+    """
+    term = q.strip()
+    contains = f"%{escape_like(term)}%"
+    prefix = f"{escape_like(term)}%"
+    
+    prefix_match = or_(
+        Employee.name.ilike(prefix, escape="\\"),
+        Employee.email.ilike(prefix, escape="\\"),
+        Employee.phone.like(prefix, escape="\\")
+    )
+    substring_match = or_(
+        Employee.name.ilike(contains, escape="\\"),
+        Employee.email.ilike(contains, escape="\\"),
+        Employee.phone.like(contains, escape="\\")
+    )
+    match = substring_match
+    if len(term) >= SEARCH_FUZZY_MIN_LENGTH:
+        # word_similarity above pg_trgm.word_similarity_threshold
+        match = or_(
+            substring_match,
+            literal(term).op("<%")(Employee.name),
+            literal(term).op("<%")(Employee.email)
+        )
+    
+    score = func.greatest(
+        func.word_similarity(term, Employee.name),
+        func.coalesce(func.word_similarity(term, Employee.email), 0)
+    )
+    query = select(
+        Employee.id, Employee.name, Employee.email, Employee.phone, Employee.doj,
+        Employee.designation, Employee.location, Employee.status,
+        score.label("score")
+    ).where(match)
+    if designation:
+        query = query.where(Employee.designation == designation)
+    if location:
+        query = query.where(Employee.location == location)
+    if status:
+        query = query.where(Employee.status == status)
+    
+    tier = case((prefix_match, 0), (substring_match, 1), else_=2)
+    return db.execute(
+        query.order_by(tier, score.desc(), Employee.name, Employee.id).limit(limit)
+    ).all()
+
 @router.get("", response_model=List[EmployeeSchema], 
          summary="List all employees",
          description="Retrieve a list of all employees with pagination support")
 def get_employees(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve all employees with pagination.
@@ -26,6 +149,7 @@ def get_employees(
     ## Parameters
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return
+    - **fields**: Comma separated fields to return, e.g. ``id,name`` for pickers (default: all)
     
     ## Returns
     - List of employee records with basic information
@@ -47,8 +171,9 @@ def get_employees(
     ]
     ```
     """
-    employees = db.query(Employee).offset(skip).limit(limit).all()
-    return employees
+    schema = select_fields(EmployeeSchema, fields)
+    employees = db.query(*model_columns(Employee, schema)).offset(skip).limit(limit).all()
+    return list_response(schema, employees)
 
 @router.get("/detailed", response_model=List[EmployeeWithRelations],
          summary="List employees with detailed information",
@@ -57,7 +182,7 @@ def get_detailed_employees(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve all employees with attendance count and latest payroll information.
@@ -96,43 +221,52 @@ def get_detailed_employees(
     ]
     ```
     """
-    # Start with base query
-    query = db.query(Employee)
+    return list_response(EmployeeWithRelations, detailed_employees(db, status=status, skip=skip, limit=limit))
+
+@router.get("/search", response_model=List[EmployeeSearchResult],
+         summary="Search employees",
+         description="Search employees by name, phone or email, with typo tolerance and relevance ranking")
+def search_employees(
+    q: str = Query(..., min_length=1, max_length=100),
+    designation: Optional[str] = None,
+    location: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Search employees, e.g. for autocomplete.
     
-    # Apply status filter if provided
-    if status:
-        query = query.filter(Employee.status == status)
+    ## Parameters
+    - **q**: Search text, matched against name, phone and email
+    - **designation**, **location**, **status**: Optional exact filters
+    - **limit**: Maximum number of results
     
-    # Apply pagination
-    employees = query.offset(skip).limit(limit).all()
+    ## Returns
+    - The best matches, prefix matches first, with their relevance score
     
-    # Format response with additional information
-    result = []
-    for employee in employees:
-        # Get attendance count
-        attendance_count = db.query(func.count(Attendance.id)).filter(
-            Attendance.employee_id == employee.id
-        ).scalar() or 0
-        
-        # Get latest payroll
-        latest_payroll = db.query(Payroll).filter(
-            Payroll.employee_id == employee.id
-        ).order_by(desc(Payroll.month)).first()
-        
-        # Create response object
-        emp_dict = EmployeeWithRelations.from_orm(employee)
-        emp_dict.attendance_count = attendance_count
-        
-        if latest_payroll:
-            emp_dict.latest_payroll = {
-                "month": latest_payroll.month,
-                "days_present": latest_payroll.days_present,
-                "salary_total": float(latest_payroll.salary_total)
-            }
-        
-        result.append(emp_dict)
+    ## Example Response
+    ```json
+    [
+      {
+        "id": 1,
+        "name": "John Doe",
+        "email": "john.doe@example.com",
+        "phone": "123-456-7890",
+        "doj": "2023-01-15",
+        "designation": "Farm Manager",
+        "location": "Main Farm",
+        "status": "active",
+        "score": 1.0
+      }
+    ]
+    ```
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search text must not be blank")
     
-    return result
+    employees = matching_employees(db, q, designation=designation, location=location, status=status, limit=limit)
+    return list_response(EmployeeSearchResult, employees)
 
 @router.post("/", response_model=EmployeeSchema, status_code=status.HTTP_201_CREATED)
 def create_employee(
@@ -144,20 +278,59 @@ def create_employee(
     """
     db_employee = Employee(
         name=employee.name,
+        email=employee.email,
         phone=employee.phone,
         doj=employee.doj,
         designation=employee.designation,
         location=employee.location,
-        status=employee.status
+        status=employee.status,
+        bank_account_number=employee.bank_account_number,
+        bank_ifsc=employee.bank_ifsc
     )
     db.add(db_employee)
     db.commit()
     db.refresh(db_employee)
     return db_employee
 
+@router.post("/bulk", response_model=EmployeeImportResult,
+          summary="Import employees in bulk",
+          description="Create or update employees from a CSV or JSON lines upload")
+def import_employees_bulk(
+    body: bytes = Body(..., media_type="text/csv"),
+    content_type: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update many employees at once, e.g. when onboarding a seasonal crew.
+    
+    Send the employees as ``text/csv`` (a header row with the employee fields) or
+    ``application/x-ndjson`` (one JSON object per line). Rows whose phone or email
+    belongs to an existing employee update that employee; optional fields left
+    empty keep their current values. Every row is validated on its own, so
+    invalid rows are reported without rejecting the rest.
+    
+    ## Example Request (CSV)
+    ```
+    name,phone,email,doj,designation,location
+    Ravi Kumar,9876543210,ravi@example.com,2024-06-01,Harvester,North Farm
+    ```
+    
+    ## Example Response
+    ```json
+    {
+      "created": 1,
+      "updated": 0,
+      "failed": 0,
+      "results": [{"line": 2, "status": "created", "id": 42, "detail": null}]
+    }
+    ```
+    """
+    return import_employees(db, parse_upload(body, content_type))
+
 @router.get("/{employee_id}", response_model=EmployeeSchema)
 def get_employee(
     employee_id: int, 
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -166,67 +339,43 @@ def get_employee(
     db_employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if db_employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
+    response.headers["ETag"] = etag(db_employee.version)
     return db_employee
 
 @router.get("/{employee_id}/detailed", response_model=EmployeeWithRelations)
 def get_detailed_employee(
     employee_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve a specific employee by ID with attendance and payroll details
     """
-    # Get employee
-    db_employee = db.query(Employee).filter(Employee.id == employee_id).first()
-    if db_employee is None:
+    employees = detailed_employees(db, employee_id=employee_id)
+    if not employees:
         raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Get attendance count
-    attendance_count = db.query(func.count(Attendance.id)).filter(
-        Attendance.employee_id == employee_id
-    ).scalar() or 0
-    
-    # Get latest payroll
-    latest_payroll = db.query(Payroll).filter(
-        Payroll.employee_id == employee_id
-    ).order_by(desc(Payroll.month)).first()
-    
-    # Create response object
-    result = EmployeeWithRelations.from_orm(db_employee)
-    result.attendance_count = attendance_count
-    
-    if latest_payroll:
-        result.latest_payroll = {
-            "month": latest_payroll.month,
-            "days_present": latest_payroll.days_present,
-            "salary_total": float(latest_payroll.salary_total),
-            "base_salary": float(latest_payroll.base_salary) if latest_payroll.base_salary else None,
-            "overtime_hours": float(latest_payroll.overtime_hours) if latest_payroll.overtime_hours else 0,
-            "bonus": float(latest_payroll.bonus) if latest_payroll.bonus else 0
-        }
-    
-    return result
+    return EmployeeWithRelations(**employees[0])
 
 @router.put("/{employee_id}", response_model=EmployeeSchema)
 def update_employee(
     employee_id: int, 
     employee: EmployeeUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Update an employee's information
-    """
-    db_employee = db.query(Employee).filter(Employee.id == employee_id).first()
-    if db_employee is None:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Update employee attributes
-    update_data = employee.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_employee, key, value)
+    Update an employee's information.
     
+    Send the employee's ETag in ``If-Match`` to only update it if nobody changed it
+    since it was read (412 otherwise).
+    """
+    db_employee = update_versioned(
+        db, Employee, employee_id, employee.dict(exclude_unset=True),
+        parse_if_match(if_match), "Employee not found"
+    )
     db.commit()
-    db.refresh(db_employee)
+    
+    response.headers["ETag"] = etag(db_employee.version)
     return db_employee
 
 @router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
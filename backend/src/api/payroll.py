@@ -1,42 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional
-from sqlalchemy import func, extract
+from sqlalchemy import func
 from datetime import datetime
+from decimal import Decimal
 
-from src.db.session import get_db
-from src.models.payroll import Payroll
+from src.db.session import get_db, get_read_db
+from src.db.writes import insert_unique
+from src.models.payroll import Payroll, PayrollRun
 from src.models.employee import Employee
-from src.models.attendance import Attendance
-from src.schemas.payroll import PayrollCreate, PayrollUpdate, Payroll as PayrollSchema, PayrollWithEmployee
+from src.schemas.payroll import (
+    PayrollCreate, PayrollUpdate, Payroll as PayrollSchema, PayrollWithEmployee,
+    PayrollRunCreate, PayrollRun as PayrollRunSchema
+)
+from src.utils.serialization import extra_columns, list_response, model_columns, select_fields
+from src.utils.payroll_runs import PAYROLL_RUN_IN_PROCESS, is_stale, process_payroll_run
+from src.utils.structure_cache import structure_cache
+from src.utils import work_calendar
+from src.utils.attendance_analytics import monthly_hours_by_employee
 
 router = APIRouter()
 
+CENT = Decimal("0.01")
+
 @router.get("", response_model=List[PayrollSchema])
 def get_payroll_records(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Retrieve all payroll records with pagination
+    Retrieve all payroll records with pagination.
+    ``fields`` (comma separated) limits the fields returned.
     """
-    payroll_records = db.query(Payroll).offset(skip).limit(limit).all()
-    return payroll_records
+    schema = select_fields(PayrollSchema, fields)
+    payroll_records = db.query(*model_columns(Payroll, schema)).offset(skip).limit(limit).all()
+    return list_response(schema, payroll_records)
 
 @router.get("/detailed", response_model=List[PayrollWithEmployee])
 def get_detailed_payroll_records(
     skip: int = 0, 
     limit: int = 100, 
     month: Optional[str] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Retrieve all payroll records with employee details and optional month filtering
+    Retrieve all payroll records with employee details and optional month filtering.
+    ``fields`` (comma separated) limits the fields returned.
     """
-    # Start with base query
-    query = db.query(Payroll, Employee.name, Employee.designation)\
-        .join(Employee, Payroll.employee_id == Employee.id)
+    # Start with base query, selecting the requested employee and processor names alongside the payroll columns
+    schema = select_fields(PayrollWithEmployee, fields)
+    Processor = aliased(Employee)
+    employee_columns = extra_columns(schema, {
+        "employee_name": Employee.name,
+        "employee_designation": Employee.designation
+    })
+    processor_columns = extra_columns(schema, {"processor_name": Processor.name})
+    query = db.query(*model_columns(Payroll, schema), *employee_columns, *processor_columns)
+    if employee_columns:
+        query = query.join(Employee, Payroll.employee_id == Employee.id)
+    if processor_columns:
+        query = query.outerjoin(Processor, Payroll.processed_by == Processor.id)
     
     # Apply month filter if provided
     if month:
@@ -45,22 +71,91 @@ def get_detailed_payroll_records(
     # Apply pagination
     results = query.offset(skip).limit(limit).all()
     
-    # Format response
-    response = []
-    for payroll, emp_name, emp_designation in results:
-        payroll_dict = PayrollWithEmployee.from_orm(payroll)
-        payroll_dict.employee_name = emp_name
-        payroll_dict.employee_designation = emp_designation
-        
-        # Add processor name if available
-        if payroll.processed_by:
-            processor = db.query(Employee).filter(Employee.id == payroll.processed_by).first()
-            if processor:
-                payroll_dict.processor_name = processor.name
-        
-        response.append(payroll_dict)
+    return list_response(schema, results)
+
+@router.post("/runs", response_model=PayrollRunSchema, status_code=status.HTTP_202_ACCEPTED)
+def create_payroll_run(
+    run_in: PayrollRunCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Start a payroll run generating the month's payroll for every active employee.
+    The run is processed in the background; poll GET /payroll/runs/{run_id} for progress.
+    """
+    active_run = db.query(PayrollRun).filter(
+        PayrollRun.month == run_in.month,
+        PayrollRun.status.in_(["pending", "running"])
+    ).first()
+    if active_run:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Payroll run {active_run.id} is already in progress for this month; "
+                "resume it if its processor stopped"
+            )
+        )
     
-    return response
+    db_run = PayrollRun(
+        month=run_in.month,
+        chunk_size=run_in.chunk_size,
+        generate_payslips=run_in.generate_payslips,
+        processed_by=run_in.processor_id,
+        total_employees=db.query(func.count(Employee.id)).filter(Employee.status == "active").scalar()
+    )
+    db.add(db_run)
+    db.commit()
+    db.refresh(db_run)
+    
+    # Without in-process processing the run is picked up by scripts/payroll_worker.py
+    if PAYROLL_RUN_IN_PROCESS:
+        background_tasks.add_task(process_payroll_run, db_run.id)
+    
+    return db_run
+
+@router.get("/runs/{run_id}", response_model=PayrollRunSchema)
+def get_payroll_run(
+    run_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve a payroll run with its progress and per-employee errors
+    """
+    db_run = db.query(PayrollRun).filter(PayrollRun.id == run_id).first()
+    if db_run is None:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    return db_run
+
+@router.post("/runs/{run_id}/resume", response_model=PayrollRunSchema, status_code=status.HTTP_202_ACCEPTED)
+def resume_payroll_run(
+    run_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Resume a failed payroll run, or a running one whose processor crashed or
+    restarted (no heartbeat for PAYROLL_RUN_STALE_SECONDS), from its last checkpoint
+    """
+    db_run = db.query(PayrollRun).filter(PayrollRun.id == run_id).first()
+    if db_run is None:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    
+    if db_run.status == "running":
+        if not is_stale(db, run_id):
+            raise HTTPException(status_code=400, detail="Payroll run is running")
+        # Left running: claiming it (skipping it if its processor is still alive) takes it over
+    elif db_run.status in ("failed", "pending"):
+        db_run.status = "pending"
+        db_run.finished_at = None
+        db.commit()
+        db.refresh(db_run)
+    else:
+        raise HTTPException(status_code=400, detail=f"Payroll run is {db_run.status}")
+    
+    if PAYROLL_RUN_IN_PROCESS:
+        background_tasks.add_task(process_payroll_run, db_run.id)
+    
+    return db_run
 
 @router.get("/{payroll_id}", response_model=PayrollSchema)
 def get_payroll_record(
@@ -78,7 +173,7 @@ def get_payroll_record(
 @router.get("/employee/{employee_id}", response_model=List[PayrollSchema])
 def get_employee_payroll(
     employee_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve payroll records for a specific employee
@@ -89,7 +184,7 @@ def get_employee_payroll(
         raise HTTPException(status_code=404, detail="Employee not found")
     
     payroll_records = db.query(Payroll).filter(Payroll.employee_id == employee_id).all()
-    return payroll_records
+    return list_response(PayrollSchema, payroll_records)
 
 @router.post("/", response_model=PayrollSchema, status_code=status.HTTP_201_CREATED)
 def create_payroll_record(
@@ -99,23 +194,6 @@ def create_payroll_record(
     """
     Create a new payroll record (manual override)
     """
-    # Check if employee exists
-    employee = db.query(Employee).filter(Employee.id == payroll.employee_id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Check if payroll record already exists for this employee for this month
-    existing_record = db.query(Payroll).filter(
-        Payroll.employee_id == payroll.employee_id,
-        Payroll.month == payroll.month
-    ).first()
-    
-    if existing_record:
-        raise HTTPException(
-            status_code=400, 
-            detail="Payroll record already exists for this employee for this month"
-        )
-    
     # Calculate total salary if not provided
     salary_total = payroll.salary_total
     if not salary_total and payroll.base_salary:
@@ -146,10 +224,64 @@ def create_payroll_record(
         processed_by=None  # Can be updated to current user ID when auth is implemented
     )
     
-    db.add(db_payroll)
-    db.commit()
-    db.refresh(db_payroll)
-    return db_payroll
+    # The unique and foreign key constraints catch duplicates and unknown employees
+    return insert_unique(
+        db, db_payroll, "unique_employee_month",
+        conflict_detail="Payroll record already exists for this employee for this month",
+        not_found_detail="Employee not found"
+    )
+
+def build_payroll(db: Session, employee_id: int, month: str, processor_id: Optional[int] = None) -> Payroll:
+    """
+    Compute an employee's payroll record for a month from attendance hours.
+    The record is returned unsaved; shared by single generation and payroll runs.
+    """
+    # Days present and per-day regular/overtime hours for the month
+    hours = monthly_hours_by_employee(db, [employee_id], month)[employee_id]
+    days_present = hours.days_present
+    
+    # Working days in the month at the employee's location (weekly offs and holidays excluded)
+    location = db.query(Employee.location).filter(Employee.id == employee_id).scalar()
+    working_days = work_calendar.working_days(db, location, month)
+    
+    # Calculate base salary: the salary structure's basic prorated over the working days,
+    # or 8 hours per day at $15/hour for employees without a structure
+    daily_hours = 8
+    structure = structure_cache.get(db, employee_id, month)
+    if structure is not None and working_days > 0:
+        hourly_rate = (structure.basic_salary / (working_days * daily_hours)).quantize(CENT)
+        base_salary = (structure.basic_salary * min(days_present, working_days) / working_days).quantize(CENT)
+    else:
+        hourly_rate = Decimal(15)
+        base_salary = days_present * daily_hours * hourly_rate
+    
+    # Calculate overtime (hours beyond 8 on each day)
+    overtime_hours = hours.overtime_hours
+    overtime_rate = hourly_rate * Decimal("1.5")  # Time and a half
+    overtime_pay = (overtime_hours * overtime_rate).quantize(CENT)
+    
+    # Calculate bonus (example: $50 bonus for perfect attendance on every working day)
+    bonus = 50 if working_days > 0 and days_present >= working_days else 0
+    
+    # No deductions in this example
+    deductions = 0
+    
+    # Total salary
+    salary_total = base_salary + overtime_pay + bonus - deductions
+    
+    # Create payroll record
+    return Payroll(
+        employee_id=employee_id,
+        month=month,
+        days_present=days_present,
+        base_salary=base_salary,
+        overtime_hours=overtime_hours,
+        overtime_rate=overtime_rate,
+        bonus=bonus,
+        deductions=deductions,
+        salary_total=salary_total,
+        processed_by=processor_id
+    )
 
 @router.post("/generate/{employee_id}/{month}", response_model=PayrollWithEmployee)
 def generate_payroll(
@@ -178,60 +310,11 @@ def generate_payroll(
             detail="Payroll already generated for this month"
         )
     
-    # Get attendance records for the month
-    year, month_num = month.split('-')
-    
-    # Count days present
-    days_present = db.query(func.count(func.distinct(Attendance.date))).filter(
-        Attendance.employee_id == employee_id,
-        extract('year', Attendance.date) == int(year),
-        extract('month', Attendance.date) == int(month_num)
-    ).scalar() or 0
-    
-    # Calculate total hours worked
-    total_hours = db.query(func.sum(Attendance.total_hours)).filter(
-        Attendance.employee_id == employee_id,
-        extract('year', Attendance.date) == int(year),
-        extract('month', Attendance.date) == int(month_num)
-    ).scalar() or 0
+    # Compute the payroll record from the month's attendance
+    new_payroll = build_payroll(db, employee_id, month, processor_id)
     
-    # Calculate base salary (assuming 8 hours per day at $15/hour)
-    daily_hours = 8
-    hourly_rate = 15
-    base_salary = days_present * daily_hours * hourly_rate
-    
-    # Calculate overtime (hours beyond 8 per day)
-    regular_hours = days_present * daily_hours
-    overtime_hours = max(0, total_hours - regular_hours)
-    overtime_rate = hourly_rate * 1.5  # Time and a half
-    overtime_pay = overtime_hours * overtime_rate
-    
-    # Calculate bonus (example: $50 bonus for perfect attendance if days_present >= 22)
-    bonus = 50 if days_present >= 22 else 0
-    
-    # No deductions in this example
-    deductions = 0
-    
-    # Total salary
-    salary_total = base_salary + overtime_pay + bonus - deductions
-    
-    # Create payroll record
-    new_payroll = Payroll(
-        employee_id=employee_id,
-        month=month,
-        days_present=days_present,
-        base_salary=base_salary,
-        overtime_hours=overtime_hours,
-        overtime_rate=overtime_rate,
-        bonus=bonus,
-        deductions=deductions,
-        salary_total=salary_total,
-        processed_by=processor_id
-    )
-    
-    db.add(new_payroll)
-    db.commit()
-    db.refresh(new_payroll)
+    # A concurrent request may have generated it since the check above
+    insert_unique(db, new_payroll, "unique_employee_month", conflict_detail="Payroll already generated for this month")
     
     # Prepare response with employee details
     result = PayrollWithEmployee.from_orm(new_payroll)
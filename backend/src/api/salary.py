@@ -1,17 +1,34 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy.orm import Session
-from sqlalchemy import extract, func
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, update
 from datetime import datetime, date
-from decimal import Decimal
 
-from src.db.session import get_db
+from src.db.session import get_db, get_read_db
+from src.db.writes import etag, insert_unique, parse_if_match, update_versioned
 from src.models.employee import Employee
 from src.models.salary import SalaryStructure, Payslip
 from src.models.payroll import Payroll
-from src.models.attendance import Attendance
-from src.schemas.payslip_approval import PayslipApprovalRequest
+from src.schemas.payslip_approval import (
+    PayslipApprovalRequest,
+    PayslipBatchApprovalRequest,
+    PayslipBatchPaymentRequest,
+    PayslipBatchResult
+)
 from src.utils.pdf_generator import generate_payslip_pdf
+from src.utils.serialization import extra_columns, list_response, model_columns, select_fields
+from src.utils.payslip_recompute import record_structure_change, recompute_dirty_payslips
+from src.utils.employee_stats import apply_stats_changes
+from src.utils.payment_file import (
+    PAYMENT_FILE_MEDIA_TYPES, count_payable, new_batch_reference, stream_payment_file
+)
+from src.utils.structure_cache import StructureSnapshot, structure_cache
+from src.utils.work_calendar import working_days_by_location
+from src.utils.attendance_analytics import monthly_hours_by_employee
+from src.utils.payslip_kernel import (
+    PayslipInputs, compute_payslips, from_centihours, from_paise, to_centihours, to_paise
+)
 from src.schemas.salary import (
     SalaryStructure as SalaryStructureSchema,
     SalaryStructureCreate,
@@ -20,55 +37,62 @@ from src.schemas.salary import (
     Payslip as PayslipSchema,
     PayslipCreate,
     PayslipUpdate,
-    PayslipWithEmployee
+    PayslipWithEmployee,
+    PayslipRecomputeResult
 )
 
 router = APIRouter()
 
+MISSING_STRUCTURE_DETAIL = "No salary structure found for this employee"
+
+# Salary structure components
+ALLOWANCE_FIELDS = [
+    "basic_salary", "house_rent_allowance", "medical_allowance", "transport_allowance", "special_allowance",
+]
+DEDUCTION_FIELDS = ["tax_deduction", "provident_fund", "insurance", "other_deductions"]
+
+def employee_column(column, employee_id, label: str):
+    """An employee's column for the id in ``employee_id``, as a correlated subquery (NULL when unset)"""
+    return select(column).where(Employee.id == employee_id).correlate_except(Employee).scalar_subquery().label(label)
+
 # Salary Structure endpoints
 @router.get("/structures", response_model=List[SalaryStructureWithEmployee])
 def get_salary_structures(
     skip: int = 0,
     limit: int = 100,
     employee_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all salary structures with optional filtering by employee
     """
-    query = db.query(SalaryStructure)
+    # Select employee and creator names alongside the structure columns
+    Creator = aliased(Employee)
+    query = db.query(
+        *model_columns(SalaryStructure, SalaryStructureWithEmployee),
+        Employee.name.label("employee_name"),
+        Employee.designation.label("employee_designation"),
+        Creator.name.label("creator_name")
+    ).outerjoin(Employee, SalaryStructure.employee_id == Employee.id)\
+        .outerjoin(Creator, SalaryStructure.created_by == Creator.id)
     
     if employee_id:
         query = query.filter(SalaryStructure.employee_id == employee_id)
     
-    # Get total count for pagination
-    total_count = query.count()
-    
     # Apply pagination
     salary_structures = query.order_by(SalaryStructure.effective_from.desc()).offset(skip).limit(limit).all()
     
-    # Add employee details to each salary structure
-    result = []
-    for structure in salary_structures:
-        employee = db.query(Employee).filter(Employee.id == structure.employee_id).first()
-        creator = None
-        if structure.created_by:
-            creator = db.query(Employee).filter(Employee.id == structure.created_by).first()
-        
-        structure_with_employee = SalaryStructureWithEmployee.from_orm(structure)
-        if employee:
-            structure_with_employee.employee_name = employee.name
-            structure_with_employee.employee_designation = employee.designation
-        
-        if creator:
-            structure_with_employee.creator_name = creator.name
-        
-        result.append(structure_with_employee)
-    
-    return result
+    return list_response(SalaryStructureWithEmployee, salary_structures)
+
+@router.get("/structure-cache")
+def get_structure_cache_stats():
+    """
+    Hit/miss metrics of this process's salary structure cache
+    """
+    return structure_cache.stats()
 
 @router.get("/structures/{structure_id}", response_model=SalaryStructureWithEmployee)
-def get_salary_structure(structure_id: int, db: Session = Depends(get_db)):
+def get_salary_structure(structure_id: int, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific salary structure by ID
     """
@@ -90,6 +114,7 @@ def get_salary_structure(structure_id: int, db: Session = Depends(get_db)):
     if creator:
         structure_with_employee.creator_name = creator.name
     
+    response.headers["ETag"] = etag(structure.version)
     return structure_with_employee
 
 @router.post("/structures", response_model=SalaryStructureWithEmployee, status_code=status.HTTP_201_CREATED)
@@ -142,6 +167,7 @@ def create_salary_structure(structure: SalaryStructureCreate, db: Session = Depe
     db.add(db_structure)
     db.commit()
     db.refresh(db_structure)
+    structure_cache.invalidate(db_structure.employee_id)
     
     # Return with employee details
     result = SalaryStructureWithEmployee.from_orm(db_structure)
@@ -156,56 +182,53 @@ def create_salary_structure(structure: SalaryStructureCreate, db: Session = Depe
     return result
 
 @router.put("/structures/{structure_id}", response_model=SalaryStructureWithEmployee)
-def update_salary_structure(structure_id: int, structure_update: SalaryStructureUpdate, db: Session = Depends(get_db)):
-    """
-    Update an existing salary structure
+def update_salary_structure(
+    structure_id: int,
+    structure_update: SalaryStructureUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
-    db_structure = db.query(SalaryStructure).filter(SalaryStructure.id == structure_id).first()
-    if not db_structure:
-        raise HTTPException(status_code=404, detail="Salary structure not found")
+    Update an existing salary structure.
     
-    # Update fields if provided
+    Send the structure's ETag in ``If-Match`` to only update it if nobody changed it
+    since it was read (412 otherwise).
+    """
     update_data = structure_update.dict(exclude_unset=True)
-    
-    # Update the structure with new values
-    for field, value in update_data.items():
-        setattr(db_structure, field, value)
-    
-    # Recalculate gross and net salary
-    # Convert all values to float to avoid type mismatch between float and decimal.Decimal
-    db_structure.gross_salary = float(
-        float(db_structure.basic_salary or 0) + 
-        float(db_structure.house_rent_allowance or 0) + 
-        float(db_structure.medical_allowance or 0) + 
-        float(db_structure.transport_allowance or 0) + 
-        float(db_structure.special_allowance or 0)
-    )
-    
-    db_structure.net_salary = float(db_structure.gross_salary) - float(
-        float(db_structure.tax_deduction or 0) + 
-        float(db_structure.provident_fund or 0) + 
-        float(db_structure.insurance or 0) + 
-        float(db_structure.other_deductions or 0)
+    table = SalaryStructure.__table__
+    
+    # Gross and net salary are always recalculated from the (updated) components
+    update_data.pop("gross_salary", None)
+    update_data.pop("net_salary", None)
+    
+    def component(name):
+        return func.coalesce(update_data[name] if name in update_data else table.c[name], 0)
+    
+    gross_salary = sum(component(name) for name in ALLOWANCE_FIELDS)
+    net_salary = gross_salary - sum(component(name) for name in DEDUCTION_FIELDS)
+    
+    # The effective date before the update, for payslip dirty tracking
+    previous = select(table.c.id, table.c.effective_from).where(table.c.id == structure_id).subquery("previous")
+    
+    row = update_versioned(
+        db, SalaryStructure, structure_id,
+        {**update_data, "gross_salary": gross_salary, "net_salary": net_salary},
+        parse_if_match(if_match), "Salary structure not found",
+        returning=[
+            previous.c.effective_from.label("previous_effective_from"),
+            employee_column(Employee.name, table.c.employee_id, "employee_name"),
+            employee_column(Employee.designation, table.c.employee_id, "employee_designation"),
+            employee_column(Employee.name, table.c.created_by, "creator_name"),
+        ],
+        where=[previous.c.id == table.c.id]
     )
-    
+    record_structure_change(db, row.employee_id, [row.previous_effective_from, row.effective_from])
     db.commit()
-    db.refresh(db_structure)
-    
-    # Return with employee details
-    employee = db.query(Employee).filter(Employee.id == db_structure.employee_id).first()
-    creator = None
-    if db_structure.created_by:
-        creator = db.query(Employee).filter(Employee.id == db_structure.created_by).first()
+    structure_cache.invalidate(row.employee_id)
     
-    result = SalaryStructureWithEmployee.from_orm(db_structure)
-    if employee:
-        result.employee_name = employee.name
-        result.employee_designation = employee.designation
-    
-    if creator:
-        result.creator_name = creator.name
-    
-    return result
+    response.headers["ETag"] = etag(row.version)
+    return SalaryStructureWithEmployee.from_orm(row)
 
 @router.delete("/structures/{structure_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_salary_structure(structure_id: int, db: Session = Depends(get_db)):
@@ -227,6 +250,7 @@ def delete_salary_structure(structure_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_structure)
     db.commit()
+    structure_cache.invalidate(db_structure.employee_id)
     
     return None
 
@@ -253,6 +277,7 @@ def force_delete_salary_structure(structure_id: int, db: Session = Depends(get_d
     
     # Commit all changes in a single transaction
     db.commit()
+    structure_cache.invalidate(db_structure.employee_id)
     
     # Return success message with count of deleted items
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -266,12 +291,32 @@ def get_payslips(
     month: Optional[str] = None,
     is_paid: Optional[bool] = None,
     is_approved: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get all payslips with optional filtering
+    Get all payslips with optional filtering.
+    ``fields`` (comma separated) limits the fields returned.
     """
-    query = db.query(Payslip)
+    # Select the requested employee, processor and approver names alongside the payslip columns
+    schema = select_fields(PayslipWithEmployee, fields)
+    Processor = aliased(Employee)
+    Approver = aliased(Employee)
+    employee_columns = extra_columns(schema, {
+        "employee_name": Employee.name,
+        "employee_designation": Employee.designation
+    })
+    processor_columns = extra_columns(schema, {"processor_name": Processor.name})
+    approver_columns = extra_columns(schema, {"approver_name": Approver.name})
+    query = db.query(
+        *model_columns(Payslip, schema), *employee_columns, *processor_columns, *approver_columns
+    )
+    if employee_columns:
+        query = query.outerjoin(Employee, Payslip.employee_id == Employee.id)
+    if processor_columns:
+        query = query.outerjoin(Processor, Payslip.processed_by == Processor.id)
+    if approver_columns:
+        query = query.outerjoin(Approver, Payslip.approved_by == Approver.id)
     
     # Apply filters
     if employee_id:
@@ -286,41 +331,13 @@ def get_payslips(
     if is_approved is not None:
         query = query.filter(Payslip.is_approved == is_approved)
     
-    # Get total count for pagination
-    total_count = query.count()
-    
     # Apply pagination
     payslips = query.order_by(Payslip.month.desc(), Payslip.employee_id).offset(skip).limit(limit).all()
     
-    # Add employee and processor details to each payslip
-    result = []
-    for payslip in payslips:
-        employee = db.query(Employee).filter(Employee.id == payslip.employee_id).first()
-        processor = None
-        if payslip.processed_by:
-            processor = db.query(Employee).filter(Employee.id == payslip.processed_by).first()
-        
-        approver = None
-        if payslip.approved_by:
-            approver = db.query(Employee).filter(Employee.id == payslip.approved_by).first()
-        
-        payslip_with_details = PayslipWithEmployee.from_orm(payslip)
-        if employee:
-            payslip_with_details.employee_name = employee.name
-            payslip_with_details.employee_designation = employee.designation
-        
-        if processor:
-            payslip_with_details.processor_name = processor.name
-        
-        if approver:
-            payslip_with_details.approver_name = approver.name
-        
-        result.append(payslip_with_details)
-    
-    return result
+    return list_response(schema, payslips)
 
 @router.get("/payslips/{payslip_id}", response_model=PayslipWithEmployee)
-def get_payslip(payslip_id: int, db: Session = Depends(get_db)):
+def get_payslip(payslip_id: int, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific payslip by ID
     """
@@ -349,6 +366,7 @@ def get_payslip(payslip_id: int, db: Session = Depends(get_db)):
     if approver:
         result.approver_name = approver.name
     
+    response.headers["ETag"] = etag(payslip.version)
     return result
 
 @router.post("/payslips", response_model=PayslipWithEmployee, status_code=status.HTTP_201_CREATED)
@@ -366,24 +384,11 @@ def create_payslip(payslip: PayslipCreate, db: Session = Depends(get_db)):
     if not salary_structure:
         raise HTTPException(status_code=404, detail="Salary structure not found")
     
-    # Check if payslip already exists for this month
-    existing_payslip = db.query(Payslip).filter(
-        Payslip.employee_id == payslip.employee_id,
-        Payslip.month == payslip.month
-    ).first()
-    
-    if existing_payslip:
-        raise HTTPException(
-            status_code=400, 
-            detail="Payslip already exists for this employee and month"
-        )
-    
-    # Create new payslip
-    db_payslip = Payslip(**payslip.dict())
-    
-    db.add(db_payslip)
-    db.commit()
-    db.refresh(db_payslip)
+    # Create new payslip; the unique constraint catches duplicates
+    db_payslip = insert_unique(
+        db, Payslip(**payslip.dict()), "unique_employee_month_payslip",
+        conflict_detail="Payslip already exists for this employee and month"
+    )
     
     # Return with employee details
     result = PayslipWithEmployee.from_orm(db_payslip)
@@ -398,46 +403,36 @@ def create_payslip(payslip: PayslipCreate, db: Session = Depends(get_db)):
     return result
 
 @router.put("/payslips/{payslip_id}", response_model=PayslipWithEmployee)
-def update_payslip(payslip_id: int, payslip_update: PayslipUpdate, db: Session = Depends(get_db)):
-    """
-    Update an existing payslip
+def update_payslip(
+    payslip_id: int,
+    payslip_update: PayslipUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
-    db_payslip = db.query(Payslip).filter(Payslip.id == payslip_id).first()
-    if not db_payslip:
-        raise HTTPException(status_code=404, detail="Payslip not found")
-    
-    # Update fields if provided
-    update_data = payslip_update.dict(exclude_unset=True)
-    
-    # Update the payslip with new values
-    for field, value in update_data.items():
-        setattr(db_payslip, field, value)
+    Update an existing payslip.
     
+    Send the payslip's ETag in ``If-Match`` to only update it if nobody changed it
+    since it was read (412 otherwise).
+    """
+    table = Payslip.__table__
+    row = update_versioned(
+        db, Payslip, payslip_id, payslip_update.dict(exclude_unset=True),
+        parse_if_match(if_match), "Payslip not found",
+        returning=[
+            employee_column(Employee.name, table.c.employee_id, "employee_name"),
+            employee_column(Employee.designation, table.c.employee_id, "employee_designation"),
+            employee_column(Employee.name, table.c.processed_by, "processor_name"),
+            employee_column(Employee.name, table.c.approved_by, "approver_name"),
+        ]
+    )
+    if "net_amount" in payslip_update.dict(exclude_unset=True):
+        apply_stats_changes(db.connection(), {row.employee_id: 0})
     db.commit()
-    db.refresh(db_payslip)
-    
-    # Return with employee details
-    employee = db.query(Employee).filter(Employee.id == db_payslip.employee_id).first()
-    processor = None
-    if db_payslip.processed_by:
-        processor = db.query(Employee).filter(Employee.id == db_payslip.processed_by).first()
     
-    approver = None
-    if db_payslip.approved_by:
-        approver = db.query(Employee).filter(Employee.id == db_payslip.approved_by).first()
-    
-    result = PayslipWithEmployee.from_orm(db_payslip)
-    if employee:
-        result.employee_name = employee.name
-        result.employee_designation = employee.designation
-    
-    if processor:
-        result.processor_name = processor.name
-    
-    if approver:
-        result.approver_name = approver.name
-    
-    return result
+    response.headers["ETag"] = etag(row.version)
+    return PayslipWithEmployee.from_orm(row)
 
 @router.delete("/payslips/{payslip_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_payslip(payslip_id: int, db: Session = Depends(get_db)):
@@ -536,6 +531,203 @@ def mark_payslip_as_paid(payslip_id: int, payment_reference: str, db: Session =
     
     return result
 
+def batch_filter(payslip_ids: Optional[List[int]], month: Optional[str]):
+    """WHERE clause selecting a batch of payslips by ids or by month"""
+    if payslip_ids:
+        return Payslip.id == func.any(payslip_ids)
+    if month:
+        return Payslip.month == month
+    raise HTTPException(status_code=400, detail="Either payslip_ids or month is required")
+
+def batch_result(db: Session, payslip_ids: Optional[List[int]], month: Optional[str], updated_ids: List[int]) -> PayslipBatchResult:
+    """Summarize a batch update: how many payslips changed and how many were skipped"""
+    if payslip_ids:
+        matched = len(set(payslip_ids))
+    else:
+        matched = db.query(func.count(Payslip.id)).filter(Payslip.month == month).scalar()
+    return PayslipBatchResult(updated=len(updated_ids), skipped=matched - len(updated_ids), updated_ids=updated_ids)
+
+@router.post("/payslips/approve-batch", response_model=PayslipBatchResult)
+def approve_payslips_batch(approval_data: PayslipBatchApprovalRequest, db: Session = Depends(get_db)):
+    """
+    Approve many payslips at once, selected by ids or by month.
+    Payslips that are already approved are skipped.
+    """
+    where = batch_filter(approval_data.payslip_ids, approval_data.month)
+    
+    # Check if approver exists
+    approver = db.query(Employee.id).filter(Employee.id == approval_data.approver_id).first()
+    if not approver:
+        raise HTTPException(status_code=404, detail="Approver not found")
+    
+    # Apply the transition in a single statement
+    updated_ids = db.execute(
+        update(Payslip)
+        .where(where, Payslip.is_approved.isnot(True))
+        .values(
+            is_approved=True,
+            approved_by=approval_data.approver_id,
+            updated_at=func.now(),
+            version=Payslip.version + 1
+        )
+        .returning(Payslip.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    
+    return batch_result(db, approval_data.payslip_ids, approval_data.month, updated_ids)
+
+@router.post("/payslips/pay-batch", response_model=PayslipBatchResult)
+def mark_payslips_as_paid_batch(payment_data: PayslipBatchPaymentRequest, db: Session = Depends(get_db)):
+    """
+    Mark many approved payslips as paid at once, selected by ids or by month.
+    Payslips that are not approved or already paid are skipped.
+    """
+    where = batch_filter(payment_data.payslip_ids, payment_data.month)
+    
+    # Apply the transition in a single statement
+    updated_ids = db.execute(
+        update(Payslip)
+        .where(where, Payslip.is_approved.is_(True), Payslip.is_paid.isnot(True))
+        .values(
+            is_paid=True,
+            payment_date=func.now(),
+            payment_reference=payment_data.payment_reference,
+            updated_at=func.now(),
+            version=Payslip.version + 1
+        )
+        .returning(Payslip.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    
+    return batch_result(db, payment_data.payslip_ids, payment_data.month, updated_ids)
+
+@router.post("/payslips/payment-file", response_class=StreamingResponse)
+def export_payment_file(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    file_format: str = Query("csv", alias="format", pattern=r"^(csv|fixed)$"),
+    batch_reference: Optional[str] = Query(None, max_length=50, pattern=r"^[A-Za-z0-9\-/]+$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Download the bank payment file (NEFT batch, CSV or fixed-width) for a month's
+    approved, unpaid payslips and mark them paid with the batch reference.
+    
+    The file is streamed from a single cursor query and the payslips are committed
+    as paid only if the whole file is produced. Payslips of employees without bank
+    details are left unpaid; their count is returned in ``X-Skipped-Payslips``.
+    """
+    reference = batch_reference or new_batch_reference(month)
+    
+    # Check if the reference was used by an earlier batch
+    used = db.query(Payslip.id).filter(Payslip.payment_reference == reference).first()
+    if used:
+        raise HTTPException(status_code=400, detail="Payment reference already used")
+    
+    payable, missing_bank_details = count_payable(db, month)
+    if not payable:
+        raise HTTPException(status_code=404, detail="No approved, unpaid payslips with bank details for this month")
+    
+    extension = "csv" if file_format == "csv" else "txt"
+    return StreamingResponse(
+        stream_payment_file(month, reference, file_format),
+        media_type=PAYMENT_FILE_MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=payments_{reference}.{extension}",
+            "X-Payment-Reference": reference,
+            "X-Skipped-Payslips": str(missing_bank_details)
+        }
+    )
+
+def build_payslips(
+    db: Session,
+    employee_ids: List[int],
+    month: str,
+    processor_id: Optional[int] = None,
+    structures: Optional[Dict[int, StructureSnapshot]] = None
+) -> Dict[int, Payslip]:
+    """
+    Compute the payslips of many employees for a month from their salary
+    structures and attendance hours, with one attendance analytics query and
+    one vectorized computation for the whole batch. The payslips are returned
+    unsaved, keyed by employee id; employees without a salary structure are
+    left out.
+    
+    Batch callers may pass ``structures`` already resolved with
+    ``structure_cache.get_many``.
+    """
+    # Get the salary structures in effect during the payroll month
+    if structures is None:
+        structures = structure_cache.get_many(db, employee_ids, month)
+    employee_ids = [employee_id for employee_id in employee_ids if employee_id in structures]
+    if not employee_ids:
+        return {}
+    
+    # Days present and per-day regular/overtime hours per employee, for the whole batch in one query
+    hours = monthly_hours_by_employee(db, employee_ids, month)
+    
+    # Working days in the month at each employee's location (weekly offs and holidays excluded)
+    locations = dict(db.query(Employee.id, Employee.location).filter(Employee.id.in_(employee_ids)).all())
+    working_days = working_days_by_location(db, locations.values(), month)
+    
+    inputs = []
+    for employee_id in employee_ids:
+        structure = structures[employee_id]
+        row = hours[employee_id]
+        inputs.append(PayslipInputs(
+            basic_salary=to_paise(structure.basic_salary),
+            gross_salary=to_paise(structure.gross_salary),
+            deductions=to_paise(structure.total_deductions()),
+            regular_hours=to_centihours(row.regular_hours),
+            overtime_hours=to_centihours(row.overtime_hours),
+            days_present=row.days_present,
+            working_days=working_days[locations.get(employee_id)]
+        ))
+    amounts = compute_payslips(inputs)
+    
+    # Create payslip records
+    payslips = {}
+    for index, employee_id in enumerate(employee_ids):
+        payslips[employee_id] = Payslip(
+            employee_id=employee_id,
+            salary_structure_id=structures[employee_id].id,
+            month=month,
+            working_days=inputs[index].working_days,
+            days_present=inputs[index].days_present,
+            leave_days=amounts["leave_days"][index],
+            overtime_hours=from_centihours(amounts["overtime_hours"][index]),
+            overtime_rate=from_paise(amounts["overtime_rate"][index]),
+            overtime_amount=from_paise(amounts["overtime_amount"][index]),
+            bonus=0,  # No bonus by default
+            additional_deductions=0,  # No additional deductions by default
+            gross_amount=from_paise(amounts["gross_amount"][index]),
+            total_deductions=from_paise(amounts["total_deductions"][index]),
+            net_amount=from_paise(amounts["net_amount"][index]),
+            is_generated=True,
+            processed_by=processor_id
+        )
+    return payslips
+
+def build_payslip(
+    db: Session,
+    employee_id: int,
+    month: str,
+    processor_id: Optional[int] = None,
+    structures: Optional[Dict[int, StructureSnapshot]] = None
+) -> Payslip:
+    """
+    Compute one employee's payslip for a month (see ``build_payslips``).
+    The payslip is returned unsaved.
+    """
+    payslip = build_payslips(db, [employee_id], month, processor_id, structures).get(employee_id)
+    if payslip is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=MISSING_STRUCTURE_DETAIL
+        )
+    return payslip
+
 @router.post("/payslips/generate/{employee_id}/{month}", response_model=PayslipWithEmployee)
 def generate_payslip(
     employee_id: int, 
@@ -563,94 +755,15 @@ def generate_payslip(
             detail="Payslip already generated for this employee and month"
         )
     
-    # Get the latest salary structure for the employee
-    salary_structure = db.query(SalaryStructure)\
-        .filter(SalaryStructure.employee_id == employee_id)\
-        .filter(SalaryStructure.effective_from <= datetime.now())\
-        .order_by(SalaryStructure.effective_from.desc())\
-        .first()
-    
-    if not salary_structure:
-        raise HTTPException(
-            status_code=404, 
-            detail="No salary structure found for this employee"
-        )
+    # Compute the payslip from the salary structure and the month's attendance
+    new_payslip = build_payslip(db, employee_id, month, processor_id)
     
-    # Get attendance records for the month
-    year, month_num = month.split('-')
-    
-    # Count days present
-    days_present = db.query(func.count(func.distinct(Attendance.date))).filter(
-        Attendance.employee_id == employee_id,
-        extract('year', Attendance.date) == int(year),
-        extract('month', Attendance.date) == int(month_num)
-    ).scalar() or 0
-    
-    # Calculate total hours worked
-    total_hours = db.query(func.sum(Attendance.total_hours)).filter(
-        Attendance.employee_id == employee_id,
-        extract('year', Attendance.date) == int(year),
-        extract('month', Attendance.date) == int(month_num)
-    ).scalar() or 0
-    
-    # Calculate working days in the month (assuming 22 working days per month as default)
-    working_days = 22
-    
-    # Calculate leave days
-    leave_days = working_days - days_present
-    
-    # Calculate expected monthly hours based on working days in the month
-    standard_daily_hours = 8
-    expected_monthly_hours = working_days * standard_daily_hours
-    
-    # Calculate actual worked hours as a percentage of expected monthly hours
-    worked_percentage = min(1.0, total_hours / expected_monthly_hours) if expected_monthly_hours > 0 else 0
-    
-    # Only count overtime when total hours exceed the expected monthly hours
-    overtime_hours = max(0, total_hours - expected_monthly_hours)
-    
-    # Calculate overtime rate (1.5 times the hourly rate)
-    hourly_rate = salary_structure.basic_salary / (working_days * standard_daily_hours) if working_days > 0 else 0
-    overtime_rate = hourly_rate * Decimal('1.5')
-    overtime_amount = overtime_hours * overtime_rate
-    
-    # Calculate gross amount (prorated based on attendance)
-    # Use the worked_percentage we calculated earlier instead of just days_present/working_days
-    # This accounts for actual hours worked rather than just days present
-    attendance_factor = Decimal(worked_percentage)
-    gross_amount = salary_structure.gross_salary * attendance_factor + overtime_amount
-    
-    # Calculate deductions
-    total_deductions = salary_structure.tax_deduction + salary_structure.provident_fund + \
-                      salary_structure.insurance + salary_structure.other_deductions
-    
-    # Calculate net amount
-    net_amount = gross_amount - total_deductions
-    
-    # Create payslip record
-    new_payslip = Payslip(
-        employee_id=employee_id,
-        salary_structure_id=salary_structure.id,
-        month=month,
-        working_days=working_days,
-        days_present=days_present,
-        leave_days=leave_days,
-        overtime_hours=overtime_hours,
-        overtime_rate=overtime_rate,
-        overtime_amount=overtime_amount,
-        bonus=0,  # No bonus by default
-        additional_deductions=0,  # No additional deductions by default
-        gross_amount=gross_amount,
-        total_deductions=total_deductions,
-        net_amount=net_amount,
-        is_generated=True,
-        processed_by=processor_id
+    # A concurrent request may have generated it since the check above
+    insert_unique(
+        db, new_payslip, "unique_employee_month_payslip",
+        conflict_detail="Payslip already generated for this employee and month"
     )
     
-    db.add(new_payslip)
-    db.commit()
-    db.refresh(new_payslip)
-    
     # Prepare response with employee details
     result = PayslipWithEmployee.from_orm(new_payslip)
     result.employee_name = employee.name
@@ -663,6 +776,17 @@ def generate_payslip(
     
     return result
 
+@router.post("/payslips/recompute", response_model=PayslipRecomputeResult)
+def recompute_payslips(
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute the payslips whose attendance or salary structure changed since they were generated.
+    Approved and paid payslips are not changed but flagged as stale.
+    """
+    return recompute_dirty_payslips(db, month)
+
 @router.get("/payslips/{payslip_id}/pdf", response_class=Response)
 def download_payslip_pdf(payslip_id: int, db: Session = Depends(get_db)):
     """
@@ -688,8 +812,14 @@ def download_payslip_pdf(payslip_id: int, db: Session = Depends(get_db)):
     if payslip.processed_by:
         processor = db.query(Employee).filter(Employee.id == payslip.processed_by).first()
     
+    # Get the structure breakdown; the cached as-of structure unless the payslip was built on another one
+    structure = structure_cache.get(db, payslip.employee_id, payslip.month)
+    if structure is None or structure.id != payslip.salary_structure_id:
+        db_structure = db.query(SalaryStructure).filter(SalaryStructure.id == payslip.salary_structure_id).first()
+        structure = StructureSnapshot.from_model(db_structure) if db_structure else None
+    
     # Generate the PDF
-    pdf_buffer = generate_payslip_pdf(payslip, employee, approver, processor)
+    pdf_buffer = generate_payslip_pdf(payslip, employee, approver, processor, structure)
     
     # Return the PDF as a downloadable file
     filename = f"payslip_{employee.name.replace(' ', '_')}_{payslip.month}.pdf"
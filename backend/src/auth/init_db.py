@@ -1,5 +1,8 @@
+import hashlib
+import json
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.orm import Session
-from src.models.auth import User, Role, Permission
 from src.auth.utils import get_password_hash
 
 # Predefined roles
@@ -74,65 +77,120 @@ PERMISSIONS = {
     ]
 }
 
+ADMIN_EMAIL = "admin@asikhfarms.com"
+ADMIN_NAME = "Admin User"
+
+# Marker row in seed_versions; its version is a fingerprint of the seed data above,
+# so changing the roles, permissions or admin user re-runs the seed on the next boot
+SEED_NAME = "auth"
+SEED_VERSION = hashlib.sha256(
+    json.dumps([ROLES, PERMISSIONS, ADMIN_EMAIL, ADMIN_NAME], sort_keys=True).encode()
+).hexdigest()
+
+SEED_VERSION_QUERY = text("SELECT version FROM seed_versions WHERE name = :name")
+
+# Creates whatever is missing in one statement. Rows inserted by the statement are
+# not visible to its own reads of roles, hence the RETURNING rows in all_roles.
+SEED_QUERY = text("""
+    WITH new_roles AS (
+        INSERT INTO roles (name, description)
+        SELECT * FROM unnest(CAST(:role_names AS text[]), CAST(:role_descriptions AS text[]))
+        ON CONFLICT DO NOTHING
+        RETURNING id, name
+    ),
+    all_roles AS (
+        SELECT id, name FROM new_roles
+        UNION ALL
+        SELECT id, name FROM roles WHERE name = ANY(CAST(:role_names AS text[]))
+    ),
+    new_permissions AS (
+        INSERT INTO permissions (name, description, role_id)
+        SELECT p.name, p.description, r.id
+        FROM unnest(
+            CAST(:permission_names AS text[]),
+            CAST(:permission_descriptions AS text[]),
+            CAST(:permission_roles AS text[])
+        ) AS p(name, description, role_name)
+        JOIN all_roles r ON r.name = p.role_name
+        -- Unique on name, or on (name, role_id) in migrated databases
+        ON CONFLICT DO NOTHING
+        RETURNING id
+    ),
+    new_admin AS (
+        INSERT INTO users (email, full_name, hashed_password, is_active)
+        SELECT :admin_email, :admin_name, :admin_password, true
+        WHERE NOT EXISTS (SELECT 1 FROM users WHERE email = :admin_email)
+        ON CONFLICT DO NOTHING
+        RETURNING id
+    ),
+    admin_roles AS (
+        INSERT INTO user_roles (user_id, role_id)
+        SELECT u.id, r.id FROM new_admin u JOIN all_roles r ON r.name = 'admin'
+        RETURNING user_id
+    )
+    SELECT
+        (SELECT COUNT(*) FROM new_roles) AS roles,
+        (SELECT COUNT(*) FROM new_permissions) AS permissions,
+        (SELECT COUNT(*) FROM new_admin) AS admins
+""")
+
+RECORD_SEED_VERSION_QUERY = text("""
+    INSERT INTO seed_versions (name, version, applied_at)
+    VALUES (:name, :version, now())
+    ON CONFLICT (name) DO UPDATE SET version = EXCLUDED.version, applied_at = EXCLUDED.applied_at
+""")
+
+def seed_parameters(db: Session) -> dict:
+    """Parameters of SEED_QUERY"""
+    permissions = [
+        # Permission names are unique, so each role gets its own copy
+        (f"{perm_data['name']}_{role_name}", perm_data["description"], role_name)
+        for role_name, role_permissions in PERMISSIONS.items()
+        for perm_data in role_permissions
+    ]
+    # Hashing is deliberately slow, so only hash when the admin user is missing
+    admin_exists = db.execute(
+        text("SELECT 1 FROM users WHERE email = :email"), {"email": ADMIN_EMAIL}
+    ).first() is not None
+    return {
+        "role_names": [role["name"] for role in ROLES],
+        "role_descriptions": [role["description"] for role in ROLES],
+        "permission_names": [name for name, _, _ in permissions],
+        "permission_descriptions": [description for _, description, _ in permissions],
+        "permission_roles": [role_name for _, _, role_name in permissions],
+        "admin_email": ADMIN_EMAIL,
+        "admin_name": ADMIN_NAME,
+        "admin_password": None if admin_exists else get_password_hash("adminpassword"),
+    }
+
 def init_db(db: Session) -> None:
     """
     Initialize database with default roles and permissions.
     Create admin user if it doesn't exist.
+    
+    Runs on every boot, so the common case is a single lookup of the seed version
+    marker; only when the seed data changed (or was never applied) is everything
+    missing created, with one idempotent statement.
     """
+    record_version = True
     try:
-        # Create roles
-        for role_data in ROLES:
-            role = db.query(Role).filter(Role.name == role_data["name"]).first()
-            if not role:
-                role = Role(**role_data)
-                db.add(role)
-                db.commit()
-                db.refresh(role)
-            
-            # Create permissions for this role
-            if role.name in PERMISSIONS:
-                for perm_data in PERMISSIONS[role.name]:
-                    # Create unique permission name for this role
-                    unique_name = f"{perm_data['name']}_{role.name}"
-                    
-                    # Check if this permission already exists for this role
-                    perm = db.query(Permission).filter(
-                        Permission.name == unique_name,
-                        Permission.role_id == role.id
-                    ).first()
-                    
-                    if not perm:
-                        # Create the permission with unique name
-                        perm = Permission(
-                            name=unique_name,
-                            description=perm_data["description"],
-                            role_id=role.id
-                        )
-                        db.add(perm)
-                        # Commit each permission to avoid losing all if one fails
-                        db.commit()
-        
-        # Create admin user if it doesn't exist
-        admin_email = "admin@asikhfarms.com"
-        admin = db.query(User).filter(User.email == admin_email).first()
-        
-        if not admin:
-            admin_role = db.query(Role).filter(Role.name == "admin").first()
-            
-            if admin_role:
-                admin = User(
-                    email=admin_email,
-                    full_name="Admin User",
-                    hashed_password=get_password_hash("adminpassword"),
-                    is_active=True
-                )
-                admin.roles.append(admin_role)
-                db.add(admin)
-                db.commit()
-        
-        # Final commit to ensure all changes are saved
+        applied_version = db.execute(SEED_VERSION_QUERY, {"name": SEED_NAME}).scalar()
+    except ProgrammingError:
+        # seed_versions does not exist until the migrations run; seed without the marker
+        db.rollback()
+        applied_version, record_version = None, False
+    if applied_version == SEED_VERSION:
+        return
+    
+    try:
+        created = db.execute(SEED_QUERY, seed_parameters(db)).one()
+        if record_version:
+            db.execute(RECORD_SEED_VERSION_QUERY, {"name": SEED_NAME, "version": SEED_VERSION})
         db.commit()
-        print("✅ Database initialized with default roles, permissions, and admin user")
+        print(
+            f"✅ Database initialized with default roles, permissions, and admin user "
+            f"({created.roles} roles, {created.permissions} permissions, {created.admins} admin users created)"
+        )
         
     except Exception as e:
         db.rollback()
@@ -3,10 +3,13 @@ from src.db.base_class import Base
 
 # Import all models here to ensure they're registered with SQLAlchemy
 # This helps resolve circular dependencies
-from src.models.employee import Employee
+from src.models.employee import Employee, EmployeeStats
 from src.models.attendance import Attendance
-from src.models.payroll import Payroll
-from src.models.salary import SalaryStructure, Payslip
+from src.models.payroll import Payroll, PayrollRun, PayrollRunError
+from src.models.salary import SalaryStructure, Payslip, PayslipDirtyMonth
+from src.models.calendar import Holiday, WeeklyOff
+from src.models.idempotency import IdempotencyKey
+from src.models.seed import SeedVersion
 
 # These imports are used by Alembic and other parts of the application
 # to discover all models
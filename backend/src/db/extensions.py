@@ -0,0 +1,16 @@
+"""
+Postgres extensions the schema depends on.
+
+``pg_trgm`` provides the ``gin_trgm_ops`` operator class of the employee search
+indexes, so it has to exist before ``Base.metadata.create_all`` builds them.
+Every code path creating tables from the models calls ``ensure_extensions`` first.
+"""
+from sqlalchemy import text
+
+REQUIRED_EXTENSIONS = ("pg_trgm",)
+
+
+def ensure_extensions(connection) -> None:
+    """Create the required extensions if they are missing. The caller commits."""
+    for extension in REQUIRED_EXTENSIONS:
+        connection.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
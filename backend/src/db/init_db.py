@@ -2,14 +2,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from db.base import Base
 from db.session import engine, SessionLocal
+from db.extensions import ensure_extensions
+from db.partitions import ensure_attendance_partitions
 from utils.seed_data import seed_all
 
 async def init_db():
     """
     Initialize the database by creating all tables if they don't exist
     """
+    # The employee search indexes need pg_trgm
+    with engine.begin() as connection:
+        ensure_extensions(connection)
+    
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    
+    # Create the monthly attendance partitions
+    with engine.begin() as connection:
+        ensure_attendance_partitions(connection)
 
 def seed_db():
     """
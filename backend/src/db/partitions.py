@@ -0,0 +1,170 @@
+"""
+Monthly range partitions of the attendance table.
+
+``attendance`` is partitioned by ``RANGE (date)`` with one partition per calendar
+month, named ``attendance_yYYYYmMM``. ``attendance_default`` catches rows outside
+every month partition (e.g. back-dated entries older than the first partition);
+creating the month partition later moves those rows out of the default partition.
+
+Month-bounded queries (``date >= first day AND date < first day of next month``)
+are pruned by the planner to a single partition, and old months can be detached
+from the table without rewriting it.
+
+Each partition holds its own index for the ``unique_employee_date`` constraint,
+named by Postgres after the partition (``attendance_y2026m09_employee_id_date_key``),
+and a duplicate is reported under that name rather than the parent constraint's:
+match violations with ``UNIQUE_CONSTRAINT_PATTERN``.
+"""
+import os
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from src.utils.dates import add_months, month_start
+
+ATTENDANCE_TABLE = "attendance"
+DEFAULT_PARTITION = "attendance_default"
+UNIQUE_CONSTRAINT = "unique_employee_date"
+
+# The unique constraint on the parent table, or its index on any partition
+# (Postgres appends a digit when the generated name is taken)
+UNIQUE_CONSTRAINT_PATTERN = re.compile(
+    rf"{UNIQUE_CONSTRAINT}|{ATTENDANCE_TABLE}_(y\d{{4}}m\d{{2}}|default)_employee_id_date_key\d*"
+)
+
+# Number of upcoming months to keep partitions ready for
+ATTENDANCE_PARTITIONS_AHEAD = int(os.getenv("ATTENDANCE_PARTITIONS_AHEAD", "3"))
+
+
+def partition_name(month: date) -> str:
+    """Return the partition name for the month starting at ``month``"""
+    return f"{ATTENDANCE_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(connection) -> bool:
+    """Check whether the attendance table is a partitioned table"""
+    return bool(connection.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table
+        )
+    """), {"table": ATTENDANCE_TABLE}).scalar())
+
+
+def table_exists(connection, name: str) -> bool:
+    """Check whether a table (or partition) exists"""
+    return connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def list_partitions(connection) -> List[str]:
+    """List the partitions currently attached to the attendance table"""
+    rows = connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+        ORDER BY child.relname
+    """), {"table": ATTENDANCE_TABLE})
+    return [row[0] for row in rows]
+
+
+def ensure_default_partition(connection) -> bool:
+    """Create the default partition if it is missing. Returns True if created."""
+    if table_exists(connection, DEFAULT_PARTITION):
+        return False
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {ATTENDANCE_TABLE} DEFAULT"))
+    return True
+
+
+def create_month_partition(connection, month: date) -> bool:
+    """
+    Create the partition for ``month`` if it is missing. Returns True if created.
+
+    Rows for that month already sitting in the default partition are moved into
+    the new partition, since Postgres refuses to create a partition whose range
+    overlaps rows in the default partition.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    if table_exists(connection, name):
+        return False
+
+    bounds = {"start": month, "end": add_months(month, 1)}
+    has_default_rows = table_exists(connection, DEFAULT_PARTITION) and connection.execute(text(f"""
+        SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end)
+    """), bounds).scalar()
+
+    if has_default_rows:
+        connection.execute(text(f"CREATE TEMP TABLE attendance_moving (LIKE {ATTENDANCE_TABLE}) ON COMMIT DROP"))
+        connection.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end RETURNING *
+            )
+            INSERT INTO attendance_moving SELECT * FROM moved
+        """), bounds)
+
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {ATTENDANCE_TABLE} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+
+    if has_default_rows:
+        connection.execute(text(f"INSERT INTO {ATTENDANCE_TABLE} SELECT * FROM attendance_moving"))
+        connection.execute(text("DROP TABLE attendance_moving"))
+
+    return True
+
+
+def ensure_attendance_partitions(
+    connection,
+    start: Optional[date] = None,
+    months_ahead: int = ATTENDANCE_PARTITIONS_AHEAD
+) -> List[str]:
+    """
+    Make sure the default partition and one partition per month from ``start``
+    (default: the current month) up to ``months_ahead`` months from now exist.
+
+    Takes a transaction-scoped advisory lock so concurrently starting workers do
+    not race on the same CREATE TABLE. Returns the names of created partitions.
+    The caller commits.
+    """
+    if not is_partitioned(connection):
+        return []
+
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('attendance_partitions'))"))
+
+    created = []
+    if ensure_default_partition(connection):
+        created.append(DEFAULT_PARTITION)
+
+    current = month_start(date.today())
+    month = month_start(start) if start and start < current else current
+    last = add_months(current, months_ahead)
+    while month <= last:
+        if create_month_partition(connection, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+
+    return created
+
+
+def detach_partitions_before(connection, before: date) -> List[str]:
+    """
+    Detach the month partitions for months before ``before``.
+
+    Detached partitions stay in the database as ordinary tables (so they can be
+    archived or dropped separately) but are no longer scanned by attendance
+    queries. Returns the names of detached partitions. The caller commits.
+    """
+    cutoff = partition_name(month_start(before))
+    detached = []
+    for name in list_partitions(connection):
+        if name == DEFAULT_PARTITION or name >= cutoff:
+            continue
+        connection.execute(text(f"ALTER TABLE {ATTENDANCE_TABLE} DETACH PARTITION {name}"))
+        detached.append(name)
+    return detached
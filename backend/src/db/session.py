@@ -1,5 +1,10 @@
 import os
-from sqlalchemy import create_engine
+import time
+import hashlib
+from typing import Dict, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -25,17 +30,119 @@ else:
     # Local development connection string
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Optional read replica for listing, reporting and export queries
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+if DATABASE_REPLICA_URL and DATABASE_REPLICA_URL.startswith("postgres://"):
+    DATABASE_REPLICA_URL = DATABASE_REPLICA_URL.replace("postgres://", "postgresql://", 1)
+
+# Replica reads fall back to the primary when the replica lags more than this
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+# How often the replica lag is measured
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+# Clients read from the primary for this long after one of their writes
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed
+# everything it received (an idle standby has an old replay timestamp but no lag)
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
 # Create engine for synchronous operations
 engine = create_engine(DATABASE_URL)
 
 # Create sessionmaker for synchronous sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+# Create the replica engine and sessionmaker only when a replica is configured
+replica_engine = create_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
+)
+
+# Last write time per client (in-memory, per process; use Redis to share across workers)
+recent_writes: Dict[str, float] = {}
+
+# Cached result of the last replica lag check
+replica_status = {"checked_at": 0.0, "fresh": False}
+
+def client_key(request: Optional[Request]) -> Optional[str]:
+    """
+    Identify the client for read-your-writes stickiness: the bearer token when
+    present, otherwise the client address
+    """
+    if request is None:
+        return None
+    identity = request.headers.get("authorization") or (request.client.host if request.client else "")
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+def has_recent_write(key: Optional[str]) -> bool:
+    """Check whether the client committed a write within the stickiness window"""
+    last_write = recent_writes.get(key) if key else None
+    return last_write is not None and time.monotonic() - last_write < READ_YOUR_WRITES_SECONDS
+
+@event.listens_for(SessionLocal, "after_commit")
+def remember_write(session):
+    """Record the commit time for the client that owns the session"""
+    key = session.info.get("client_key")
+    if not key:
+        return
+    now = time.monotonic()
+    recent_writes[key] = now
+    
+    # Drop expired entries so the map does not grow without bound
+    if len(recent_writes) > 10000:
+        for stale_key, written_at in list(recent_writes.items()):
+            if now - written_at >= READ_YOUR_WRITES_SECONDS:
+                recent_writes.pop(stale_key, None)
+
+def replica_is_fresh() -> bool:
+    """
+    Check (at most every REPLICA_LAG_CHECK_INTERVAL seconds) that the replica is
+    reachable and lags the primary by no more than REPLICA_MAX_LAG_SECONDS
+    """
+    now = time.monotonic()
+    if now - replica_status["checked_at"] < REPLICA_LAG_CHECK_INTERVAL:
+        return replica_status["fresh"]
+    
+    try:
+        with replica_engine.connect() as connection:
+            lag = connection.execute(REPLICA_LAG_QUERY).scalar()
+        fresh = lag is None or float(lag) <= REPLICA_MAX_LAG_SECONDS
+    except SQLAlchemyError:
+        fresh = False
+    
+    replica_status["checked_at"] = now
+    replica_status["fresh"] = fresh
+    return fresh
+
+def get_db(request: Request = None):
     """
     Dependency function to get a database session
     """
     db = SessionLocal()
+    db.info["client_key"] = client_key(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request = None):
+    """
+    Dependency function to get a read-only database session.
+    
+    Uses the read replica when one is configured, it is not lagging and the
+    client has not written recently; otherwise uses the primary.
+    """
+    use_replica = (
+        ReplicaSessionLocal is not None
+        and not has_recent_write(client_key(request))
+        and replica_is_fresh()
+    )
+    db = ReplicaSessionLocal() if use_replica else SessionLocal()
     try:
         yield db
     finally:
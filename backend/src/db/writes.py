@@ -0,0 +1,133 @@
+"""
+Constraint-driven inserts and versioned updates.
+
+Instead of SELECTing for an existing row before inserting (two round trips, and
+still racy), create endpoints insert directly and let the database's unique and
+foreign key constraints decide. Violations are translated into the endpoints'
+usual 400/404 responses. The insert goes through the ORM, so flush listeners
+(such as payslip dirty tracking) still see it.
+
+Updates of versioned rows (employees, salary structures, payslips) are single
+conditional ``UPDATE ... WHERE id = :id AND version = :version RETURNING``
+statements: the version comes from the client's ``If-Match`` header (the ETag
+of the representation it edited), and a mismatch is answered with 412 instead
+of silently overwriting a concurrent edit.
+"""
+from typing import Any, Dict, Optional, Pattern, Sequence, TypeVar, Union
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Postgres SQLSTATE codes
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+ModelType = TypeVar("ModelType")
+
+
+def violation(error: IntegrityError):
+    """Return the SQLSTATE and constraint name of an integrity error"""
+    orig = error.orig
+    diag = getattr(orig, "diag", None)
+    return getattr(orig, "pgcode", None), getattr(diag, "constraint_name", None)
+
+
+def constraint_matches(constraint: Optional[str], expected: Union[str, Pattern[str]]) -> bool:
+    """
+    Check a violated constraint's name against a name or, for constraints
+    reported under per-partition index names, a pattern matching all of them
+    """
+    if constraint is None:
+        return False
+    if isinstance(expected, str):
+        return constraint == expected
+    return expected.fullmatch(constraint) is not None
+
+
+def insert_unique(
+    db: Session,
+    obj: ModelType,
+    unique_constraint: Union[str, Pattern[str]],
+    conflict_detail: str,
+    not_found_detail: Optional[str] = None
+) -> ModelType:
+    """
+    Insert ``obj`` and commit. A violation of ``unique_constraint`` (a name, or a
+    pattern for partitioned tables) raises 400 with ``conflict_detail``; when ``not_found_detail`` is given, a foreign key
+    violation (a referenced row is missing) raises 404 with it. Other integrity
+    errors propagate.
+    """
+    db.add(obj)
+    try:
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        code, constraint = violation(error)
+        if code == UNIQUE_VIOLATION and constraint_matches(constraint, unique_constraint):
+            raise HTTPException(status_code=400, detail=conflict_detail)
+        if code == FOREIGN_KEY_VIOLATION and not_found_detail:
+            raise HTTPException(status_code=404, detail=not_found_detail)
+        raise
+
+    db.refresh(obj)
+    return obj
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    Return the version in an ``If-Match`` header (an ETag such as ``"3"`` or
+    ``W/"3"``), or None when the header is absent or ``*``
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be an ETag returned by this API")
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def update_versioned(
+    db: Session,
+    model,
+    row_id: int,
+    values: Dict[str, Any],
+    expected_version: Optional[int],
+    not_found_detail: str,
+    returning: Sequence = (),
+    where: Sequence = ()
+):
+    """
+    Apply ``values`` to one row in a single ``UPDATE ... RETURNING`` statement,
+    incrementing its version. When ``expected_version`` is given, the row is only
+    updated if its version still matches, otherwise 412 is raised; a missing row
+    raises 404 with ``not_found_detail``.
+
+    Returns the updated row (every column, plus the ``returning`` expressions).
+    ``where`` adds criteria, e.g. joining a FROM subquery. The caller commits.
+    """
+    table = model.__table__
+    statement = update(table).where(table.c.id == row_id, *where)
+    if expected_version is not None:
+        statement = statement.where(table.c.version == expected_version)
+
+    row = db.execute(
+        statement.values(**values, version=table.c.version + 1).returning(*table.c, *returning)
+    ).first()
+    if row is not None:
+        return row
+
+    if db.execute(select(table.c.id).where(table.c.id == row_id)).first() is None:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+    raise HTTPException(
+        status_code=412,
+        detail="The record was changed by another request; reload it and retry"
+    )
@@ -14,10 +14,13 @@ from src.db.base_class import Base
 
 # Import all models to register them with SQLAlchemy
 # The order is important to handle foreign key relationships correctly
-from src.models.employee import Employee
+from src.models.employee import Employee, EmployeeStats
 from src.models.attendance import Attendance
-from src.models.payroll import Payroll
-from src.models.salary import SalaryStructure, Payslip
+from src.models.payroll import Payroll, PayrollRun, PayrollRunError
+from src.models.salary import SalaryStructure, Payslip, PayslipDirtyMonth
+from src.models.calendar import Holiday, WeeklyOff
+from src.models.idempotency import IdempotencyKey
+from src.models.seed import SeedVersion
 
 # Import database initialization function
 from src.db.init_db import init_db
@@ -2,7 +2,7 @@ from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse
 import uvicorn
 import sys
 import os
@@ -16,9 +16,12 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import db_setup
 
 # Now import API routes
-from api import employees, attendance, payroll, salary, auth, examples
+from api import employees, attendance, payroll, salary, calendar, auth, examples
 from db.session import get_db
 from auth.init_db import init_db
+from db.partitions import ensure_attendance_partitions
+from utils.compression import CompressionMiddleware
+from utils.idempotency import IdempotencyMiddleware
 
 # Create FastAPI app with redirect_slashes=False to enforce no-trailing-slash URLs
 app = FastAPI(
@@ -40,6 +43,8 @@ app = FastAPI(
     """,
     # Disable automatic redirects for trailing slashes
     redirect_slashes=False,
+    # Serialize responses with orjson by default
+    default_response_class=ORJSONResponse,
     version="1.0.0",
     contact={
         "name": "Asikh Farms HR Department",
@@ -50,6 +55,10 @@ app = FastAPI(
     },
 )
 
+# Replay stored responses for retried requests with an Idempotency-Key header
+# (innermost, so stored bodies are uncompressed)
+app.add_middleware(IdempotencyMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -59,11 +68,15 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Compress large JSON/CSV responses (brotli when installed, otherwise gzip)
+app.add_middleware(CompressionMiddleware)
+
 # Include routers with standard prefixes
 app.include_router(employees.router, prefix="/employees", tags=["Employees"])
 app.include_router(attendance.router, prefix="/attendance", tags=["Attendance"])
 app.include_router(payroll.router, prefix="/payroll", tags=["Payroll"])
 app.include_router(salary.router, prefix="/salary", tags=["Salary Management"])
+app.include_router(calendar.router, prefix="/calendar", tags=["Calendar"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(examples.router)  # Examples router already has prefix and tags
 
@@ -72,6 +85,10 @@ def startup_event():
     # Initialize database with default roles and admin user
     db = next(get_db())
     init_db(db)
+    
+    # Make sure the attendance partitions for the coming months exist
+    ensure_attendance_partitions(db)
+    db.commit()
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -3,7 +3,15 @@ Models package initialization.
 This file helps resolve circular imports between models.
 """
 # Import all models to ensure they're registered with SQLAlchemy
-from src.models.employee import Employee
+from src.models.employee import Employee, EmployeeStats
 from src.models.attendance import Attendance
-from src.models.payroll import Payroll
-from src.models.salary import SalaryStructure, Payslip
+from src.models.payroll import Payroll, PayrollRun, PayrollRunError
+from src.models.salary import SalaryStructure, Payslip, PayslipDirtyMonth
+from src.models.calendar import Holiday, WeeklyOff
+from src.models.idempotency import IdempotencyKey
+from src.models.seed import SeedVersion
+
+# Flush listeners keeping derived tables in step with the models above; registered
+# here so every code path that imports a model writes through them
+import src.utils.employee_stats  # noqa: E402,F401
+import src.utils.payslip_recompute  # noqa: E402,F401
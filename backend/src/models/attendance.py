@@ -16,9 +16,10 @@ def compile_total_hours(element, compiler, **kw):
 class Attendance(Base):
     __tablename__ = "attendance"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
-    date = Column(Date, nullable=False)
+    # Partition key; Postgres requires it to be part of the primary key
+    date = Column(Date, primary_key=True, nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=True)
     break_duration = Column(Interval, default='0 minutes')
@@ -29,11 +30,12 @@ class Attendance(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Constraints
+    # The table is range partitioned by month on date (see src/db/partitions.py)
     __table_args__ = (
         UniqueConstraint('employee_id', 'date', name='unique_employee_date'),
         CheckConstraint('date <= CURRENT_DATE', name='valid_date'),
         CheckConstraint('end_time IS NULL OR end_time > start_time', name='valid_time_order'),
-        {'extend_existing': True}
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (date)'}
     )
     
     # Relationship
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, CheckConstraint, UniqueConstraint, func
+from src.db.base_class import Base
+
+class Holiday(Base):
+    """A non-working day, for one location or (location NULL) for all locations"""
+    __tablename__ = "holidays"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    location = Column(String(100), nullable=True)  # NULL: all locations
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('location', 'date', name='unique_location_holiday'),
+        {'extend_existing': True}
+    )
+
+
+class WeeklyOff(Base):
+    """A weekday off every week, for one location or (location NULL) as the default for all locations"""
+    __tablename__ = "weekly_offs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    location = Column(String(100), nullable=True)  # NULL: default for locations without their own
+    weekday = Column(Integer, nullable=False)  # 0 = Monday ... 6 = Sunday
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('location', 'weekday', name='unique_location_weekday'),
+        CheckConstraint('weekday >= 0 AND weekday <= 6', name='valid_weekday'),
+        {'extend_existing': True}
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, CheckConstraint, func
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Numeric, ForeignKey, CheckConstraint, Index, func
 from sqlalchemy.orm import relationship
 from src.db.base_class import Base
 
@@ -14,16 +14,27 @@ class Employee(Base):
     location = Column(String(100), nullable=False)
     status = Column(String(10), default="active")  # active/inactive/terminated
     
+    # Salary account, used for payment files
+    bank_account_number = Column(String(34), nullable=True)
+    bank_ifsc = Column(String(11), nullable=True)
+    
     # Audit fields
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Optimistic locking: incremented on every update, sent back as the ETag
+    version = Column(Integer, nullable=False, server_default="1")
     
     # Constraints
     __table_args__ = (
         CheckConstraint("status IN ('active', 'inactive', 'terminated')", name="valid_status"),
         CheckConstraint("doj <= CURRENT_DATE", name="valid_doj"),
+        # Trigram indexes for /employees/search (fuzzy, substring and prefix matches)
+        Index('ix_employees_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_employees_phone_trgm', 'phone', postgresql_using='gin', postgresql_ops={'phone': 'gin_trgm_ops'}),
+        Index('ix_employees_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
         {'extend_existing': True}
     )
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     attendance_records = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan")
@@ -39,3 +50,23 @@ class Employee(Base):
     
     # User relationship for authentication
     user = relationship("User", back_populates="employee", uselist=False)
+
+class EmployeeStats(Base):
+    """
+    Per-employee counters for the detailed employee views, kept up to date on
+    write (see src/utils/employee_stats.py) and reconciled periodically
+    """
+    __tablename__ = "employee_stats"
+    
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    attendance_count = Column(Integer, nullable=False, default=0)
+    last_attendance_date = Column(Date, nullable=True)
+    latest_payroll_month = Column(String(7), nullable=True)  # Format: YYYY-MM
+    latest_net_pay = Column(Numeric(10, 2), nullable=True)  # Net amount of the latest payslip
+    
+    # Audit fields
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        {'extend_existing': True},
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, func
+from src.db.base_class import Base
+
+class IdempotencyKey(Base):
+    """The first response to a request sent with an ``Idempotency-Key`` header, replayed on retries"""
+    __tablename__ = "idempotency_keys"
+    
+    # SHA-256 of the client, method, path and key
+    key_hash = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body
+    
+    # Stored response
+    status_code = Column(Integer, nullable=False)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=False)
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    __table_args__ = (
+        {'extend_existing': True},
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, func
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Boolean, Text, ForeignKey, CheckConstraint, UniqueConstraint, Index, func
 from sqlalchemy.orm import relationship
 from src.db.base_class import Base
 
@@ -29,6 +29,8 @@ class Payroll(Base):
         CheckConstraint("month ~ '^\\d{4}-\\d{2}$'", name='valid_month'),
         CheckConstraint('days_present >= 0 AND days_present <= 31', name='valid_days_present'),
         CheckConstraint('salary_total >= 0', name='valid_salary'),
+        # Latest payroll per employee
+        Index('ix_payroll_employee_month', 'employee_id', month.desc()),
         {'extend_existing': True}
     )
     
@@ -55,3 +57,60 @@ class Payroll(Base):
             total -= self.deductions
             
         return total
+
+
+class PayrollRun(Base):
+    """
+    A month-end payroll generation job.
+    
+    Employees are processed in id order, chunk by chunk; last_employee_id is the
+    checkpoint committed together with each chunk, so a crashed run resumes after
+    the last committed chunk.
+    """
+    __tablename__ = "payroll_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String(7), nullable=False)  # Format: YYYY-MM
+    status = Column(String(10), nullable=False, default="pending")  # pending/running/completed/failed
+    generate_payslips = Column(Boolean, nullable=False, default=False)
+    chunk_size = Column(Integer, nullable=False, default=100)
+    
+    # Progress
+    total_employees = Column(Integer, nullable=False, default=0)
+    processed_employees = Column(Integer, nullable=False, default=0)
+    skipped_employees = Column(Integer, nullable=False, default=0)
+    failed_employees = Column(Integer, nullable=False, default=0)
+    last_employee_id = Column(Integer, nullable=True)  # Checkpoint
+    error = Column(Text, nullable=True)
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    processed_by = Column(Integer, ForeignKey("employees.id"), nullable=True)
+    
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'running', 'completed', 'failed')", name='valid_payroll_run_status'),
+        CheckConstraint("month ~ '^\\d{4}-\\d{2}$'", name='valid_payroll_run_month'),
+        {'extend_existing': True}
+    )
+    
+    # Relationships
+    errors = relationship("PayrollRunError", back_populates="run", cascade="all, delete-orphan",
+                          order_by="PayrollRunError.id")
+
+
+class PayrollRunError(Base):
+    """An employee that could not be processed by a payroll run"""
+    __tablename__ = "payroll_run_errors"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("payroll_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=True)
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    run = relationship("PayrollRun", back_populates="errors")
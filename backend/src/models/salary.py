@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, func, Boolean, Text
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, func, Boolean, Text
 from sqlalchemy.orm import relationship
 from src.db.base_class import Base
 
@@ -29,6 +29,8 @@ class SalaryStructure(Base):
     # Audit fields
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Optimistic locking: incremented on every update, sent back as the ETag
+    version = Column(Integer, nullable=False, server_default="1")
     created_by = Column(Integer, ForeignKey("employees.id"), nullable=True)
     
     # Relationships
@@ -40,8 +42,11 @@ class SalaryStructure(Base):
         CheckConstraint('basic_salary >= 0', name='valid_basic_salary'),
         CheckConstraint('gross_salary >= 0', name='valid_gross_salary'),
         CheckConstraint('net_salary >= 0', name='valid_net_salary'),
+        # As-of lookups: latest structure per employee before a date
+        Index('ix_salary_structures_employee_effective', 'employee_id', effective_from.desc()),
         {'extend_existing': True}
     )
+    __mapper_args__ = {"version_id_col": version}
     
     def calculate_gross_salary(self):
         """Calculate gross salary based on all allowances"""
@@ -97,6 +102,7 @@ class Payslip(Base):
     is_generated = Column(Boolean, default=False)
     is_approved = Column(Boolean, default=False)
     is_paid = Column(Boolean, default=False)
+    is_stale = Column(Boolean, default=False)  # Inputs changed after approval; needs manual review
     payment_date = Column(DateTime(timezone=True), nullable=True)
     payment_reference = Column(String(100), nullable=True)
     
@@ -109,6 +115,8 @@ class Payslip(Base):
     # Audit fields
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Optimistic locking: incremented on every update, sent back as the ETag
+    version = Column(Integer, nullable=False, server_default="1")
     processed_by = Column(Integer, ForeignKey("employees.id"), nullable=True)
     approved_by = Column(Integer, ForeignKey("employees.id"), nullable=True)
     
@@ -128,3 +136,25 @@ class Payslip(Base):
         CheckConstraint('net_amount >= 0', name='valid_net_amount_payslip'),
         {'extend_existing': True}
     )
+    __mapper_args__ = {"version_id_col": version}
+
+
+class PayslipDirtyMonth(Base):
+    """
+    An (employee, month) whose attendance or salary structure changed after its
+    payslip may have been generated. Recorded on flush and consumed by the
+    payslip recomputation.
+    """
+    __tablename__ = "payslip_dirty_months"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    month = Column(String(7), nullable=False)  # Format: YYYY-MM
+    reason = Column(String(20), nullable=False)  # attendance/salary_structure
+    marked_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('employee_id', 'month', name='unique_employee_month_dirty'),
+        {'extend_existing': True}
+    )
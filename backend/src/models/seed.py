@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, func
+from src.db.base_class import Base
+
+class SeedVersion(Base):
+    """Which version of a set of seed data (e.g. the default roles) the database holds"""
+    __tablename__ = "seed_versions"
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(String(64), nullable=False)  # Fingerprint of the seed data
+    
+    # Audit fields
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        {'extend_existing': True},
+    )
@@ -59,3 +59,15 @@ class Attendance(AttendanceInDB):
 class AttendanceWithEmployee(Attendance):
     employee_name: Optional[str] = None
     employee_designation: Optional[str] = None
+
+class AttendanceMonthlySummary(BaseModel):
+    employee_id: int
+    days_present: int
+    total_hours: float
+    regular_hours: float
+    overtime_hours: float  # Hours beyond 8 on each day
+    night_hours: float
+    weekend_hours: float
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field, validator
+from typing import Optional
+from datetime import date, datetime
+import re
+
+class HolidayCreate(BaseModel):
+    date: date
+    name: str = Field(..., max_length=100)
+    location: Optional[str] = Field(None, max_length=100)  # None: all locations
+
+class Holiday(HolidayCreate):
+    id: int
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class WeeklyOffCreate(BaseModel):
+    location: Optional[str] = Field(None, max_length=100)  # None: default for all locations
+    weekday: int = Field(..., ge=0, le=6)  # 0 = Monday ... 6 = Sunday
+
+class WeeklyOff(WeeklyOffCreate):
+    id: int
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class WorkingDays(BaseModel):
+    location: Optional[str] = None
+    month: str
+    working_days: int
+    
+    @validator('month')
+    def validate_month_format(cls, v):
+        if not re.match(r'^\d{4}-\d{2}$', v):
+            raise ValueError('Month must be in YYYY-MM format')
+        return v
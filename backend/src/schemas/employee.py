@@ -30,7 +30,27 @@ class EmployeeBase(BaseModel):
             raise ValueError('Date of joining cannot be in the future')
         return v
 
-class EmployeeCreate(EmployeeBase):
+class EmployeeBankDetails(BaseModel):
+    """
+    Bank details are write-only: accepted on create and update, read only by the
+    payment file export, and never included in employee responses
+    """
+    bank_account_number: Optional[str] = Field(None, max_length=34)
+    bank_ifsc: Optional[str] = Field(None, max_length=11)
+    
+    @validator('bank_account_number')
+    def validate_bank_account_number(cls, v):
+        if v is not None and not re.match(r'^[0-9A-Za-z]{6,34}$', v):
+            raise ValueError('Bank account number must be 6 to 34 letters or digits')
+        return v
+    
+    @validator('bank_ifsc')
+    def validate_bank_ifsc(cls, v):
+        if v is not None and not re.match(r'^[A-Z]{4}0[A-Z0-9]{6}$', v):
+            raise ValueError('IFSC must be 4 letters, a zero and 6 letters or digits')
+        return v
+
+class EmployeeCreate(EmployeeBase, EmployeeBankDetails):
     pass
 
 class EmployeeUpdate(BaseModel):
@@ -41,6 +61,8 @@ class EmployeeUpdate(BaseModel):
     designation: Optional[str] = Field(None, max_length=50)
     location: Optional[str] = Field(None, max_length=100)
     status: Optional[str] = None
+    bank_account_number: Optional[str] = Field(None, max_length=34)
+    bank_ifsc: Optional[str] = Field(None, max_length=11)
     
     @validator('status')
     def validate_status(cls, v):
@@ -59,9 +81,22 @@ class EmployeeUpdate(BaseModel):
         if v is not None and v > date.today():
             raise ValueError('Date of joining cannot be in the future')
         return v
+    
+    @validator('bank_account_number')
+    def validate_bank_account_number(cls, v):
+        if v is not None and not re.match(r'^[0-9A-Za-z]{6,34}$', v):
+            raise ValueError('Bank account number must be 6 to 34 letters or digits')
+        return v
+    
+    @validator('bank_ifsc')
+    def validate_bank_ifsc(cls, v):
+        if v is not None and not re.match(r'^[A-Z]{4}0[A-Z0-9]{6}$', v):
+            raise ValueError('IFSC must be 4 letters, a zero and 6 letters or digits')
+        return v
 
 class EmployeeInDB(EmployeeBase):
     id: int
+    version: int = 1  # Send back as If-Match (the ETag) when updating
     created_at: datetime
     updated_at: datetime
     
@@ -75,4 +110,33 @@ class Employee(EmployeeInDB):
 
 class EmployeeWithRelations(Employee):
     attendance_count: Optional[int] = None
+    last_attendance_date: Optional[date] = None
+    latest_net_pay: Optional[float] = None
     latest_payroll: Optional[dict] = None
+
+class EmployeeSearchResult(BaseModel):
+    """Lightweight projection returned by the employee search"""
+    id: int
+    name: str
+    email: Optional[str] = None
+    phone: str
+    doj: date
+    designation: str
+    location: str
+    status: str
+    score: float  # Relevance: how closely the query matches the name or email (0 to 1)
+    
+    class Config:
+        from_attributes = True
+
+class EmployeeImportRow(BaseModel):
+    line: int  # Line of the upload (CSV line numbers count the header)
+    status: Literal["created", "updated", "error"]
+    id: Optional[int] = None
+    detail: Optional[str] = None  # Why the row was rejected
+
+class EmployeeImportResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[EmployeeImportRow]
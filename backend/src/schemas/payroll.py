@@ -1,5 +1,5 @@
 from pydantic import BaseModel, validator, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import re
 
@@ -57,3 +57,45 @@ class PayrollWithEmployee(Payroll):
     employee_name: Optional[str] = None
     employee_designation: Optional[str] = None
     processor_name: Optional[str] = None
+
+class PayrollRunCreate(BaseModel):
+    month: str  # Format: YYYY-MM
+    processor_id: Optional[int] = None
+    chunk_size: int = Field(100, ge=1, le=1000)
+    generate_payslips: bool = False
+    
+    @validator('month')
+    def validate_month_format(cls, v):
+        if not re.match(r'^\d{4}-\d{2}$', v):
+            raise ValueError('Month must be in YYYY-MM format')
+        return v
+
+class PayrollRunError(BaseModel):
+    employee_id: Optional[int] = None
+    message: str
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class PayrollRun(BaseModel):
+    id: int
+    month: str
+    status: str
+    generate_payslips: bool
+    chunk_size: int
+    total_employees: int
+    processed_employees: int
+    skipped_employees: int
+    failed_employees: int
+    last_employee_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    processed_by: Optional[int] = None
+    errors: List[PayrollRunError] = []
+    
+    class Config:
+        from_attributes = True
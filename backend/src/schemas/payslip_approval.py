@@ -1,4 +1,20 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class PayslipApprovalRequest(BaseModel):
     approver_id: int
+
+class PayslipBatchApprovalRequest(BaseModel):
+    approver_id: int
+    payslip_ids: Optional[List[int]] = None  # Either ids ...
+    month: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}$")  # ... or a month
+
+class PayslipBatchPaymentRequest(BaseModel):
+    payment_reference: str = Field(..., max_length=100)
+    payslip_ids: Optional[List[int]] = None  # Either ids ...
+    month: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}$")  # ... or a month
+
+class PayslipBatchResult(BaseModel):
+    updated: int
+    skipped: int  # Matched payslips not in the required state (or unknown ids)
+    updated_ids: List[int]
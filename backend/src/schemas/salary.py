@@ -79,6 +79,7 @@ class SalaryStructureUpdate(BaseModel):
 
 class SalaryStructureInDB(SalaryStructureBase):
     id: int
+    version: int = 1  # Send back as If-Match (the ETag) when updating
     created_at: datetime
     updated_at: datetime
     created_by: Optional[int] = None
@@ -184,6 +185,8 @@ class PayslipUpdate(BaseModel):
 
 class PayslipInDB(PayslipBase):
     id: int
+    version: int = 1  # Send back as If-Match (the ETag) when updating
+    is_stale: bool = False
     created_at: datetime
     updated_at: datetime
     processed_by: Optional[int] = None
@@ -203,3 +206,16 @@ class PayslipWithEmployee(Payslip):
     employee_designation: Optional[str] = None
     processor_name: Optional[str] = None
     approver_name: Optional[str] = None
+
+
+class PayslipRecomputeFailure(BaseModel):
+    employee_id: int
+    month: str
+    detail: str
+
+
+class PayslipRecomputeResult(BaseModel):
+    recomputed: int
+    flagged: int
+    cleared: int
+    failed: List[PayslipRecomputeFailure] = []
@@ -0,0 +1,171 @@
+"""
+Production server entrypoint.
+
+Runs the app under gunicorn with uvicorn workers, so one CPU-bound request
+(a PDF render, a bcrypt check) only occupies one of several processes:
+
+* the worker count is sized from the available cores and memory (or taken from
+  ``WEB_CONCURRENCY``)
+* the app is imported once in the master before forking (``preload_app``), so
+  workers share the imported code copy-on-write and start instantly
+* each worker is gracefully replaced after ``WEB_MAX_REQUESTS`` requests (with
+  jitter, so they do not all restart together), capping memory growth
+* uvicorn uses uvloop and httptools when they are installed
+
+Without gunicorn (e.g. on Windows) it falls back to uvicorn's own worker
+processes, which neither preload nor recycle.
+
+Usage (from the backend directory):
+    python -m src.server
+"""
+import os
+import sys
+from importlib.util import find_spec
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn is optional (and unavailable on Windows)
+    BaseApplication = None
+
+APP = "src.main:app"
+
+# Server settings
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Memory budget per worker, used to cap the worker count
+WEB_WORKER_MEMORY_MB = int(os.getenv("WEB_WORKER_MEMORY_MB", "256"))
+WEB_MAX_WORKERS = int(os.getenv("WEB_MAX_WORKERS", "12"))
+# Requests served before a worker is replaced (0 disables recycling), plus random jitter
+WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "1000"))
+WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "100"))
+# Seconds a silent worker may take before it is killed, and to finish requests on shutdown
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "60"))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+# Modules of the app itself (imported both as src.* and, by main.py, top-level)
+APP_MODULE_PREFIXES = ("src.", "api.", "auth.", "db.", "utils.")
+
+
+def available_cpus() -> int:
+    """Cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def read_limit(path: str) -> Optional[int]:
+    try:
+        with open(path) as limit_file:
+            value = limit_file.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def available_memory() -> Optional[int]:
+    """Memory (bytes) available to this container: its cgroup limit, otherwise the physical memory"""
+    limits = [
+        read_limit("/sys/fs/cgroup/memory.max"),  # cgroup v2 ("max" when unlimited)
+        read_limit("/sys/fs/cgroup/memory/memory.limit_in_bytes"),  # cgroup v1
+    ]
+    try:
+        limits.append(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+    except (AttributeError, ValueError, OSError):
+        pass
+    limits = [limit for limit in limits if limit]
+    return min(limits) if limits else None
+
+
+def worker_count() -> int:
+    """
+    ``WEB_CONCURRENCY`` when set (Heroku sets it per dyno size), otherwise two
+    workers per core plus one, limited by memory and ``WEB_MAX_WORKERS``
+    """
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+
+    workers = available_cpus() * 2 + 1
+    memory = available_memory()
+    if memory:
+        workers = min(workers, memory // (WEB_WORKER_MEMORY_MB * 1024 * 1024))
+    return max(1, min(workers, WEB_MAX_WORKERS))
+
+
+def event_loop() -> str:
+    return "uvloop" if find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if find_spec("httptools") else "h11"
+
+
+def dispose_inherited_pools(server, worker) -> None:
+    """
+    Drop the database connections a worker inherited from the master: a pooled
+    connection must never be shared by two processes. (Importing the app opens
+    none, so this is a safeguard.)
+    """
+    for name, module in list(sys.modules.items()):
+        if module is None or not name.startswith(APP_MODULE_PREFIXES):
+            continue
+        for value in list(vars(module).values()):
+            if isinstance(value, Engine):
+                value.dispose(close=False)
+
+
+if BaseApplication is not None:
+    class Server(BaseApplication):
+        """gunicorn configured from code instead of a config file"""
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from src.main import app
+            return app
+
+
+def gunicorn_options() -> dict:
+    return {
+        "bind": f"{HOST}:{PORT}",
+        "workers": worker_count(),
+        # uvicorn's worker picks uvloop and httptools when they are installed
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": WEB_MAX_REQUESTS,
+        "max_requests_jitter": WEB_MAX_REQUESTS_JITTER,
+        "timeout": WEB_TIMEOUT,
+        "graceful_timeout": WEB_GRACEFUL_TIMEOUT,
+        "keepalive": WEB_KEEPALIVE,
+        "post_fork": dispose_inherited_pools,
+        "accesslog": "-",
+        "errorlog": "-",
+        # Heartbeat files in memory, not on a possibly slow container disk
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+    }
+
+
+def main():
+    workers = worker_count()
+    print(f"🚀 Starting {workers} workers on {HOST}:{PORT} ({event_loop()} event loop, {http_protocol()} parser)")
+
+    if BaseApplication is not None:
+        Server(gunicorn_options()).run()
+        return
+
+    import uvicorn
+    print("⚠️  gunicorn is not installed: workers are not preloaded or recycled")
+    uvicorn.run(APP, host=HOST, port=PORT, workers=workers, loop=event_loop(), http=http_protocol())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Cold archive of historical attendance and payroll records.
+
+Closed months (older than the retention window) are moved out of Postgres into
+one compressed columnar file per table and month under ``ARCHIVE_DIR``:
+
+* Parquet with zstd compression when ``pyarrow`` is installed
+* otherwise CSV compressed with zstd (``zstandard`` package) or, as a last
+  resort, gzip
+
+``manifest.json`` in the archive directory records every archived month, its file,
+format and row count. ``read_archived_attendance`` uses it to serve archived rows
+back to the attendance history endpoint.
+"""
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Interval, Numeric, Time, text
+from sqlalchemy.orm import Session
+
+from src.db.partitions import partition_name, table_exists
+from src.models.attendance import Attendance
+from src.models.payroll import Payroll
+from src.utils.dates import add_months, month_bounds, month_start
+from src.utils.employee_stats import refresh_employee_stats
+
+# pyarrow is optional, and slow to import: it is only loaded when a Parquet archive is written or read
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional
+    zstandard = None
+
+# Archive settings
+ARCHIVE_DIR = os.getenv(
+    "ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "archive")
+)
+ARCHIVE_RETENTION_MONTHS = int(os.getenv("ARCHIVE_RETENTION_MONTHS", "24"))
+
+MANIFEST_FILE = "manifest.json"
+
+# Archivable tables and their models (the column types drive CSV parsing)
+ARCHIVE_MODELS = {
+    "attendance": Attendance,
+    "payroll": Payroll,
+}
+
+
+def archive_format() -> str:
+    """Return the file format used for new archives"""
+    if PYARROW_AVAILABLE:
+        return "parquet"
+    if zstandard is not None:
+        return "csv.zst"
+    return "csv.gz"
+
+
+def retention_cutoff(today: Optional[date] = None) -> str:
+    """Return the first month (YYYY-MM) that is still inside the retention window"""
+    cutoff = add_months(month_start(today or date.today()), -ARCHIVE_RETENTION_MONTHS)
+    return f"{cutoff.year:04d}-{cutoff.month:02d}"
+
+
+def load_pyarrow():
+    """Import pyarrow (with its Parquet module) on first use"""
+    import pyarrow
+    import pyarrow.parquet
+    return pyarrow
+
+
+# Manifest
+
+def manifest_path() -> str:
+    return os.path.join(ARCHIVE_DIR, MANIFEST_FILE)
+
+
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    """Load the archive manifest, or an empty one if nothing was archived yet"""
+    path = manifest_path()
+    if not os.path.exists(path):
+        return {table: {} for table in ARCHIVE_MODELS}
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+    for table in ARCHIVE_MODELS:
+        manifest.setdefault(table, {})
+    return manifest
+
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically replace the archive manifest"""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    tmp_path = manifest_path() + ".tmp"
+    with open(tmp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        manifest_file.flush()
+        os.fsync(manifest_file.fileno())
+    os.replace(tmp_path, manifest_path())
+
+
+# File formats
+
+def encode_value(value: Any) -> str:
+    """Encode a column value for CSV"""
+    if value is None:
+        return ""
+    if isinstance(value, timedelta):
+        return str(value.total_seconds())
+    if isinstance(value, (date, time, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def decode_value(column_type, value: str) -> Any:
+    """Decode a CSV value back to the Python type of the model column"""
+    if value == "":
+        return None
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, Numeric):
+        return Decimal(value)
+    if isinstance(column_type, Boolean):
+        return value == "True"
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Time):
+        return time.fromisoformat(value)
+    if isinstance(column_type, Interval):
+        return timedelta(seconds=float(value))
+    return value
+
+
+def write_archive_file(path: str, columns: List[str], rows: List[Dict[str, Any]], file_format: str) -> None:
+    """Write rows to ``path`` (via a temporary file, so a crash never leaves a partial archive)"""
+    tmp_path = path + ".tmp"
+
+    if file_format == "parquet":
+        pyarrow = load_pyarrow()
+        table = pyarrow.Table.from_pylist(rows) if rows else pyarrow.table({name: [] for name in columns})
+        pyarrow.parquet.write_table(table, tmp_path, compression="zstd")
+    else:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([encode_value(row[name]) for name in columns])
+        data = buffer.getvalue().encode()
+        if file_format == "csv.zst":
+            data = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            data = gzip.compress(data)
+        with open(tmp_path, "wb") as archive_file:
+            archive_file.write(data)
+
+    with open(tmp_path, "rb") as archive_file:
+        os.fsync(archive_file.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_archive_file(table_name: str, path: str, file_format: str, employee_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of an archive file, optionally only those of one employee"""
+    if file_format == "parquet":
+        filters = [("employee_id", "=", employee_id)] if employee_id is not None else None
+        yield from load_pyarrow().parquet.read_table(path, filters=filters).to_pylist()
+        return
+
+    with open(path, "rb") as archive_file:
+        data = archive_file.read()
+    if file_format == "csv.zst":
+        data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    else:
+        data = gzip.decompress(data)
+
+    column_types = {column.name: column.type for column in ARCHIVE_MODELS[table_name].__table__.columns}
+    for raw_row in csv.DictReader(io.StringIO(data.decode())):
+        row = {name: decode_value(column_types[name], value) for name, value in raw_row.items()}
+        if employee_id is None or row["employee_id"] == employee_id:
+            yield row
+
+
+# Archiving
+
+def archivable_months(db: Session, table_name: str, before: str) -> List[str]:
+    """List the months with live rows in ``table_name`` that are older than ``before`` (YYYY-MM)"""
+    if table_name == "attendance":
+        rows = db.execute(text("""
+            SELECT DISTINCT to_char(date, 'YYYY-MM') FROM attendance WHERE date < :before
+        """), {"before": month_bounds(before)[0]})
+        months = {row[0] for row in rows}
+        
+        # Month partitions detached from attendance are archivable too
+        detached = db.execute(text("""
+            SELECT relname FROM pg_class
+            WHERE relkind = 'r' AND NOT relispartition AND relname ~ '^attendance_y[0-9]{4}m[0-9]{2}$'
+        """))
+        for (name,) in detached:
+            month = f"{name[-7:-3]}-{name[-2:]}"
+            if month < before:
+                months.add(month)
+        return sorted(months)
+    
+    rows = db.execute(text("""
+        SELECT DISTINCT month FROM payroll WHERE month < :before ORDER BY 1
+    """), {"before": before})
+    return [row[0] for row in rows]
+
+
+def archive_month(db: Session, table_name: str, month: str) -> Optional[Dict[str, Any]]:
+    """
+    Move one month of ``table_name`` into an archive file.
+
+    The file and its manifest entry are written before the rows are removed from
+    the database, so a failure leaves the rows in Postgres rather than losing them.
+    Payroll rows still referenced by a payslip are kept in the database.
+    Returns the manifest entry, or None if there was nothing to archive.
+    """
+    columns = [column.name for column in ARCHIVE_MODELS[table_name].__table__.columns]
+    column_list = ", ".join(columns)
+    start, end = month_bounds(month)
+
+    # A month partition (attached or detached) can be dropped as a whole instead of deleted row by row
+    source = "attendance"
+    if table_name == "attendance" and table_exists(db, partition_name(start)):
+        source = partition_name(start)
+
+    if table_name == "attendance":
+        select_sql = f"SELECT {column_list} FROM {source} WHERE date >= :start AND date < :end ORDER BY employee_id, date"
+        params = {"start": start, "end": end}
+    else:
+        select_sql = f"""
+            SELECT {column_list} FROM payroll
+            WHERE month = :month
+              AND NOT EXISTS (SELECT 1 FROM payslips WHERE payslips.payroll_id = payroll.id)
+            ORDER BY employee_id
+        """
+        params = {"month": month}
+
+    rows = [dict(row._mapping) for row in db.execute(text(select_sql), params)]
+    if not rows:
+        return None
+
+    live_ids = [row["id"] for row in rows]
+    employee_ids = {row["employee_id"] for row in rows}
+    
+    # Keep rows archived earlier for the same month (e.g. before a back-dated entry arrived)
+    manifest = load_manifest()
+    previous = manifest[table_name].get(month)
+    if previous:
+        archived_again = set(live_ids)
+        previous_rows = read_archive_file(table_name, os.path.join(ARCHIVE_DIR, previous["file"]), previous["format"])
+        rows = [row for row in previous_rows if row["id"] not in archived_again] + rows
+
+    file_format = archive_format()
+    os.makedirs(os.path.join(ARCHIVE_DIR, table_name), exist_ok=True)
+    relative_path = os.path.join(table_name, f"{table_name}_{month}.{file_format}")
+    write_archive_file(os.path.join(ARCHIVE_DIR, relative_path), columns, rows, file_format)
+
+    entry = {
+        "file": relative_path,
+        "format": file_format,
+        "rows": len(rows),
+        "archived_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    manifest[table_name][month] = entry
+    save_manifest(manifest)
+
+    if source != "attendance":
+        db.execute(text(f"DROP TABLE {source}"))
+    elif table_name == "attendance":
+        db.execute(text("DELETE FROM attendance WHERE date >= :start AND date < :end"), params)
+    else:
+        db.execute(text("DELETE FROM payroll WHERE id = ANY(:ids)"), {"ids": live_ids})
+    # The rows left the database behind the ORM's back
+    refresh_employee_stats(db, employee_ids)
+    db.commit()
+
+    return entry
+
+
+def archive_before(db: Session, before: str, tables: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Archive every closed month older than ``before`` (YYYY-MM). Returns the archived months per table."""
+    archived = {}
+    for table_name in tables or list(ARCHIVE_MODELS):
+        archived[table_name] = []
+        for month in archivable_months(db, table_name, before):
+            if archive_month(db, table_name, month):
+                archived[table_name].append(month)
+    return archived
+
+
+# Read path
+
+def archived_months(table_name: str) -> List[str]:
+    """List the archived months of ``table_name``"""
+    return sorted(load_manifest()[table_name])
+
+
+def read_archived_attendance(
+    employee_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Return an employee's archived attendance rows within the date range, ordered by date"""
+    manifest = load_manifest()["attendance"]
+    rows = []
+    for month in sorted(manifest):
+        first_day, next_month = month_bounds(month)
+        if (start_date and next_month <= start_date) or (end_date and first_day > end_date):
+            continue
+        entry = manifest[month]
+        path = os.path.join(ARCHIVE_DIR, entry["file"])
+        for row in read_archive_file("attendance", path, entry["format"], employee_id):
+            if (start_date and row["date"] < start_date) or (end_date and row["date"] > end_date):
+                continue
+            rows.append(row)
+    rows.sort(key=lambda row: row["date"])
+    return rows
+
+
+def archive_reaches(start_date: Optional[date]) -> bool:
+    """
+    Check whether a range starting at ``start_date`` (None: unbounded) reaches
+    back into archived months
+    """
+    months = archived_months("attendance")
+    if start_date is None:
+        return bool(months)
+    return bool(months) and start_date < month_bounds(months[-1])[1]
@@ -0,0 +1,131 @@
+"""
+Monthly attendance analytics computed in SQL.
+
+Hours are classified per day and summed per employee for a whole month in one
+query over the month's attendance partition:
+
+* regular hours: up to ``STANDARD_DAILY_HOURS`` of each day
+* overtime hours: each day's hours beyond that (``GREATEST(total_hours - 8, 0)``),
+  so a long day is not offset by a short one
+* night hours: the part of each shift between ``NIGHT_SHIFT_START`` and
+  ``NIGHT_SHIFT_END`` o'clock
+* weekend hours: hours worked on the weekly offs of the employee's location, as
+  defined by the work calendar (its default weekly offs, then
+  ``DEFAULT_WEEKLY_OFFS``, for locations without their own)
+
+Payroll and payslip generation both read their hours from here.
+"""
+import os
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.utils.dates import month_bounds
+from src.utils.payslip_kernel import STANDARD_DAILY_HOURS
+from src.utils.work_calendar import DEFAULT_WEEKLY_OFFS
+
+# Night shift window (hours of the day)
+NIGHT_SHIFT_START = int(os.getenv("NIGHT_SHIFT_START", "22"))
+NIGHT_SHIFT_END = int(os.getenv("NIGHT_SHIFT_END", "6"))
+
+MONTHLY_HOURS_QUERY = """
+    WITH offs AS (
+        -- Each employee's weekly offs (0 = Monday ... 6 = Sunday), resolved like work_calendar does
+        SELECT e.id AS employee_id,
+               COALESCE(location_offs.weekdays, default_offs.weekdays, CAST(:default_weekly_offs AS integer[])) AS weekdays
+        FROM employees e
+        LEFT JOIN (
+            SELECT location, array_agg(weekday) AS weekdays
+            FROM weekly_offs
+            WHERE location IS NOT NULL
+            GROUP BY location
+        ) location_offs ON location_offs.location = e.location
+        CROSS JOIN (SELECT array_agg(weekday) AS weekdays FROM weekly_offs WHERE location IS NULL) default_offs
+    ),
+    days AS (
+        SELECT a.employee_id,
+               a.date,
+               COALESCE(a.total_hours, 0) AS hours,
+               EXTRACT(EPOCH FROM a.start_time)::numeric / 3600 AS start_hour,
+               EXTRACT(EPOCH FROM a.end_time)::numeric / 3600 AS end_hour,
+               (EXTRACT(ISODOW FROM a.date)::int - 1) = ANY(o.weekdays) AS is_weekend
+        FROM attendance a
+        JOIN offs o ON o.employee_id = a.employee_id
+        WHERE a.date >= :start AND a.date < :end {employee_filter}
+    )
+    SELECT employee_id,
+           COUNT(DISTINCT date) AS days_present,
+           SUM(hours) AS total_hours,
+           SUM(LEAST(hours, :daily_hours)) AS regular_hours,
+           SUM(GREATEST(hours - :daily_hours, 0)) AS overtime_hours,
+           ROUND(SUM(LEAST(hours, COALESCE(
+               GREATEST(LEAST(end_hour, :night_end) - start_hour, 0)
+               + GREATEST(end_hour - GREATEST(start_hour, :night_start), 0),
+           0))), 2) AS night_hours,
+           COALESCE(SUM(hours) FILTER (WHERE is_weekend), 0) AS weekend_hours
+    FROM days
+    GROUP BY employee_id
+    ORDER BY employee_id
+"""
+
+
+class MonthlyHours(NamedTuple):
+    """An employee's attendance totals for a month (hours as Decimal)"""
+    employee_id: int
+    days_present: int
+    total_hours: Decimal
+    regular_hours: Decimal
+    overtime_hours: Decimal
+    night_hours: Decimal
+    weekend_hours: Decimal
+
+
+def no_hours(employee_id: int) -> MonthlyHours:
+    zero = Decimal("0")
+    return MonthlyHours(employee_id, 0, zero, zero, zero, zero, zero)
+
+
+def monthly_hours(
+    db: Session,
+    month: str,
+    employee_ids: Optional[Iterable[int]] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> List[MonthlyHours]:
+    """
+    Return the month's (YYYY-MM) hours of the given employees (or of everyone
+    with attendance in the month), ordered by employee id. Employees without
+    attendance are left out.
+    """
+    start, end = month_bounds(month)
+    params = {
+        "start": start,
+        "end": end,
+        "daily_hours": STANDARD_DAILY_HOURS,
+        "night_start": NIGHT_SHIFT_START,
+        "night_end": NIGHT_SHIFT_END,
+        "default_weekly_offs": sorted(DEFAULT_WEEKLY_OFFS),
+    }
+
+    employee_filter = ""
+    if employee_ids is not None:
+        params["employee_ids"] = list(employee_ids)
+        if not params["employee_ids"]:
+            return []
+        employee_filter = "AND a.employee_id = ANY(:employee_ids)"
+
+    sql = MONTHLY_HOURS_QUERY.format(employee_filter=employee_filter)
+    if limit is not None:
+        sql += " LIMIT :limit OFFSET :skip"
+        params.update(limit=limit, skip=skip)
+
+    return [MonthlyHours(**row._mapping) for row in db.execute(text(sql), params)]
+
+
+def monthly_hours_by_employee(db: Session, employee_ids: Iterable[int], month: str) -> Dict[int, MonthlyHours]:
+    """Return the month's hours for each of the given employees (zeros when absent all month)"""
+    employee_ids = list(employee_ids)
+    hours = {row.employee_id: row for row in monthly_hours(db, month, employee_ids)}
+    return {employee_id: hours.get(employee_id) or no_hours(employee_id) for employee_id in employee_ids}
@@ -0,0 +1,200 @@
+"""
+Response compression middleware.
+
+Compresses JSON, CSV and text responses with brotli (when the optional ``brotli``
+package is installed) or gzip, depending on the client's ``Accept-Encoding``.
+Responses smaller than ``minimum_size`` are sent as-is, since compressing them
+costs more CPU than it saves on the wire. Streaming responses are compressed chunk
+by chunk and flushed after every chunk, so exports are never buffered in memory.
+
+Every response of a compressible type carries ``Vary: Accept-Encoding``, also when
+it is sent uncompressed (small, or the client accepts no supported encoding), so
+shared caches never serve one client's encoding to another.
+"""
+import os
+import zlib
+from typing import Optional, Sequence, Set
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Compression settings
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Only these media types are compressed; PDFs and images are already compressed
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/plain",
+    "text/html",
+)
+
+
+class GzipCompressor:
+    """Incremental gzip compressor"""
+    encoding = "gzip"
+
+    def __init__(self, level: int = GZIP_LEVEL):
+        # wbits=31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    """Incremental brotli compressor"""
+    encoding = "br"
+
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Parse an ``Accept-Encoding`` header, ignoring encodings with ``q=0``"""
+    encodings = set()
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if token:
+            encodings.add(token.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing eligible responses.
+
+    Usage:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        content_types: Sequence[str] = COMPRESSIBLE_CONTENT_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+
+    def select_compressor(self, scope: Scope):
+        """Return the compressor class preferred for this request, if any"""
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in encodings:
+            return BrotliCompressor
+        if "gzip" in encodings:
+            return GzipCompressor
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Even without a compressor, eligible responses get the Vary header
+        compressor_class = self.select_compressor(scope)
+        responder = CompressionResponder(send, compressor_class, self.minimum_size, self.content_types)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    """
+    Wraps ``send`` for a single response.
+
+    The ``http.response.start`` message is held back until the first body chunk
+    arrives, because whether (and how) to compress depends on the content type,
+    the size of a complete body and whether the body is streamed.
+    """
+    def __init__(
+        self,
+        send: Send,
+        compressor_class: Optional[type],
+        minimum_size: int,
+        content_types: Sequence[str]
+    ):
+        self._send = send
+        self.compressor_class = compressor_class
+        self.minimum_size = minimum_size
+        self.content_types = content_types
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in self.content_types
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            compressible = self.is_compressible(headers)
+            if compressible:
+                # The representation depends on Accept-Encoding, whether or not this one is compressed
+                headers.add_vary_header("Accept-Encoding")
+
+            complete_and_small = not more_body and len(body) < self.minimum_size
+            if not compressible or complete_and_small or self.compressor_class is None:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = self.compressor_class()
+            headers["Content-Encoding"] = self.compressor.encoding
+
+            if not more_body:
+                # Whole body in one message: compress it in one go
+                body = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            # Streamed body: the final length is unknown
+            del headers["Content-Length"]
+            await self._send(self.start_message)
+
+        if more_body:
+            body = self.compressor.process(body) + self.compressor.flush()
+        else:
+            body = self.compressor.process(body) + self.compressor.finish()
+
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,27 @@
+"""
+Calendar month helpers.
+
+Months are passed around the API as ``YYYY-MM`` strings. Queries should filter
+dates with ``month_bounds`` (a half-open ``[start, end)`` range) rather than
+``extract('year'/'month', ...)`` so that indexes and partition pruning apply.
+"""
+from datetime import date
+from typing import Tuple
+
+
+def month_start(value: date) -> date:
+    """Return the first day of the month containing ``value``"""
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Return the first day of the month ``months`` after ``value``'s month"""
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """Return the first day of ``month`` (YYYY-MM) and the first day of the next month"""
+    year, month_num = month.split('-')
+    start = date(int(year), int(month_num), 1)
+    return start, add_months(start, 1)
@@ -0,0 +1,250 @@
+"""
+Bulk employee import (``POST /employees/bulk``).
+
+Uploads are CSV (a header row naming ``EmployeeCreate`` fields, one employee per
+row) or JSON lines (one employee object per line). Every row is validated on its
+own with ``EmployeeCreate``, and the valid rows are written in batches of
+``EMPLOYEE_IMPORT_BATCH_SIZE``, a few statements per batch:
+
+* one SELECT finds the existing employees with the batch's phones or emails
+* rows matching an employee (by phone or email) update it, in one
+  ``UPDATE ... FROM unnest(...)``
+* the other rows are inserted in one multi-row ``INSERT ... ON CONFLICT DO NOTHING``
+
+Optional fields left empty (email, status, bank details) keep the employee's
+current values on update. Each batch commits on its own, so a database error only
+fails the rows of that batch. Every row gets a result: created, updated or error.
+"""
+import csv
+import io
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models.employee import Employee
+from src.schemas.employee import EmployeeCreate
+from src.utils.employee_stats import refresh_employee_stats
+
+# Import settings
+EMPLOYEE_IMPORT_BATCH_SIZE = int(os.getenv("EMPLOYEE_IMPORT_BATCH_SIZE", "1000"))
+EMPLOYEE_IMPORT_MAX_ROWS = int(os.getenv("EMPLOYEE_IMPORT_MAX_ROWS", "50000"))
+
+CSV_MEDIA_TYPES = {"text/csv", "application/csv"}
+JSON_LINES_MEDIA_TYPES = {"application/x-ndjson", "application/jsonl", "application/x-jsonlines"}
+
+# Fields that keep the employee's current value when a row leaves them empty
+OPTIONAL_FIELDS = ("email", "status", "bank_account_number", "bank_ifsc")
+
+UPDATE_QUERY = text("""
+    UPDATE employees e
+    SET name = v.name,
+        phone = v.phone,
+        email = COALESCE(v.email, e.email),
+        doj = v.doj,
+        designation = v.designation,
+        location = v.location,
+        status = COALESCE(v.status, e.status),
+        bank_account_number = COALESCE(v.bank_account_number, e.bank_account_number),
+        bank_ifsc = COALESCE(v.bank_ifsc, e.bank_ifsc),
+        version = e.version + 1,
+        updated_at = now()
+    FROM unnest(
+        CAST(:id AS integer[]), CAST(:name AS text[]), CAST(:phone AS text[]), CAST(:email AS text[]),
+        CAST(:doj AS date[]), CAST(:designation AS text[]), CAST(:location AS text[]), CAST(:status AS text[]),
+        CAST(:bank_account_number AS text[]), CAST(:bank_ifsc AS text[])
+    ) AS v(id, name, phone, email, doj, designation, location, status, bank_account_number, bank_ifsc)
+    WHERE e.id = v.id
+""")
+
+UPDATE_COLUMNS = ["id", "name", "phone", "email", "doj", "designation", "location", "status",
+                  "bank_account_number", "bank_ifsc"]
+
+
+def media_type_of(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def parse_upload(body: bytes, content_type: Optional[str]) -> List[Tuple[int, Any]]:
+    """
+    Return the upload's records as (line number, record) pairs. A record is a
+    dict of field values, or an error message for a line that could not be parsed.
+    """
+    media_type = media_type_of(content_type)
+    if media_type not in CSV_MEDIA_TYPES | JSON_LINES_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail="Upload employees as text/csv or application/x-ndjson (JSON lines)"
+        )
+    try:
+        content = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The upload must be UTF-8 encoded")
+
+    records: List[Tuple[int, Any]] = []
+    if media_type in CSV_MEDIA_TYPES:
+        reader = csv.DictReader(io.StringIO(content))
+        for row in reader:
+            # Empty cells are left out, so optional fields fall back to their defaults
+            record = {
+                key.strip(): value.strip() for key, value in row.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+            records.append((reader.line_num, record))
+    else:
+        for line_number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                records.append((line_number, f"Invalid JSON: {error}"))
+                continue
+            if not isinstance(record, dict):
+                record = "Each line must be a JSON object"
+            records.append((line_number, record))
+
+    if len(records) > EMPLOYEE_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {EMPLOYEE_IMPORT_MAX_ROWS} employees can be imported at once"
+        )
+    return records
+
+
+def validation_detail(error: ValidationError) -> str:
+    """One line describing every problem of a row"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in problem['loc'])}: {problem['msg']}" for problem in error.errors()
+    )
+
+
+def import_employees(
+    db: Session,
+    records: Iterable[Tuple[int, Any]],
+    batch_size: int = EMPLOYEE_IMPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Create or update an employee for every valid record, matching existing
+    employees by phone or email. Returns the counts and the per-row results.
+    """
+    results: List[Dict[str, Any]] = []
+    batch: List[Tuple[Dict[str, Any], EmployeeCreate]] = []
+    # Phones and emails seen earlier in the upload, with their line
+    seen: Dict[Tuple[str, str], int] = {}
+
+    for line, record in records:
+        result = {"line": line, "status": "error", "id": None, "detail": None}
+        results.append(result)
+        if isinstance(record, str):
+            result["detail"] = record
+            continue
+        try:
+            employee = EmployeeCreate(**record)
+        except ValidationError as error:
+            result["detail"] = validation_detail(error)
+            continue
+
+        keys = [("phone", employee.phone)] + ([("email", employee.email)] if employee.email else [])
+        repeated = next((key for key in keys if key in seen), None)
+        if repeated:
+            result["detail"] = f"The {repeated[0]} {repeated[1]} is already used on line {seen[repeated]}"
+            continue
+        seen.update((key, line) for key in keys)
+
+        batch.append((result, employee))
+        if len(batch) >= batch_size:
+            write_batch(db, batch)
+            batch = []
+
+    if batch:
+        write_batch(db, batch)
+
+    return {
+        "created": sum(result["status"] == "created" for result in results),
+        "updated": sum(result["status"] == "updated" for result in results),
+        "failed": sum(result["status"] == "error" for result in results),
+        "results": results,
+    }
+
+
+def write_batch(db: Session, batch: List[Tuple[Dict[str, Any], EmployeeCreate]]) -> None:
+    """Upsert one batch of validated rows and commit, recording each row's result"""
+    phones = [employee.phone for _, employee in batch]
+    emails = [employee.email for _, employee in batch if employee.email]
+    existing = db.execute(
+        select(Employee.id, Employee.phone, Employee.email)
+        .where(or_(Employee.phone.in_(phones), Employee.email.in_(emails)))
+    ).all()
+    by_phone = {row.phone: row.id for row in existing}
+    by_email = {row.email: row.id for row in existing if row.email}
+
+    updates: List[Tuple[Dict[str, Any], EmployeeCreate]] = []
+    inserts: List[Tuple[Dict[str, Any], EmployeeCreate]] = []
+    # Employees already updated by an earlier row of the batch, with its line
+    targeted: Dict[int, int] = {}
+    for result, employee in batch:
+        phone_match = by_phone.get(employee.phone)
+        email_match = by_email.get(employee.email) if employee.email else None
+        if phone_match and email_match and phone_match != email_match:
+            result["detail"] = "The phone and the email belong to different employees"
+        elif phone_match or email_match:
+            employee_id = phone_match or email_match
+            if employee_id in targeted:
+                result["detail"] = f"Matches the same employee as line {targeted[employee_id]}"
+                continue
+            targeted[employee_id] = result["line"]
+            result["id"] = employee_id
+            updates.append((result, employee))
+        else:
+            inserts.append((result, employee))
+
+    try:
+        if updates:
+            db.execute(UPDATE_QUERY, update_parameters(updates))
+        created = {}
+        if inserts:
+            rows = db.execute(
+                insert(Employee.__table__)
+                .values([employee.dict() for _, employee in inserts])
+                .on_conflict_do_nothing()
+                .returning(Employee.__table__.c.id, Employee.__table__.c.phone)
+            ).all()
+            created = {row.phone: row.id for row in rows}
+            # Inserted behind the ORM's back
+            refresh_employee_stats(db, created.values())
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        for result, _ in updates + inserts:
+            result["id"] = None
+            result["detail"] = f"The batch could not be saved: {error.orig}"
+        return
+
+    for result, _ in updates:
+        result["status"] = "updated"
+    for result, employee in inserts:
+        if employee.phone in created:
+            result.update(status="created", id=created[employee.phone])
+        else:
+            result["detail"] = "Conflicts with an employee created at the same time; import the row again"
+
+
+def update_parameters(updates: List[Tuple[Dict[str, Any], EmployeeCreate]]) -> Dict[str, list]:
+    """Column arrays for ``UPDATE_QUERY``; optional fields the row left empty are sent as NULL"""
+    parameters: Dict[str, list] = {column: [] for column in UPDATE_COLUMNS}
+    for result, employee in updates:
+        values = employee.dict()
+        values["id"] = result["id"]
+        for field in OPTIONAL_FIELDS:
+            if field not in employee.model_fields_set:
+                values[field] = None
+        for column in UPDATE_COLUMNS:
+            parameters[column].append(values[column])
+    return parameters
@@ -0,0 +1,204 @@
+"""
+Denormalized per-employee counters (``employee_stats``).
+
+The detailed employee views read attendance counts and latest payroll/payslip
+figures from ``employee_stats`` with a primary key join instead of counting
+attendance history on every request.
+
+Writes made through the ORM keep the counters current in the same transaction
+(one extra statement per flush): a flush listener, registered by importing
+``src.models``, collects the employees whose attendance, payroll or payslips
+changed, then (after the flush)
+
+* adds the net change to ``attendance_count``
+* re-reads the last attendance date, latest payroll month and latest payslip net
+  pay, each a single index lookup
+
+Employees without a stats row yet (new employees) get one computed in full.
+
+Writes that bypass the ORM call ``apply_stats_changes`` (payslip updates) or
+``refresh_employee_stats`` (archiving) for the employees they touched, and
+``reconcile_employee_stats`` (run periodically by
+``scripts/reconcile_employee_stats.py``) recomputes every row from the source
+tables and corrects any drift.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from src.models.attendance import Attendance
+from src.models.employee import Employee
+from src.models.payroll import Payroll
+from src.models.salary import Payslip
+
+PENDING_KEY = "employee_stats_changes"
+NEW_EMPLOYEES_KEY = "employee_stats_new_employees"
+
+# Applies attendance count deltas and re-reads the latest values; returns the employees updated
+APPLY_CHANGES_QUERY = text("""
+    UPDATE employee_stats s
+    SET attendance_count = s.attendance_count + c.delta,
+        last_attendance_date = (SELECT MAX(a.date) FROM attendance a WHERE a.employee_id = s.employee_id),
+        latest_payroll_month = (SELECT MAX(p.month) FROM payroll p WHERE p.employee_id = s.employee_id),
+        latest_net_pay = (
+            SELECT ps.net_amount FROM payslips ps
+            WHERE ps.employee_id = s.employee_id
+            ORDER BY ps.month DESC
+            LIMIT 1
+        ),
+        updated_at = now()
+    FROM unnest(CAST(:employee_ids AS integer[]), CAST(:deltas AS integer[])) AS c(employee_id, delta)
+    WHERE s.employee_id = c.employee_id
+    RETURNING s.employee_id
+""")
+
+# Computes the stats in full from the source tables; only rows that differ are written
+REFRESH_QUERY = """
+    INSERT INTO employee_stats AS s
+        (employee_id, attendance_count, last_attendance_date, latest_payroll_month, latest_net_pay, updated_at)
+    SELECT e.id, COALESCE(a.attendance_count, 0), a.last_attendance_date, p.latest_payroll_month, ps.net_amount, now()
+    FROM employees e
+    LEFT JOIN (
+        SELECT employee_id, COUNT(*) AS attendance_count, MAX(date) AS last_attendance_date
+        FROM attendance {attendance_filter}
+        GROUP BY employee_id
+    ) a ON a.employee_id = e.id
+    LEFT JOIN (
+        SELECT employee_id, MAX(month) AS latest_payroll_month
+        FROM payroll {payroll_filter}
+        GROUP BY employee_id
+    ) p ON p.employee_id = e.id
+    LEFT JOIN (
+        SELECT DISTINCT ON (employee_id) employee_id, net_amount
+        FROM payslips {payslip_filter}
+        ORDER BY employee_id, month DESC
+    ) ps ON ps.employee_id = e.id
+    {employee_filter}
+    ON CONFLICT (employee_id) DO UPDATE SET
+        attendance_count = EXCLUDED.attendance_count,
+        last_attendance_date = EXCLUDED.last_attendance_date,
+        latest_payroll_month = EXCLUDED.latest_payroll_month,
+        latest_net_pay = EXCLUDED.latest_net_pay,
+        updated_at = EXCLUDED.updated_at
+    WHERE (s.attendance_count, s.last_attendance_date, s.latest_payroll_month, s.latest_net_pay)
+        IS DISTINCT FROM
+        (EXCLUDED.attendance_count, EXCLUDED.last_attendance_date, EXCLUDED.latest_payroll_month, EXCLUDED.latest_net_pay)
+"""
+
+# Columns whose changes affect the stats, per tracked model
+TRACKED_COLUMNS = {
+    Attendance: ("employee_id", "date"),
+    Payroll: ("employee_id", "month"),
+    Payslip: ("employee_id", "month", "net_amount"),
+}
+TRACKED_MODELS = tuple(TRACKED_COLUMNS)
+
+
+def refresh_query(employee_ids: Optional[Iterable[int]]):
+    """The full recomputation, for the given employees or (None) for everyone"""
+    if employee_ids is None:
+        filters = dict.fromkeys(["attendance_filter", "payroll_filter", "payslip_filter", "employee_filter"], "")
+        return text(REFRESH_QUERY.format(**filters)), {}
+
+    source_filter = "WHERE employee_id = ANY(:employee_ids)"
+    sql = REFRESH_QUERY.format(
+        attendance_filter=source_filter,
+        payroll_filter=source_filter,
+        payslip_filter=source_filter,
+        employee_filter="WHERE e.id = ANY(:employee_ids)"
+    )
+    return text(sql), {"employee_ids": sorted(set(employee_ids))}
+
+
+def refresh_employee_stats(db: Session, employee_ids: Iterable[int]) -> int:
+    """Recompute the stats of the given employees in full; returns the number of rows written"""
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return 0
+    query, params = refresh_query(employee_ids)
+    return db.execute(query, params).rowcount
+
+
+def reconcile_employee_stats(db: Session) -> int:
+    """
+    Recompute every employee's stats from the source tables and commit.
+    Returns the number of rows that were missing or wrong.
+    """
+    query, params = refresh_query(None)
+    corrected = db.execute(query, params).rowcount
+    db.commit()
+    return corrected
+
+
+def apply_stats_changes(connection, deltas: Dict[int, int]) -> None:
+    """
+    Add attendance count deltas (0 to only re-read the latest values) to the
+    given employees' stats, computing the stats in full for employees without a row
+    """
+    employee_ids = sorted(deltas)
+    if not employee_ids:
+        return
+
+    updated = set(connection.execute(APPLY_CHANGES_QUERY, {
+        "employee_ids": employee_ids,
+        "deltas": [deltas[employee_id] for employee_id in employee_ids],
+    }).scalars())
+
+    missing = [employee_id for employee_id in employee_ids if employee_id not in updated]
+    if missing:
+        query, params = refresh_query(missing)
+        connection.execute(query, params)
+
+
+def history_values(obj, name: str):
+    """(previous, current) value of an attribute"""
+    history = inspect(obj).attrs[name].load_history()
+    current = (history.added or history.unchanged or [None])[0]
+    previous = history.deleted[0] if history.deleted else current
+    return previous, current
+
+
+@event.listens_for(Session, "before_flush")
+def collect_stats_changes(session, flush_context, instances):
+    """Collect the employees touched by this flush and their attendance count changes"""
+    deltas: Dict[int, int] = defaultdict(int)
+
+    # Attendance rows change the count; any tracked row may change the latest values
+    for obj in session.new:
+        if isinstance(obj, TRACKED_MODELS):
+            deltas[obj.employee_id] += int(isinstance(obj, Attendance))
+        elif isinstance(obj, Employee):
+            # Its id is only known after the flush
+            session.info.setdefault(NEW_EMPLOYEES_KEY, []).append(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED_MODELS):
+            previous_employee, _ = history_values(obj, "employee_id")
+            deltas[previous_employee] -= int(isinstance(obj, Attendance))
+
+    for obj in session.dirty:
+        columns = TRACKED_COLUMNS.get(type(obj))
+        if not columns or not any(inspect(obj).attrs[name].history.has_changes() for name in columns):
+            continue
+        previous_employee, current_employee = history_values(obj, "employee_id")
+        moved = int(isinstance(obj, Attendance) and previous_employee != current_employee)
+        deltas[previous_employee] -= moved
+        deltas[current_employee] += moved
+
+    deltas.pop(None, None)
+    if deltas:
+        pending = session.info.setdefault(PENDING_KEY, defaultdict(int))
+        for employee_id, delta in deltas.items():
+            pending[employee_id] += delta
+
+
+@event.listens_for(Session, "after_flush")
+def update_stats_after_flush(session, flush_context):
+    """Apply the collected changes, in the flush's transaction"""
+    pending = session.info.pop(PENDING_KEY, None) or {}
+    for employee in session.info.pop(NEW_EMPLOYEES_KEY, []):
+        pending.setdefault(employee.id, 0)
+    if pending:
+        apply_stats_changes(session.connection(), pending)
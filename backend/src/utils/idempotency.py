@@ -0,0 +1,211 @@
+"""
+Idempotency keys for retried POST requests.
+
+Clients on unreliable connections may send an ``Idempotency-Key`` header with
+the create/generate requests in ``IDEMPOTENT_ROUTES``. The first response to a
+key (for the same client, method and path) is stored in ``idempotency_keys``
+and replayed, marked with ``Idempotent-Replayed: true``, for every retry within
+``IDEMPOTENCY_KEY_TTL_HOURS``, without running the endpoint again.
+
+Requests with the same key are serialized with a transaction-level advisory
+lock held while the endpoint runs, so a duplicate sent while the first request
+is still in flight waits for it and then gets its response. Reusing a key for a
+different request body is rejected with 422. Server errors (5xx) are not
+stored, so those requests can be retried.
+"""
+import hashlib
+import os
+import re
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine, text
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db.session import DATABASE_URL
+
+# Idempotency settings
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Connections holding key locks while requests run
+IDEMPOTENCY_POOL_SIZE = int(os.getenv("IDEMPOTENCY_POOL_SIZE", "5"))
+# Expired keys are deleted at most this often (per process)
+IDEMPOTENCY_PURGE_INTERVAL = 3600
+
+# Requests honouring the Idempotency-Key header: (method, path pattern)
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/attendance/?$")),
+    ("POST", re.compile(r"^/payroll/generate/")),
+    ("POST", re.compile(r"^/salary/payslips/generate/")),
+]
+
+LOCK_QUERY = text("SELECT pg_advisory_xact_lock(hashtextextended(:key_hash, 0))")
+
+SELECT_QUERY = text("""
+    SELECT request_hash, status_code, content_type, response_body
+    FROM idempotency_keys
+    WHERE key_hash = :key_hash AND created_at > now() - make_interval(secs => :ttl)
+""")
+
+# An expired row for the same key is replaced
+STORE_QUERY = text("""
+    INSERT INTO idempotency_keys (key_hash, request_hash, status_code, content_type, response_body, created_at)
+    VALUES (:key_hash, :request_hash, :status_code, :content_type, :response_body, now())
+    ON CONFLICT (key_hash) DO UPDATE SET
+        request_hash = EXCLUDED.request_hash,
+        status_code = EXCLUDED.status_code,
+        content_type = EXCLUDED.content_type,
+        response_body = EXCLUDED.response_body,
+        created_at = EXCLUDED.created_at
+""")
+
+PURGE_QUERY = text("DELETE FROM idempotency_keys WHERE created_at <= now() - make_interval(secs => :ttl)")
+
+purge_status = {"purged_at": 0.0}
+
+# A separate pool, so requests waiting on key locks never starve the endpoints' own sessions
+lock_engine = create_engine(DATABASE_URL, pool_size=IDEMPOTENCY_POOL_SIZE)
+
+
+def is_idempotent_route(method: str, path: str) -> bool:
+    return any(method == route_method and pattern.match(path) for route_method, pattern in IDEMPOTENT_ROUTES)
+
+
+def scope_hash(scope: Scope, key: str) -> str:
+    """Hash of the key scoped to the client (bearer token or address), method and path"""
+    headers = Headers(scope=scope)
+    client = scope.get("client")
+    identity = headers.get("authorization") or (client[0] if client else "")
+    scoped = "\n".join([identity, scope["method"], scope["path"], key])
+    return hashlib.sha256(scoped.encode()).hexdigest()
+
+
+async def read_body(receive: Receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware replaying stored responses for requests with an ``Idempotency-Key`` header.
+
+    Usage:
+        app.add_middleware(IdempotencyMiddleware)
+    """
+    def __init__(self, app: ASGIApp, ttl_hours: float = IDEMPOTENCY_KEY_TTL_HOURS):
+        self.app = app
+        self.ttl_seconds = ttl_hours * 3600
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not is_idempotent_route(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = Headers(scope=scope).get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await read_body(receive)
+        key_hash = scope_hash(scope, key)
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        # Holds the advisory lock on the key until the response is stored
+        connection = await run_in_threadpool(lock_engine.connect)
+        transaction = None
+        try:
+            transaction = await run_in_threadpool(connection.begin)
+            stored = await run_in_threadpool(self.lock_and_fetch, connection, key_hash)
+
+            if stored is not None:
+                await run_in_threadpool(transaction.rollback)
+                if stored.request_hash != request_hash:
+                    response = JSONResponse(
+                        {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                    )
+                else:
+                    response = Response(
+                        content=bytes(stored.response_body),
+                        status_code=stored.status_code,
+                        media_type=stored.content_type,
+                        headers={"Idempotent-Replayed": "true"}
+                    )
+                await response(scope, receive, send)
+                return
+
+            recorder = ResponseRecorder(send)
+            await self.app(scope, replay_body(body, receive), recorder.send)
+
+            if recorder.status_code is not None and recorder.status_code < 500:
+                await run_in_threadpool(
+                    self.store, connection, key_hash, request_hash,
+                    recorder.status_code, recorder.content_type, b"".join(recorder.body)
+                )
+                await run_in_threadpool(transaction.commit)
+        finally:
+            if transaction is not None and transaction.is_active:
+                await run_in_threadpool(transaction.rollback)
+            await run_in_threadpool(connection.close)
+
+    def lock_and_fetch(self, connection, key_hash: str):
+        connection.execute(LOCK_QUERY, {"key_hash": key_hash})
+        return connection.execute(SELECT_QUERY, {"key_hash": key_hash, "ttl": self.ttl_seconds}).first()
+
+    def store(self, connection, key_hash: str, request_hash: str, status_code: int,
+              content_type: Optional[str], response_body: bytes) -> None:
+        connection.execute(STORE_QUERY, {
+            "key_hash": key_hash,
+            "request_hash": request_hash,
+            "status_code": status_code,
+            "content_type": content_type,
+            "response_body": response_body,
+        })
+
+        now = time.monotonic()
+        if now - purge_status["purged_at"] >= IDEMPOTENCY_PURGE_INTERVAL:
+            purge_status["purged_at"] = now
+            connection.execute(PURGE_QUERY, {"ttl": self.ttl_seconds})
+
+
+def replay_body(body: bytes, receive: Receive) -> Receive:
+    """A ``receive`` callable handing the already read request body to the app, then the client's messages"""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+class ResponseRecorder:
+    """Wraps ``send`` for a single response, keeping a copy of the status, content type and body"""
+    def __init__(self, send: Send):
+        self._send = send
+        self.status_code: Optional[int] = None
+        self.content_type: Optional[str] = None
+        self.body: List[bytes] = []
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+            self.content_type = Headers(raw=message["headers"]).get("content-type")
+        elif message["type"] == "http.response.body":
+            self.body.append(message.get("body", b""))
+        await self._send(message)
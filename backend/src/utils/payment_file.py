@@ -0,0 +1,215 @@
+"""
+Bank payment files for salary disbursement.
+
+A payment file pays a month's approved, unpaid payslips (with a positive net
+amount, for employees with bank details) by NEFT in one batch. Building it:
+
+1. marks the payslips paid with the batch reference in a single UPDATE
+2. streams them back from a single server-side cursor query, ``PAYMENT_FILE_BATCH_SIZE``
+   rows at a time, encoding each chunk as it arrives
+3. commits, then sends the trailer record
+
+Both statements run in one transaction on one connection, so memory use does not
+grow with the number of payslips, and a file that is not produced to the end
+(the client disconnects, the database fails) leaves every payslip unpaid. A file
+with a trailer is a committed batch.
+
+Two layouts are supported, each with a header (H), one detail record (D) per
+payslip and a trailer (T) with the record count and total amount:
+
+* ``csv``: comma-separated, amounts in rupees
+* ``fixed``: fixed-width records of ``FIXED_WIDTH_RECORD_LENGTH`` characters,
+  amounts in paise, zero-padded
+"""
+import csv
+import io
+import os
+from datetime import date, datetime
+from typing import Iterator, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.db.session import engine
+from src.utils.payslip_kernel import from_paise, to_paise
+
+# Payment file settings
+PAYMENT_FILE_BATCH_SIZE = int(os.getenv("PAYMENT_FILE_BATCH_SIZE", "1000"))
+# Company account debited for the batch (shown in the header record)
+PAYMENT_DEBIT_ACCOUNT = os.getenv("PAYMENT_DEBIT_ACCOUNT", "")
+
+PAYMENT_FILE_FORMATS = ("csv", "fixed")
+
+PAYMENT_FILE_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "fixed": "text/plain",
+}
+
+# Payslips that go into a month's payment file
+PAYABLE_CONDITION = """
+    p.month = :month
+    AND p.is_approved IS TRUE
+    AND p.is_paid IS NOT TRUE
+    AND p.net_amount > 0
+"""
+
+HAS_BANK_DETAILS = "e.bank_account_number IS NOT NULL AND e.bank_ifsc IS NOT NULL"
+
+MARK_PAID_QUERY = f"""
+    UPDATE payslips p
+    SET is_paid = TRUE, payment_date = now(), payment_reference = :reference, updated_at = now(),
+        version = p.version + 1
+    FROM employees e
+    WHERE e.id = p.employee_id AND {PAYABLE_CONDITION} AND {HAS_BANK_DETAILS}
+"""
+
+PAYMENT_RECORDS_QUERY = """
+    SELECT p.id AS payslip_id,
+           p.employee_id,
+           e.name,
+           e.bank_account_number,
+           e.bank_ifsc,
+           p.net_amount
+    FROM payslips p
+    JOIN employees e ON e.id = p.employee_id
+    WHERE p.month = :month AND p.payment_reference = :reference
+    ORDER BY p.id
+"""
+
+COUNT_PAYABLE_QUERY = f"""
+    SELECT COUNT(*) FILTER (WHERE {HAS_BANK_DETAILS}) AS payable,
+           COUNT(*) FILTER (WHERE NOT ({HAS_BANK_DETAILS})) AS missing_bank_details
+    FROM payslips p
+    JOIN employees e ON e.id = p.employee_id
+    WHERE {PAYABLE_CONDITION}
+"""
+
+# Fixed-width detail record: (field, width); numbers are right-aligned and zero-padded
+FIXED_WIDTH_DETAIL = [
+    ("record_type", 1),
+    ("transaction_type", 4),
+    ("ifsc", 11),
+    ("account_number", 34),
+    ("name", 35),
+    ("amount", 15),
+    ("reference", 30),
+    ("narration", 20),
+]
+FIXED_WIDTH_RECORD_LENGTH = sum(width for _, width in FIXED_WIDTH_DETAIL)
+NUMERIC_FIXED_FIELDS = {"amount", "count"}
+
+
+def new_batch_reference(month: str) -> str:
+    """A batch reference for a month's payment file, e.g. SAL202410-20241101093000"""
+    return f"SAL{month.replace('-', '')}-{datetime.now():%Y%m%d%H%M%S}"
+
+
+def count_payable(db: Session, month: str) -> Tuple[int, int]:
+    """
+    Count the month's payable payslips: those that will go into the payment file
+    and those left out because the employee has no bank details
+    """
+    row = db.execute(text(COUNT_PAYABLE_QUERY), {"month": month}).one()
+    return row.payable, row.missing_bank_details
+
+
+def fixed_field(value, width: int, numeric: bool = False) -> str:
+    """Pad (or cut) a value to a fixed-width field; text is upper-cased and limited to letters, digits, - and /"""
+    if numeric:
+        return str(value).rjust(width, "0")[-width:]
+    cleaned = "".join(char if char.isalnum() or char in "-/" else " " for char in str(value or ""))
+    return " ".join(cleaned.upper().split()).ljust(width)[:width]
+
+
+def fixed_record(fields: Sequence[Tuple[str, int, object]]) -> str:
+    """Encode (field, width, value) triples as one record of FIXED_WIDTH_RECORD_LENGTH characters"""
+    record = "".join(fixed_field(value, width, name in NUMERIC_FIXED_FIELDS) for name, width, value in fields)
+    return record.ljust(FIXED_WIDTH_RECORD_LENGTH) + "\r\n"
+
+
+class PaymentFileWriter:
+    """Encodes the header, detail and trailer records of one payment file"""
+
+    def __init__(self, file_format: str, month: str, reference: str):
+        self.file_format = file_format
+        self.month = month
+        self.reference = reference
+        self.count = 0
+        self.total = 0  # paise
+
+    def csv_lines(self, rows: List[list]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def header(self) -> str:
+        value_date = date.today()
+        if self.file_format == "csv":
+            return self.csv_lines([
+                ["H", self.reference, PAYMENT_DEBIT_ACCOUNT, value_date.isoformat(), self.month],
+                ["record_type", "transaction_type", "ifsc", "account_number", "name", "amount", "reference", "narration",
+                 "employee_id", "payslip_id"],
+            ])
+        return fixed_record([
+            ("record_type", 1, "H"),
+            ("reference", 30, self.reference),
+            ("debit_account", 34, PAYMENT_DEBIT_ACCOUNT),
+            ("value_date", 8, f"{value_date:%Y%m%d}"),
+            ("month", 7, self.month),
+        ])
+
+    def details(self, rows) -> str:
+        """Encode a chunk of rows of ``PAYMENT_RECORDS_QUERY``"""
+        narration = f"SALARY {self.month}"
+        records = []
+        for row in rows:
+            amount = to_paise(row.net_amount)
+            self.count += 1
+            self.total += amount
+            reference = f"{self.reference}-{row.payslip_id}"
+            if self.file_format == "csv":
+                records.append([
+                    "D", "NEFT", row.bank_ifsc, row.bank_account_number, row.name,
+                    from_paise(amount), reference, narration, row.employee_id, row.payslip_id
+                ])
+            else:
+                values = ["D", "NEFT", row.bank_ifsc, row.bank_account_number, row.name, amount, reference, narration]
+                records.append(fixed_record([
+                    (name, width, value) for (name, width), value in zip(FIXED_WIDTH_DETAIL, values)
+                ]))
+        if self.file_format == "csv":
+            return self.csv_lines(records)
+        return "".join(records)
+
+    def trailer(self) -> str:
+        if self.file_format == "csv":
+            return self.csv_lines([["T", self.count, from_paise(self.total)]])
+        return fixed_record([
+            ("record_type", 1, "T"),
+            ("count", 9, self.count),
+            ("amount", 18, self.total),
+        ])
+
+
+def stream_payment_file(month: str, reference: str, file_format: str = "csv") -> Iterator[bytes]:
+    """
+    Mark the month's payable payslips paid with ``reference`` and yield the
+    payment file for them chunk by chunk. The payslips are committed as paid
+    after the last detail record, before the trailer is sent.
+    """
+    writer = PaymentFileWriter(file_format, month, reference)
+    params = {"month": month, "reference": reference}
+
+    with engine.connect() as connection:
+        with connection.begin():
+            connection.execute(text(MARK_PAID_QUERY), params)
+
+            yield writer.header().encode()
+
+            result = connection.execution_options(
+                stream_results=True, yield_per=PAYMENT_FILE_BATCH_SIZE
+            ).execute(text(PAYMENT_RECORDS_QUERY), params)
+            for rows in result.partitions():
+                yield writer.details(rows).encode()
+
+    yield writer.trailer().encode()
@@ -0,0 +1,181 @@
+"""
+Payroll run worker.
+
+A payroll run generates the month's payroll records (and optionally payslips)
+for every active employee. Employees are processed in id order in chunks of
+``chunk_size``; each chunk is committed together with the run's progress and its
+checkpoint (``last_employee_id``), so a run interrupted by a crash or a dyno
+restart resumes after its last committed chunk.
+
+Runs are processed either in-process (started as a background task by
+``POST /payroll/runs``) or by the separate worker entrypoint
+``scripts/payroll_worker.py``. Both claim runs with ``FOR UPDATE SKIP LOCKED``,
+so a run is never processed twice at the same time. A run whose heartbeat is
+older than ``PAYROLL_RUN_STALE_SECONDS`` is considered crashed and can be claimed
+again, by the worker or through ``POST /payroll/runs/{run_id}/resume``.
+
+A chunk refreshes the heartbeat when it starts and holds the run's row lock until
+it commits, so a live processor is never taken over however long its chunk takes:
+claims skip locked runs.
+"""
+import os
+from datetime import timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from src.db.session import SessionLocal
+from src.models.employee import Employee
+from src.models.payroll import Payroll, PayrollRun, PayrollRunError
+from src.models.salary import Payslip
+
+# Worker settings
+PAYROLL_RUN_STALE_SECONDS = int(os.getenv("PAYROLL_RUN_STALE_SECONDS", "300"))
+PAYROLL_RUN_IN_PROCESS = os.getenv("PAYROLL_RUN_IN_PROCESS", "true").lower() == "true"
+
+
+def stale_condition():
+    """A running run whose processor stopped sending heartbeats (crashed or restarted)"""
+    stale_before = func.now() - timedelta(seconds=PAYROLL_RUN_STALE_SECONDS)
+    return and_(PayrollRun.status == "running", PayrollRun.heartbeat_at < stale_before)
+
+
+def is_stale(db: Session, run_id: int) -> bool:
+    return db.query(PayrollRun.id).filter(PayrollRun.id == run_id, stale_condition()).first() is not None
+
+
+def claim_run(db: Session, run_id: Optional[int] = None) -> Optional[PayrollRun]:
+    """
+    Claim a pending or stale run (a specific one if ``run_id`` is given) and mark
+    it as running. Returns None when there is nothing to claim.
+    """
+    query = db.query(PayrollRun).filter(or_(PayrollRun.status == "pending", stale_condition()))
+    if run_id is not None:
+        query = query.filter(PayrollRun.id == run_id)
+
+    run = query.order_by(PayrollRun.id).with_for_update(skip_locked=True).first()
+    if run is None:
+        db.rollback()
+        return None
+
+    run.status = "running"
+    run.error = None
+    run.started_at = run.started_at or func.now()
+    run.heartbeat_at = func.now()
+    db.commit()
+    return run
+
+
+def process_employee(
+    db: Session,
+    run: PayrollRun,
+    employee_id: int,
+    has_payroll: bool,
+    needs_payslip: bool,
+    payslips: Dict[int, Payslip]
+) -> bool:
+    """
+    Generate the missing payroll record and add the employee's payslip, computed
+    for the whole chunk beforehand. Returns False if there was nothing to generate.
+    """
+    # Imported here: the API modules import this module for their run endpoints
+    from src.api.payroll import build_payroll
+    from src.api.salary import MISSING_STRUCTURE_DETAIL
+
+    generated = False
+    if not has_payroll:
+        db.add(build_payroll(db, employee_id, run.month, run.processed_by))
+        generated = True
+    if needs_payslip:
+        if employee_id not in payslips:
+            raise ValueError(MISSING_STRUCTURE_DETAIL)
+        db.add(payslips[employee_id])
+        generated = True
+    db.flush()
+    return generated
+
+
+def process_chunk(db: Session, run: PayrollRun) -> bool:
+    """
+    Process the next chunk of employees and commit it with the run's checkpoint.
+    Returns False when there are no employees left.
+    """
+    # Imported here: the API modules import this module for their run endpoints
+    from src.api.salary import build_payslips
+
+    # Heartbeat, and the run's row lock held until the chunk commits
+    run.heartbeat_at = func.now()
+    db.flush()
+
+    query = db.query(Employee.id).filter(Employee.status == "active")
+    if run.last_employee_id is not None:
+        query = query.filter(Employee.id > run.last_employee_id)
+    employee_ids = [row.id for row in query.order_by(Employee.id).limit(run.chunk_size)]
+    if not employee_ids:
+        return False
+
+    # Existing records for the whole chunk, fetched once
+    with_payroll = {row.employee_id for row in db.query(Payroll.employee_id).filter(
+        Payroll.month == run.month, Payroll.employee_id.in_(employee_ids)
+    )}
+    with_payslip = {row.employee_id for row in db.query(Payslip.employee_id).filter(
+        Payslip.month == run.month, Payslip.employee_id.in_(employee_ids)
+    )}
+
+    # The chunk's payslips, computed in one batch
+    needs_payslip = set(employee_ids) - with_payslip if run.generate_payslips else set()
+    payslips = build_payslips(db, sorted(needs_payslip), run.month, run.processed_by) if needs_payslip else {}
+
+    for employee_id in employee_ids:
+        try:
+            # A savepoint per employee, so one failure does not discard the chunk
+            with db.begin_nested():
+                generated = process_employee(
+                    db, run, employee_id, employee_id in with_payroll, employee_id in needs_payslip, payslips
+                )
+        except Exception as e:
+            db.add(PayrollRunError(run_id=run.id, employee_id=employee_id, message=str(getattr(e, "detail", e))))
+            run.failed_employees += 1
+            continue
+
+        if generated:
+            run.processed_employees += 1
+        else:
+            run.skipped_employees += 1
+
+    # Checkpoint: committed atomically with the chunk's records
+    run.last_employee_id = employee_ids[-1]
+    run.heartbeat_at = func.now()
+    db.commit()
+    return True
+
+
+def process_payroll_run(run_id: Optional[int] = None) -> Optional[int]:
+    """
+    Claim a run (the given one, or the oldest available) and process it to the
+    end. Returns the id of the processed run, or None if none could be claimed.
+    """
+    db = SessionLocal()
+    try:
+        run = claim_run(db, run_id)
+        if run is None:
+            return None
+
+        try:
+            while process_chunk(db, run):
+                pass
+            run.status = "completed"
+            run.finished_at = func.now()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            run.status = "failed"
+            run.error = str(e)
+            run.finished_at = func.now()
+            db.commit()
+            print(f"❌ Payroll run {run.id} failed: {e}")
+
+        return run.id
+    finally:
+        db.close()
@@ -0,0 +1,144 @@
+"""
+Payslip arithmetic in integer paise.
+
+Amounts are integers in paise (1/100 rupee) and hours are integers in
+hundredths of an hour, matching the two-decimal columns they are read from and
+stored in. Every division rounds half up to the paisa, so results are exact
+and reproducible, with no float/Decimal mixing.
+
+``compute_payslip`` is the scalar reference implementation. ``compute_payslips``
+computes the same amounts for a whole population from column arrays with NumPy
+(falling back to the scalar loop when NumPy is not installed).
+``scripts/test_payslip_kernel.py`` checks that the two agree.
+
+For each employee and month:
+
+* expected hours = working days x 8; worked fraction = min(regular hours, expected) / expected
+* overtime hours (each day's hours beyond 8, see ``attendance_analytics``) are
+  paid at 1.5 x basic / expected hours
+* gross = gross salary x worked fraction + overtime amount
+* net = gross - (tax + provident fund + insurance + other deductions)
+"""
+from decimal import Decimal
+from typing import Dict, NamedTuple, Sequence
+
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+STANDARD_DAILY_HOURS = 8
+
+# Overtime is paid at OVERTIME_NUMERATOR / OVERTIME_DENOMINATOR times the hourly rate
+OVERTIME_NUMERATOR = 3
+OVERTIME_DENOMINATOR = 2
+
+# Output columns of the kernel
+AMOUNT_FIELDS = [
+    "leave_days", "overtime_hours", "overtime_rate", "overtime_amount",
+    "gross_amount", "total_deductions", "net_amount",
+]
+
+
+class PayslipInputs(NamedTuple):
+    """Inputs for one employee and month; money in paise, hours in hundredths"""
+    basic_salary: int
+    gross_salary: int
+    deductions: int
+    regular_hours: int
+    overtime_hours: int
+    days_present: int
+    working_days: int
+
+
+def to_paise(amount) -> int:
+    """Convert a money amount (Decimal, int, float or None) to paise"""
+    return int((Decimal(str(amount or 0)) * 100).to_integral_value())
+
+
+def from_paise(paise: int) -> Decimal:
+    return Decimal(int(paise)).scaleb(-2)
+
+
+# Hours use the same two-decimal scale
+to_centihours = to_paise
+from_centihours = from_paise
+
+
+def divide_half_up(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half up, for non-negative integers; 0 when dividing by 0"""
+    if denominator == 0:
+        return 0
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def compute_payslip(inputs: PayslipInputs) -> Dict[str, int]:
+    """Compute one payslip's amounts (scalar reference implementation)"""
+    expected_hours = inputs.working_days * STANDARD_DAILY_HOURS
+    expected_centihours = expected_hours * 100
+
+    worked_centihours = min(inputs.regular_hours, expected_centihours)
+    overtime_centihours = inputs.overtime_hours
+
+    overtime_rate = divide_half_up(inputs.basic_salary * OVERTIME_NUMERATOR, expected_hours * OVERTIME_DENOMINATOR)
+    overtime_amount = divide_half_up(
+        overtime_centihours * inputs.basic_salary * OVERTIME_NUMERATOR,
+        expected_centihours * OVERTIME_DENOMINATOR
+    )
+    prorated_gross = divide_half_up(inputs.gross_salary * worked_centihours, expected_centihours)
+
+    gross_amount = prorated_gross + overtime_amount
+    return {
+        "leave_days": max(0, inputs.working_days - inputs.days_present),
+        "overtime_hours": overtime_centihours,
+        "overtime_rate": overtime_rate,
+        "overtime_amount": overtime_amount,
+        "gross_amount": gross_amount,
+        "total_deductions": inputs.deductions,
+        "net_amount": gross_amount - inputs.deductions,
+    }
+
+
+def vectorized_divide_half_up(numerator, denominator):
+    """Element-wise ``divide_half_up`` on int64 arrays"""
+    safe_denominator = numpy.where(denominator == 0, 1, denominator)
+    quotient = (2 * numerator + safe_denominator) // (2 * safe_denominator)
+    return numpy.where(denominator == 0, 0, quotient)
+
+
+def compute_payslips(inputs: Sequence[PayslipInputs]) -> Dict[str, list]:
+    """
+    Compute the amounts of many payslips at once. Returns one list per output
+    field, in the order of ``inputs``.
+    """
+    if numpy is None or not inputs:
+        rows = [compute_payslip(row) for row in inputs]
+        return {field: [row[field] for row in rows] for field in AMOUNT_FIELDS}
+
+    columns = numpy.array(inputs, dtype=numpy.int64).reshape(-1, len(PayslipInputs._fields)).T
+    basic_salary, gross_salary, deductions, regular_hours, overtime_hours, days_present, working_days = columns
+
+    expected_hours = working_days * STANDARD_DAILY_HOURS
+    expected_centihours = expected_hours * 100
+
+    worked_centihours = numpy.minimum(regular_hours, expected_centihours)
+    overtime_centihours = overtime_hours
+
+    overtime_rate = vectorized_divide_half_up(basic_salary * OVERTIME_NUMERATOR, expected_hours * OVERTIME_DENOMINATOR)
+    overtime_amount = vectorized_divide_half_up(
+        overtime_centihours * basic_salary * OVERTIME_NUMERATOR,
+        expected_centihours * OVERTIME_DENOMINATOR
+    )
+    prorated_gross = vectorized_divide_half_up(gross_salary * worked_centihours, expected_centihours)
+
+    gross_amount = prorated_gross + overtime_amount
+    result = {
+        "leave_days": numpy.maximum(0, working_days - days_present),
+        "overtime_hours": overtime_centihours,
+        "overtime_rate": overtime_rate,
+        "overtime_amount": overtime_amount,
+        "gross_amount": gross_amount,
+        "total_deductions": deductions,
+        "net_amount": gross_amount - deductions,
+    }
+    return {field: values.tolist() for field, values in result.items()}
@@ -0,0 +1,181 @@
+"""
+Incremental payslip recomputation.
+
+Attendance and salary structure writes made through the ORM are tracked by a
+flush listener, registered by importing ``src.models`` (salary structure
+updates, which are Core UPDATEs, call ``record_structure_change``), which
+records the affected (employee, month) pairs in ``payslip_dirty_months``:
+
+* an attendance row marks the month of its date (old and new date on updates)
+* a salary structure marks every month of the employee's payslips from its
+  ``effective_from`` month onwards
+
+``recompute_dirty_payslips`` then re-derives only those payslips in one pass.
+Unapproved payslips are recomputed in place, keeping their manual bonus and
+additional deductions; approved or paid payslips are left untouched and flagged
+with ``is_stale`` for review.
+"""
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.models.attendance import Attendance
+from src.models.salary import Payslip, PayslipDirtyMonth, SalaryStructure
+from src.utils.structure_cache import structure_cache
+
+PENDING_KEY = "dirty_payslip_months"
+
+# Columns copied from a freshly built payslip onto the stored one
+RECOMPUTED_FIELDS = [
+    "salary_structure_id", "working_days", "days_present", "leave_days",
+    "overtime_hours", "overtime_rate", "overtime_amount",
+]
+
+
+def month_of(value) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def attribute_values(obj, name: str) -> Set[Any]:
+    """Current and (for updates and deletes) previous values of an attribute"""
+    history = inspect(obj).attrs[name].load_history()
+    values = set(history.added) | set(history.unchanged) | set(history.deleted)
+    return {value for value in values if value is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def collect_dirty_months(session, flush_context, instances):
+    """Collect the (employee, month) pairs touched by this flush"""
+    attendance_months, structure_months = set(), set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Attendance):
+            for employee_id in attribute_values(obj, "employee_id"):
+                for day in attribute_values(obj, "date"):
+                    attendance_months.add((employee_id, month_of(day)))
+        elif isinstance(obj, SalaryStructure):
+            for employee_id in attribute_values(obj, "employee_id"):
+                for effective_from in attribute_values(obj, "effective_from"):
+                    structure_months.add((employee_id, month_of(effective_from)))
+
+    if attendance_months or structure_months:
+        pending = session.info.setdefault(PENDING_KEY, (set(), set()))
+        pending[0].update(attendance_months)
+        pending[1].update(structure_months)
+
+
+@event.listens_for(Session, "after_flush")
+def record_dirty_months(session, flush_context):
+    """Write the collected pairs into payslip_dirty_months, in the flush's transaction"""
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    write_dirty_months(session.connection(), *pending)
+
+
+def record_structure_change(db: Session, employee_id: int, effective_dates: Iterable) -> None:
+    """
+    Mark the payslips affected by a salary structure changed with a Core UPDATE
+    (which the flush listener does not see), given its old and new effective dates
+    """
+    structure_months = {(employee_id, month_of(day)) for day in effective_dates if day is not None}
+    write_dirty_months(db.connection(), set(), structure_months)
+
+
+def write_dirty_months(connection, attendance_months: Set[Tuple[int, str]], structure_months: Set[Tuple[int, str]]) -> None:
+    """Record (employee, month) pairs whose attendance or salary structure changed"""
+    table = PayslipDirtyMonth.__table__
+
+    if attendance_months:
+        connection.execute(
+            insert(table).on_conflict_do_nothing(constraint="unique_employee_month_dirty"),
+            [
+                {"employee_id": employee_id, "month": month, "reason": "attendance"}
+                for employee_id, month in sorted(attendance_months)
+            ]
+        )
+
+    for employee_id, from_month in sorted(structure_months):
+        affected = select(Payslip.employee_id, Payslip.month, literal("salary_structure")).where(
+            Payslip.employee_id == employee_id,
+            Payslip.month >= from_month
+        )
+        connection.execute(
+            insert(table)
+            .from_select(["employee_id", "month", "reason"], affected)
+            .on_conflict_do_nothing(constraint="unique_employee_month_dirty")
+        )
+
+
+def recompute_payslip(payslip: Payslip, fresh: Payslip) -> None:
+    """Copy the amounts of a freshly built payslip onto an unapproved stored one"""
+    for field in RECOMPUTED_FIELDS:
+        setattr(payslip, field, getattr(fresh, field))
+
+    # Manual adjustments made after generation are kept
+    payslip.gross_amount = fresh.gross_amount + (payslip.bonus or 0)
+    payslip.total_deductions = fresh.total_deductions + (payslip.additional_deductions or 0)
+    payslip.net_amount = payslip.gross_amount - payslip.total_deductions
+    payslip.is_stale = False
+
+
+def recompute_dirty_payslips(db: Session, month: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Recompute the payslips of every dirty (employee, month), optionally limited to
+    one month, and clear the processed markers. Dirty rows locked by a concurrent
+    recomputation are skipped.
+    """
+    # Imported here: the salary API imports this module for its recompute endpoint
+    from src.api.salary import MISSING_STRUCTURE_DETAIL, build_payslips
+
+    query = db.query(PayslipDirtyMonth)
+    if month:
+        query = query.filter(PayslipDirtyMonth.month == month)
+    dirty = query.order_by(PayslipDirtyMonth.id).with_for_update(skip_locked=True).all()
+
+    result = {"recomputed": 0, "flagged": 0, "cleared": 0, "failed": []}
+    if not dirty:
+        db.rollback()
+        return result
+
+    # All affected payslips in one query
+    keys = [(row.employee_id, row.month) for row in dirty]
+    payslips: Dict[Tuple[int, str], Payslip] = {
+        (payslip.employee_id, payslip.month): payslip
+        for payslip in db.query(Payslip).filter(tuple_(Payslip.employee_id, Payslip.month).in_(keys))
+    }
+
+    # Structure changes may have been made by another process, whose invalidation did not reach this cache
+    for employee_id in {row.employee_id for row in dirty if row.reason == "salary_structure"}:
+        structure_cache.invalidate(employee_id)
+
+    # Fresh payslips, computed per month for all recomputed employees at once
+    employees_by_month: Dict[str, Set[int]] = {}
+    for payslip in payslips.values():
+        if not (payslip.is_approved or payslip.is_paid):
+            employees_by_month.setdefault(payslip.month, set()).add(payslip.employee_id)
+    fresh_by_month = {
+        payslip_month: build_payslips(db, sorted(employee_ids), payslip_month)
+        for payslip_month, employee_ids in employees_by_month.items()
+    }
+
+    for row in dirty:
+        payslip = payslips.get((row.employee_id, row.month))
+        if payslip is None:
+            result["cleared"] += 1
+        elif payslip.is_approved or payslip.is_paid:
+            payslip.is_stale = True
+            result["flagged"] += 1
+        elif row.employee_id not in fresh_by_month[row.month]:
+            # Keep the marker so the payslip is retried once a salary structure exists
+            result["failed"].append({"employee_id": row.employee_id, "month": row.month, "detail": MISSING_STRUCTURE_DETAIL})
+            continue
+        else:
+            recompute_payslip(payslip, fresh_by_month[row.month][row.employee_id])
+            result["recomputed"] += 1
+        db.delete(row)
+
+    db.commit()
+    return result
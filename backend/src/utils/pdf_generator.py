@@ -1,12 +1,7 @@
 from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from decimal import Decimal
 
-def generate_payslip_pdf(payslip, employee, approver=None, processor=None):
+def generate_payslip_pdf(payslip, employee, approver=None, processor=None, structure=None):
     """
     Generate a PDF payslip for an employee
     
@@ -15,10 +10,18 @@ def generate_payslip_pdf(payslip, employee, approver=None, processor=None):
         employee: Employee model instance
         approver: Employee model instance of the approver (optional)
         processor: Employee model instance of the processor (optional)
+        structure: Salary structure snapshot for the earnings/deductions breakdown (optional)
         
     Returns:
         BytesIO: PDF file as a BytesIO object
     """
+    # ReportLab is slow to import, so it is only loaded when the first PDF is rendered
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
@@ -107,10 +110,10 @@ def generate_payslip_pdf(payslip, employee, approver=None, processor=None):
     
     earnings_data = [
         ["Description", "Amount"],
-        ["Basic Salary", format_currency(payslip.basic_salary if hasattr(payslip, 'basic_salary') else None)],
-        ["House Rent Allowance", format_currency(payslip.house_rent_allowance if hasattr(payslip, 'house_rent_allowance') else None)],
-        ["Transport Allowance", format_currency(payslip.transport_allowance if hasattr(payslip, 'transport_allowance') else None)],
-        ["Medical Allowance", format_currency(payslip.medical_allowance if hasattr(payslip, 'medical_allowance') else None)],
+        ["Basic Salary", format_currency(structure.basic_salary if structure else None)],
+        ["House Rent Allowance", format_currency(structure.house_rent_allowance if structure else None)],
+        ["Transport Allowance", format_currency(structure.transport_allowance if structure else None)],
+        ["Medical Allowance", format_currency(structure.medical_allowance if structure else None)],
         ["Overtime", format_currency(payslip.overtime_amount)],
         ["Bonus", format_currency(payslip.bonus)],
         ["Gross Amount", format_currency(payslip.gross_amount)],
@@ -134,9 +137,9 @@ def generate_payslip_pdf(payslip, employee, approver=None, processor=None):
     content.append(Paragraph("Deductions", header_style))
     deductions_data = [
         ["Description", "Amount"],
-        ["Tax", format_currency(payslip.tax_deduction if hasattr(payslip, 'tax_deduction') else None)],
-        ["Provident Fund", format_currency(payslip.provident_fund if hasattr(payslip, 'provident_fund') else None)],
-        ["Insurance", format_currency(payslip.insurance if hasattr(payslip, 'insurance') else None)],
+        ["Tax", format_currency(structure.tax_deduction if structure else None)],
+        ["Provident Fund", format_currency(structure.provident_fund if structure else None)],
+        ["Insurance", format_currency(structure.insurance if structure else None)],
         ["Additional Deductions", format_currency(payslip.additional_deductions)],
         ["Total Deductions", format_currency(payslip.total_deductions)],
     ]
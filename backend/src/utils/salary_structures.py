@@ -0,0 +1,37 @@
+"""
+Effective-dated salary structure lookup.
+
+The structure that applies to a payroll month is the latest one whose
+``effective_from`` falls before the end of that month, so a raise effective
+mid-month applies to that month and later structures never leak into earlier
+months. Lookups for many employees are answered by a single
+``DISTINCT ON (employee_id)`` query, served by the
+``(employee_id, effective_from DESC)`` index.
+"""
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.models.salary import SalaryStructure
+from src.utils.dates import month_bounds
+
+
+def structures_as_of(db: Session, employee_ids: Iterable[int], month: str) -> Dict[int, SalaryStructure]:
+    """Return the salary structure in effect during ``month`` (YYYY-MM) for each employee that has one"""
+    employee_ids = list(set(employee_ids))
+    if not employee_ids:
+        return {}
+
+    _, next_month_first_day = month_bounds(month)
+    structures = db.query(SalaryStructure)\
+        .filter(SalaryStructure.employee_id.in_(employee_ids))\
+        .filter(SalaryStructure.effective_from < next_month_first_day)\
+        .distinct(SalaryStructure.employee_id)\
+        .order_by(SalaryStructure.employee_id, SalaryStructure.effective_from.desc(), SalaryStructure.id.desc())\
+        .all()
+    return {structure.employee_id: structure for structure in structures}
+
+
+def structure_as_of(db: Session, employee_id: int, month: str) -> Optional[SalaryStructure]:
+    """Return the salary structure in effect during ``month`` for one employee"""
+    return structures_as_of(db, [employee_id], month).get(employee_id)
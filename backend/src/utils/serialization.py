@@ -0,0 +1,120 @@
+"""
+Fast serialization helpers for list endpoints.
+
+Rows are validated once, in bulk, through a cached pydantic ``TypeAdapter`` and
+dumped straight to JSON bytes. Returning a ready-made response means FastAPI does
+not validate the same rows a second time against the route's ``response_model``
+(which is still declared on the route for the OpenAPI docs).
+
+List endpoints also accept a sparse fieldset, ``fields=id,name``: ``select_fields``
+returns a trimmed copy of the schema, so only those columns are selected (and
+only the joins they need are made) and serialized.
+
+Long histories are streamed instead: ``stream_json_array`` and ``stream_ndjson``
+validate and encode the rows one chunk at a time, so memory stays bounded by the
+chunk size.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """Return a cached ``TypeAdapter`` for a list of ``schema``"""
+    return TypeAdapter(List[schema])
+
+
+def model_columns(model, schema: Type[BaseModel]) -> list:
+    """
+    Return the model's columns that are exposed by the schema.
+
+    Selecting only these columns (instead of whole ORM entities) lets extra
+    labelled columns, e.g. ``Employee.name.label("employee_name")``, be added to
+    the same row so that every schema field can be read with ``from_attributes``.
+    """
+    table_columns = model.__table__.columns
+    return [getattr(model, name) for name in schema.model_fields if name in table_columns]
+
+
+@lru_cache(maxsize=None)
+def sparse_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Return a cached copy of ``schema`` with only ``fields``"""
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    )
+
+
+def select_fields(schema: Type[BaseModel], fields: Optional[str]) -> Type[BaseModel]:
+    """
+    Return the schema to serialize a list with: ``schema`` itself, or for a
+    ``fields`` parameter (comma separated field names) a trimmed copy with those
+    fields and ``id``. Unknown field names raise 400.
+    """
+    if not fields:
+        return schema
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(schema.model_fields)}"
+        )
+
+    # Keep the schema's field order, and always identify the rows
+    selected = {"id", *requested} & set(schema.model_fields)
+    return sparse_schema(schema, tuple(name for name in schema.model_fields if name in selected))
+
+
+def extra_columns(schema: Type[BaseModel], columns: Dict[str, Any]) -> list:
+    """The labelled ``columns`` (field name to column) that the schema exposes"""
+    return [column.label(name) for name, column in columns.items() if name in schema.model_fields]
+
+
+def serialize_list(schema: Type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """
+    Validate ``rows`` (ORM objects, result rows or dicts) against ``schema``
+    in a single pass and return the JSON encoded list
+    """
+    adapter = list_adapter(schema)
+    items = adapter.validate_python(list(rows), from_attributes=True)
+    return adapter.dump_json(items)
+
+
+def list_response(schema: Type[BaseModel], rows: Iterable[Any], status_code: int = status.HTTP_200_OK) -> Response:
+    """Build a JSON response for a list endpoint without FastAPI re-validating it"""
+    return Response(
+        content=serialize_list(schema, rows),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
+def stream_json_array(schema: Type[BaseModel], chunks: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """Yield a JSON array of ``schema`` items, validating and encoding one chunk of rows at a time"""
+    adapter = list_adapter(schema)
+    yield b"["
+    separator = b""
+    for rows in chunks:
+        rows = list(rows)
+        if not rows:
+            continue
+        encoded = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        # Drop the chunk's own brackets
+        yield separator + encoded[1:-1]
+        separator = b","
+    yield b"]"
+
+
+def stream_ndjson(schema: Type[BaseModel], chunks: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """Yield ``schema`` items as newline delimited JSON, one chunk of rows at a time"""
+    adapter = list_adapter(schema)
+    for rows in chunks:
+        items = adapter.validate_python(list(rows), from_attributes=True)
+        if items:
+            yield b"".join(item.model_dump_json().encode() + b"\n" for item in items)
@@ -0,0 +1,143 @@
+"""
+In-process cache of effective salary structures.
+
+Structures change maybe once a year per employee but are read for every payslip
+generation and PDF. The cache keeps immutable ``StructureSnapshot`` tuples keyed
+by (employee id, as-of month) in a bounded LRU. Misses for a whole batch are
+resolved with one ``structures_as_of`` query; employees without a structure are
+cached too.
+
+The salary structure endpoints invalidate an employee's entries after every
+write. That only reaches the current process, so entries also expire after
+``SALARY_STRUCTURE_CACHE_TTL`` seconds to bound staleness across workers.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.models.salary import SalaryStructure
+from src.utils.salary_structures import structures_as_of
+
+# Cache settings
+SALARY_STRUCTURE_CACHE_SIZE = int(os.getenv("SALARY_STRUCTURE_CACHE_SIZE", "4096"))
+SALARY_STRUCTURE_CACHE_TTL = float(os.getenv("SALARY_STRUCTURE_CACHE_TTL", "300"))
+
+# Optional components stored as NULL are read as zero
+DEFAULT_ZERO = {
+    "house_rent_allowance", "medical_allowance", "transport_allowance", "special_allowance",
+    "tax_deduction", "provident_fund", "insurance", "other_deductions",
+}
+
+
+class StructureSnapshot(NamedTuple):
+    """Read-only copy of a salary structure, detached from any session"""
+    id: int
+    employee_id: int
+    effective_from: datetime
+    basic_salary: Decimal
+    house_rent_allowance: Decimal
+    medical_allowance: Decimal
+    transport_allowance: Decimal
+    special_allowance: Decimal
+    tax_deduction: Decimal
+    provident_fund: Decimal
+    insurance: Decimal
+    other_deductions: Decimal
+    gross_salary: Decimal
+    net_salary: Decimal
+
+    @classmethod
+    def from_model(cls, structure: SalaryStructure) -> "StructureSnapshot":
+        values = []
+        for name in cls._fields:
+            value = getattr(structure, name)
+            values.append(Decimal("0") if value is None and name in DEFAULT_ZERO else value)
+        return cls(*values)
+
+    def total_deductions(self) -> Decimal:
+        return self.tax_deduction + self.provident_fund + self.insurance + self.other_deductions
+
+
+class StructureCache:
+    """Thread-safe LRU of (employee_id, month) -> snapshot (or None), with hit/miss counters"""
+
+    def __init__(self, maxsize: int = SALARY_STRUCTURE_CACHE_SIZE, ttl: float = SALARY_STRUCTURE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[Tuple[int, str], Tuple[float, Optional[StructureSnapshot]]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_many(self, db: Session, employee_ids: Iterable[int], month: str) -> Dict[int, StructureSnapshot]:
+        """Return the structure in effect during ``month`` for each employee that has one"""
+        found: Dict[int, Optional[StructureSnapshot]] = {}
+        missing = []
+        now = time.monotonic()
+
+        with self.lock:
+            invalidations = self.invalidations
+            for employee_id in set(employee_ids):
+                entry = self.entries.get((employee_id, month))
+                if entry is not None and now - entry[0] < self.ttl:
+                    self.entries.move_to_end((employee_id, month))
+                    found[employee_id] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(employee_id)
+                    self.misses += 1
+
+        if missing:
+            loaded = structures_as_of(db, missing, month)
+            with self.lock:
+                for employee_id in missing:
+                    structure = loaded.get(employee_id)
+                    snapshot = StructureSnapshot.from_model(structure) if structure is not None else None
+                    found[employee_id] = snapshot
+                    # Not cached if a write was invalidated while loading (the rows may predate it)
+                    if self.invalidations == invalidations:
+                        self.entries[(employee_id, month)] = (now, snapshot)
+                        self.entries.move_to_end((employee_id, month))
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+
+        return {employee_id: snapshot for employee_id, snapshot in found.items() if snapshot is not None}
+
+    def get(self, db: Session, employee_id: int, month: str) -> Optional[StructureSnapshot]:
+        return self.get_many(db, [employee_id], month).get(employee_id)
+
+    def invalidate(self, employee_id: int) -> None:
+        """Drop every cached month of an employee"""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == employee_id]:
+                del self.entries[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+structure_cache = StructureCache()
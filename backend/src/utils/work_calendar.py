@@ -0,0 +1,107 @@
+"""
+Working-day calendar per location.
+
+A day is a working day unless it falls on one of the location's weekly offs or
+is a holiday for that location (or for all locations). Locations without
+weekly offs of their own use the default rows (location NULL), and
+``DEFAULT_WEEKLY_OFFS`` when there are none at all.
+
+Working days are computed once per (location, month) and kept in memory, so a
+batch run computing payslips for a whole location resolves them with two small
+queries. The calendar endpoints clear the cache on every change; entries also
+expire after ``WORK_CALENDAR_CACHE_TTL`` seconds, since other processes do not
+see that invalidation.
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from src.models.calendar import Holiday, WeeklyOff
+from src.utils.dates import month_bounds
+
+# Calendar settings
+DEFAULT_WEEKLY_OFFS = {int(day) for day in os.getenv("DEFAULT_WEEKLY_OFFS", "5,6").split(",") if day.strip()}
+WORK_CALENDAR_CACHE_TTL = float(os.getenv("WORK_CALENDAR_CACHE_TTL", "600"))
+
+# (location, month) -> (cached at, working days)
+working_days_cache: Dict[Tuple[Optional[str], str], Tuple[float, int]] = {}
+cache_lock = threading.Lock()
+cache_generation = 0  # Bumped by every invalidation
+
+
+def count_working_days(month: str, weekly_offs: Set[int], holidays: Set) -> int:
+    """Count the days of ``month`` that are neither weekly offs nor holidays"""
+    day, next_month_first_day = month_bounds(month)
+    count = 0
+    while day < next_month_first_day:
+        if day.weekday() not in weekly_offs and day not in holidays:
+            count += 1
+        day += timedelta(days=1)
+    return count
+
+
+def working_days_by_location(db: Session, locations: Iterable[Optional[str]], month: str) -> Dict[Optional[str], int]:
+    """Return the number of working days in ``month`` (YYYY-MM) for each location"""
+    locations = set(locations)
+    result: Dict[Optional[str], int] = {}
+    now = time.monotonic()
+
+    with cache_lock:
+        generation = cache_generation
+        for location in locations:
+            entry = working_days_cache.get((location, month))
+            if entry is not None and now - entry[0] < WORK_CALENDAR_CACHE_TTL:
+                result[location] = entry[1]
+
+    missing = locations - set(result)
+    if not missing:
+        return result
+
+    # Weekly offs and holidays of all missing locations in two queries
+    named = [location for location in missing if location is not None]
+    location_filter = or_(WeeklyOff.location.is_(None), WeeklyOff.location.in_(named))
+    weekly_offs: Dict[Optional[str], Set[int]] = {}
+    for row in db.query(WeeklyOff.location, WeeklyOff.weekday).filter(location_filter):
+        weekly_offs.setdefault(row.location, set()).add(row.weekday)
+
+    month_first_day, next_month_first_day = month_bounds(month)
+    holidays: Dict[Optional[str], Set] = {}
+    for row in db.query(Holiday.location, Holiday.date).filter(
+        or_(Holiday.location.is_(None), Holiday.location.in_(named)),
+        Holiday.date >= month_first_day,
+        Holiday.date < next_month_first_day
+    ):
+        holidays.setdefault(row.location, set()).add(row.date)
+
+    default_offs = weekly_offs.get(None, DEFAULT_WEEKLY_OFFS)
+    with cache_lock:
+        for location in missing:
+            days = count_working_days(
+                month,
+                weekly_offs.get(location, default_offs),
+                holidays.get(None, set()) | holidays.get(location, set())
+            )
+            # Not cached if the calendar changed while loading
+            if generation == cache_generation:
+                working_days_cache[(location, month)] = (now, days)
+            result[location] = days
+
+    return result
+
+
+def working_days(db: Session, location: Optional[str], month: str) -> int:
+    """Return the number of working days in ``month`` at ``location``"""
+    return working_days_by_location(db, [location], month)[location]
+
+
+def invalidate_calendar() -> None:
+    """Forget all cached working days (after a holiday or weekly off changes)"""
+    global cache_generation
+    with cache_lock:
+        working_days_cache.clear()
+        cache_generation += 1
@@ -125,12 +125,26 @@ const Employees = () => {
   const pageSize = 10;
   
   useEffect(() => {
-    fetchEmployees();
-  }, [currentPage, statusFilter]);
+    // Wait for a pause in typing before searching
+    const timer = setTimeout(fetchEmployees, searchTerm.trim() ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [currentPage, statusFilter, searchTerm]);
   
   const fetchEmployees = async () => {
     setLoading(true);
     try {
+      if (searchTerm.trim()) {
+        // Ranked server-side search, one page of best matches
+        const response = await employeeApi.search({
+          q: searchTerm.trim(),
+          status: statusFilter || undefined,
+          limit: pageSize
+        });
+        setEmployees(response.data);
+        setTotalEmployees(response.data.length);
+        return;
+      }
+      
       const params = {
         skip: (currentPage - 1) * pageSize,
         limit: pageSize,
@@ -159,6 +173,7 @@ const Employees = () => {
   
   const handleSearchChange = (e) => {
     setSearchTerm(e.target.value);
+    setCurrentPage(1); // Search results are a single page
   };
   
   const handleStatusFilterChange = (e) => {
@@ -196,13 +211,6 @@ const Employees = () => {
     await fetchEmployees();
   };
   
-  const filteredEmployees = employees.filter(employee => {
-    const name = employee.name?.toLowerCase() || '';
-    const email = employee.email?.toLowerCase() || '';
-    const searchLower = searchTerm.toLowerCase();
-    return name.includes(searchLower) || email.includes(searchLower);
-  });
-  
   const totalPages = Math.ceil(totalEmployees / pageSize);
   
   const columns = [
@@ -333,7 +341,7 @@ const Employees = () => {
         <Card>
           <Table 
             columns={columns} 
-            data={filteredEmployees} 
+            data={employees} 
             emptyMessage="No employees found"
           />
           
@@ -304,7 +304,7 @@ const Payslips = () => {
         setLoading(true);
         const [payslipsRes, employeesRes] = await Promise.all([
           payslipApi.getAll(),
-          employeeApi.getAll()
+          employeeApi.getAll({ fields: 'id,name' }) // Only needed for the pickers
         ]);
         setPayslips(payslipsRes.data);
         setEmployees(employeesRes.data);
@@ -175,7 +175,7 @@ const SalaryStructures = () => {
         setLoading(true);
         const [structuresRes, employeesRes] = await Promise.all([
           salaryStructureApi.getAll(),
-          employeeApi.getAll()
+          employeeApi.getAll({ fields: 'id,name' }) // Only needed for the pickers
         ]);
         setStructures(structuresRes.data);
         setEmployees(employeesRes.data);
@@ -71,6 +71,7 @@ export const employeeApi = {
   getAll: (params) => api.get(removeTrailingSlash('/employees'), { params }),
   getDetailed: (params) =>
     api.get(removeTrailingSlash('/employees/detailed'), { params }),
+  search: (params) => api.get(removeTrailingSlash('/employees/search'), { params }),
   getById: (id) => api.get(removeTrailingSlash(`/employees/${id}`)),
   create: (data) => api.post('/employees/', data), // Keep trailing slash for POST to match backend
   update: (id, data) => api.put(removeTrailingSlash(`/employees/${id}`), data),